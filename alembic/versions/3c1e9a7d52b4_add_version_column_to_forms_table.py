@@ -0,0 +1,28 @@
+"""Add version column to forms table
+
+Revision ID: 3c1e9a7d52b4
+Revises: f94b2d03aa3b
+Create Date: 2026-10-16 09:12:41.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e9a7d52b4'
+down_revision: Union[str, Sequence[str], None] = 'f94b2d03aa3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('forms', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('forms', 'version')
@@ -0,0 +1,37 @@
+"""Add (form_id, submitted_at, id) index to submissions for keyset pagination
+
+Revision ID: 7a4d2c9e1f60
+Revises: 3c1e9a7d52b4
+Create Date: 2026-10-16 10:02:17.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4d2c9e1f60'
+down_revision: Union[str, Sequence[str], None] = '3c1e9a7d52b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY da se ne zakljuca tabela sa submisijama tokom izgradnje indeksa
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_submissions_form_id_submitted_at_id',
+            'submissions',
+            ['form_id', sa.text('submitted_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_submissions_form_id_submitted_at_id', table_name='submissions', postgresql_concurrently=True)
@@ -0,0 +1,28 @@
+"""Add revision to form_aggregates (watermark of a form's submission writes)
+
+Revision ID: a3c9e5f71b08
+Revises: f1a4e7b2c963
+Create Date: 2026-10-16 21:32:47.118306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e5f71b08'
+down_revision: Union[str, Sequence[str], None] = 'f1a4e7b2c963'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('form_aggregates', sa.Column('revision', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('form_aggregates', 'revision')
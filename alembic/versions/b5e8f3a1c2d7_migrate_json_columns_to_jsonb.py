@@ -0,0 +1,77 @@
+"""Migrate submissions.data and forms.fields to JSONB and add GIN indexes
+
+Revision ID: b5e8f3a1c2d7
+Revises: 7a4d2c9e1f60
+Create Date: 2026-10-16 11:24:51.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8f3a1c2d7'
+down_revision: Union[str, Sequence[str], None] = '7a4d2c9e1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Promena tipa prepisuje tabelu (ACCESS EXCLUSIVE lock) - pokrenuti u prozoru odrzavanja
+    op.alter_column(
+        'submissions', 'data',
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=False,
+        postgresql_using='data::jsonb',
+    )
+    op.alter_column(
+        'forms', 'fields',
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=False,
+        postgresql_using='fields::jsonb',
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_submissions_data_gin',
+            'submissions',
+            ['data'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'data': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_forms_fields_gin',
+            'forms',
+            ['fields'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_forms_fields_gin', table_name='forms', postgresql_concurrently=True)
+        op.drop_index('ix_submissions_data_gin', table_name='submissions', postgresql_concurrently=True)
+    op.alter_column(
+        'forms', 'fields',
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        type_=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using='fields::json',
+    )
+    op.alter_column(
+        'submissions', 'data',
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        type_=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using='data::json',
+    )
@@ -0,0 +1,40 @@
+"""Add aggregate_deltas table (append-only submission changes folded into the aggregates by a compactor)
+
+Revision ID: b6e2f8a1d437
+Revises: e5b7d1c3a924
+Create Date: 2026-10-17 11:26:03.482915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2f8a1d437'
+down_revision: Union[str, Sequence[str], None] = 'e5b7d1c3a924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'aggregate_deltas',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('form_id', sa.Integer(), sa.ForeignKey('forms.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('added', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('removed', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('added_at', sa.DateTime(), nullable=True),
+        sa.Column('removed_at', postgresql.ARRAY(sa.DateTime()), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_aggregate_deltas_form_id_id', 'aggregate_deltas', ['form_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_aggregate_deltas_form_id_id', table_name='aggregate_deltas')
+    op.drop_table('aggregate_deltas')
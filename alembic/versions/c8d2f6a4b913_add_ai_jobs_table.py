@@ -0,0 +1,45 @@
+"""Add ai_jobs table (background AI form generation)
+
+Revision ID: c8d2f6a4b913
+Revises: a3c9e5f71b08
+Create Date: 2026-10-16 22:14:09.530472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d2f6a4b913'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e5f71b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ai_jobs',
+        sa.Column('id', sa.Uuid(), primary_key=True),
+        sa.Column('prompt', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(), server_default='pending', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        'ix_ai_jobs_open', 'ai_jobs', ['status', 'created_at'],
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ai_jobs_open', table_name='ai_jobs')
+    op.drop_table('ai_jobs')
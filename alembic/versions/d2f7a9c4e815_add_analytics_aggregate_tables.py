@@ -0,0 +1,56 @@
+"""Add incrementally maintained analytics aggregate tables
+
+Revision ID: d2f7a9c4e815
+Revises: b5e8f3a1c2d7
+Create Date: 2026-10-16 14:12:40.518392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a9c4e815'
+down_revision: Union[str, Sequence[str], None] = 'b5e8f3a1c2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'form_aggregates',
+        sa.Column('form_id', sa.Integer(), sa.ForeignKey('forms.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('fields_version', sa.Integer(), nullable=False),
+        sa.Column('submission_count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        'form_field_aggregates',
+        sa.Column('form_id', sa.Integer(), sa.ForeignKey('forms.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('field_id', sa.String(), primary_key=True),
+        sa.Column('filled', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('value_count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('value_sum', sa.Numeric(), server_default='0', nullable=False),
+        sa.Column('value_min', sa.Numeric(), nullable=True),
+        sa.Column('value_max', sa.Numeric(), nullable=True),
+        sa.Column('date_min', sa.Date(), nullable=True),
+        sa.Column('date_max', sa.Date(), nullable=True),
+    )
+    op.create_table(
+        'form_option_aggregates',
+        sa.Column('form_id', sa.Integer(), sa.ForeignKey('forms.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('field_id', sa.String(), primary_key=True),
+        sa.Column('option', sa.String(), primary_key=True),
+        sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+    )
+    # Postojece forme nemaju agregate dok se ne pokrene: uv run rebuild-aggregates --all
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('form_option_aggregates')
+    op.drop_table('form_field_aggregates')
+    op.drop_table('form_aggregates')
@@ -0,0 +1,37 @@
+"""Add (form_id, sample key) index to submissions for sampled analytics
+
+Revision ID: d4a8c2e6f193
+Revises: b6e2f8a1d437
+Create Date: 2026-10-17 14:08:45.270631
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c2e6f193'
+down_revision: Union[str, Sequence[str], None] = 'b6e2f8a1d437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Izraz mora da bude isti kao sample_key() u modelu (seed 42), inace ga planer ne koristi
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_submissions_form_id_sample_key',
+            'submissions',
+            ['form_id', sa.text('(hashint8extended(id, 42) & 4294967295)')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_submissions_form_id_sample_key', table_name='submissions', postgresql_concurrently=True)
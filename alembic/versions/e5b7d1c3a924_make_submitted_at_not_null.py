@@ -0,0 +1,43 @@
+"""Backfill submissions.submitted_at and make it NOT NULL
+
+Revision ID: e5b7d1c3a924
+Revises: c8d2f6a4b913
+Create Date: 2026-10-17 09:41:52.118307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7d1c3a924'
+down_revision: Union[str, Sequence[str], None] = 'c8d2f6a4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset kursor (submitted_at, id) ne moze da pokazuje na NULL, a poredjenje torki ih preskace;
+    # stare submisije bez vremena dobijaju epohu, pa su na kraju liste i van rollup-ova za skorije dane.
+    # Posle migracije pokrenuti rebuild-aggregates da rollup-ovi i sketch-evi vide te redove.
+    op.execute("UPDATE submissions SET submitted_at = '1970-01-01' WHERE submitted_at IS NULL")
+    # NOT VALID pa VALIDATE: provera ne drzi ACCESS EXCLUSIVE lock tokom skeniranja tabele,
+    # a SET NOT NULL onda koristi validiran CHECK umesto da ponovo skenira
+    op.execute("ALTER TABLE submissions ADD CONSTRAINT submissions_submitted_at_not_null CHECK (submitted_at IS NOT NULL) NOT VALID")
+    op.execute("ALTER TABLE submissions VALIDATE CONSTRAINT submissions_submitted_at_not_null")
+    op.alter_column(
+        'submissions',
+        'submitted_at',
+        existing_type=sa.DateTime(),
+        nullable=False,
+        server_default=sa.text("timezone('utc', now())"),
+    )
+    op.drop_constraint('submissions_submitted_at_not_null', 'submissions', type_='check')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('submissions', 'submitted_at', existing_type=sa.DateTime(), nullable=True, server_default=None)
@@ -0,0 +1,37 @@
+"""Add field_sketches table (distinct-count and top-values sketches of text fields)
+
+Revision ID: f1a4e7b2c963
+Revises: e6b1c8d3f402
+Create Date: 2026-10-16 16:58:21.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a4e7b2c963'
+down_revision: Union[str, Sequence[str], None] = 'e6b1c8d3f402'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'field_sketches',
+        sa.Column('form_id', sa.Integer(), sa.ForeignKey('forms.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('field_id', sa.String(), primary_key=True),
+        sa.Column('bucket', sa.Date(), primary_key=True),
+        sa.Column('hll', sa.LargeBinary(), nullable=False),
+        sa.Column('top', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    )
+    # Popunjava se sa: uv run rebuild-aggregates --all
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('field_sketches')
@@ -1,5 +1,34 @@
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
 from pydantic import BaseModel
 
+from app.api.form_schema import FormSchemaCreate
+
 
 class PromptRequest(BaseModel):
     prompt: str
+    # False: uvek generisi novu formu, i kada postoji slicna
+    use_existing_forms: bool = True
+
+
+class AIJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class AIJobResponse(BaseModel):
+    job_id: uuid.UUID
+    status: AIJobStatus
+    attempts: int
+    # Samo kada je status done
+    result: Optional[FormSchemaCreate] = None
+    # Greska poslednjeg pokusaja (i kod posla koji se ponovo pokusava)
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
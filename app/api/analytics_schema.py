@@ -0,0 +1,124 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+
+class ConfidenceInterval(BaseModel):
+    low: float
+    high: float
+
+class OptionCount(BaseModel):
+    value: Any
+    label: Optional[str] = None
+    count: int
+    interval: Optional[ConfidenceInterval] = None
+
+class HistogramBucket(BaseModel):
+    start: Any
+    end: Optional[Any] = None
+    count: int
+
+class NumberStats(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+    avg: Optional[float] = None
+    avg_interval: Optional[ConfidenceInterval] = None
+    percentiles: Dict[str, Optional[float]] = {}
+
+class DateStats(BaseModel):
+    min: Optional[str] = None
+    max: Optional[str] = None
+    interval: Optional[str] = None
+
+class FieldAnalytics(BaseModel):
+    field_id: str
+    type: Optional[str] = None
+    label: Optional[str] = None
+    filled: int
+    fill_rate: float
+    # Samo za rezultat na uzorku: intervali poverenja procena
+    filled_interval: Optional[ConfidenceInterval] = None
+    fill_rate_interval: Optional[ConfidenceInterval] = None
+    options: Optional[List[OptionCount]] = None
+    number: Optional[NumberStats] = None
+    date: Optional[DateStats] = None
+    histogram: Optional[List[HistogramBucket]] = None
+
+class FormAnalyticsResponse(BaseModel):
+    form_id: int
+    total_submissions: int
+    # live: izracunato iz submisija; store: iz agregata koji se odrzavaju pri upisu
+    source: str = "live"
+    # false: brojevi su procene sa uzorka submisija forme sa intervalima poverenja
+    exact: bool = True
+    sample_percent: Optional[float] = None
+    sampled_rows: Optional[int] = None
+    confidence: Optional[float] = None
+    total_interval: Optional[ConfidenceInterval] = None
+    fields: List[FieldAnalytics]
+
+class TimeSeriesPoint(BaseModel):
+    bucket: datetime
+    count: int
+
+class SubmissionRateResponse(BaseModel):
+    form_id: int
+    resolution: str
+    start: datetime
+    end: datetime
+    source: str = "live"
+    total: int
+    points: List[TimeSeriesPoint]
+
+class DistinctEstimate(BaseModel):
+    estimate: int
+    # ~95% interval (dve standardne greske); za tacan rezultat low == high == estimate
+    low: int
+    high: int
+    relative_error: float
+
+class TopValue(BaseModel):
+    value: str
+    count: int
+    # Donja granica; count je gornja. Jednake su kada je broj tacan
+    min_count: int
+
+class TextFieldAnalytics(BaseModel):
+    field_id: str
+    type: Optional[str] = None
+    label: Optional[str] = None
+    values: int
+    distinct: DistinctEstimate
+    top: List[TopValue]
+    # Vrednost koja nije na listi pojavila se najvise ovoliko puta
+    unlisted_max: int
+
+class TextAnalyticsResponse(BaseModel):
+    form_id: int
+    start: Optional[date] = None
+    end: Optional[date] = None
+    source: str = "live"
+    fields: List[TextFieldAnalytics]
+
+class CrosstabValue(BaseModel):
+    # null: polje nije popunjeno
+    value: Optional[str] = None
+    label: Optional[str] = None
+    # Vrednosti van prvih N spojene u jednu (value "__other__")
+    other: bool = False
+    total: int
+
+class CrosstabResponse(BaseModel):
+    form_id: int
+    row_field: str
+    column_field: str
+    rows: List[CrosstabValue]
+    columns: List[CrosstabValue]
+    # counts[i][j]: submisije sa vrednoscu rows[i] i columns[j]; svaka izabrana opcija checkbox-a se broji
+    counts: List[List[int]]
+    total: int
+    # Broj razlicitih vrednosti polja pre ogranicenja na prvih N
+    row_values: int
+    column_values: int
+    truncated: bool = False
+    cached: bool = False
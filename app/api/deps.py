@@ -1,22 +1,84 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from app.application.interfaces.submission_repository import ISubmissionRepository
-from app.infrastructure.repositories.submission_repository import SubmissionRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.application.interfaces.submission_repository import IAsyncSubmissionRepository
+from app.infrastructure.repositories.async_submission_repository import AsyncSubmissionRepository
 from app.application.services.submission_service import SubmissionService
-from app.infrastructure.database.session import get_db
-from app.infrastructure.repositories.form_repository import FormRepository
+from app.infrastructure.database.async_session import get_async_db
+from app.infrastructure.database.replicas import get_async_read_db
+from app.infrastructure.repositories.async_form_repository import AsyncFormRepository
 from app.application.services.form_service import FormService
-from app.application.interfaces.form_repository import IFormRepository
+from app.application.interfaces.form_repository import IAsyncFormRepository
+from app.infrastructure.ingest.submission_buffer import SubmissionIngestBuffer, submission_ingest_buffer
+from app.infrastructure.repositories.cached_form_repository import AsyncCachedFormRepository
+from app.infrastructure.cache.form_cache import form_cache
+from app.infrastructure.cache.analytics_cache import crosstab_cache
+from app.infrastructure.cache.ai_prompt_cache import ai_prompt_cache
+from app.application.services.ai_service import AIService
+from app.infrastructure.ai.backends import create_ai_backend
+from app.infrastructure.ai.job_worker import AIJobWorkerPool
+from app.infrastructure.database.async_session import AsyncSessionLocal
+from app.infrastructure.repositories.ai_job_repository import AsyncAIJobRepository
+from app.application.services.ai_job_service import AIJobService
+from app.application.services.form_similarity import form_similarity_index
+from app.application.services.form_template_service import FormTemplateService
+from app.infrastructure.ai.form_index_loader import FormSimilarityIndexLoader
+from app.application.services.analytics_service import AnalyticsService
+from app.infrastructure.repositories.analytics_repository import AsyncAnalyticsRepository
+from app.core.config import settings
 
 
-def get_form_repository(db: Session = Depends(get_db)) -> IFormRepository:
-    return FormRepository(db)
+def get_form_repository(
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)
+) -> IAsyncFormRepository:
+    repository = AsyncFormRepository(db, read_session=read_db)
+    if settings.FORM_CACHE_ENABLED:
+        return AsyncCachedFormRepository(repository, form_cache)
+    return repository
 
-def get_form_service(repo: IFormRepository = Depends(get_form_repository)) -> FormService:
+def get_form_service(repo: IAsyncFormRepository = Depends(get_form_repository)) -> FormService:
     return FormService(repo)
 
-def get_submission_repository(db: Session = Depends(get_db)) -> ISubmissionRepository:
-    return SubmissionRepository(db_session=db)
+def get_submission_repository(
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)
+) -> IAsyncSubmissionRepository:
+    return AsyncSubmissionRepository(db_session=db, read_session=read_db)
 
-def get_submission_service(repo: ISubmissionRepository = Depends(get_submission_repository)) -> SubmissionService:
+def get_submission_service(repo: IAsyncSubmissionRepository = Depends(get_submission_repository)) -> SubmissionService:
     return SubmissionService(repo)
+
+def get_analytics_service(read_db: AsyncSession = Depends(get_async_read_db)) -> AnalyticsService:
+    return AnalyticsService(
+        AsyncAnalyticsRepository(read_db),
+        crosstab_cache=crosstab_cache if settings.ANALYTICS_CROSSTAB_CACHE_ENABLED else None
+    )
+
+# Jedan AI servis (i Gemini klijent) po procesu
+ai_service = AIService(create_ai_backend(), prompt_cache=ai_prompt_cache if settings.AI_CACHE_ENABLED else None)
+
+ai_job_workers = AIJobWorkerPool(
+    session_factory=AsyncSessionLocal,
+    ai_service=ai_service,
+    workers=settings.AI_JOB_WORKERS,
+    poll_interval=settings.AI_JOB_POLL_SECONDS,
+    lease_seconds=settings.AI_JOB_LEASE_SECONDS,
+    max_attempts=settings.AI_JOB_MAX_ATTEMPTS,
+)
+
+form_index_loader = FormSimilarityIndexLoader(AsyncSessionLocal, form_similarity_index)
+
+def get_ai_service() -> AIService:
+    return ai_service
+
+def get_ai_job_service(db: AsyncSession = Depends(get_async_db)) -> AIJobService:
+    # Status posla se cita sa primary-ja: replika ne mora da vidi upravo napravljen posao
+    return AIJobService(AsyncAIJobRepository(db), ai_service, notify=ai_job_workers.notify)
+
+def get_form_template_service(repo: IAsyncFormRepository = Depends(get_form_repository)) -> FormTemplateService:
+    return FormTemplateService(
+        form_similarity_index, repo, min_score=settings.AI_SIMILAR_FORM_MIN_SCORE, refresh=form_index_loader.refresh
+    )
+
+def get_submission_ingest_buffer() -> SubmissionIngestBuffer:
+    return submission_ingest_buffer
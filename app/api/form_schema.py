@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, ConfigDict
-from typing import List, Optional, Any, Union, Literal
+from typing import Dict, List, Optional, Any, Union, Literal
 from enum import Enum
 
 
@@ -101,3 +101,17 @@ class FormSchemaResponse(FormSchema):
 
     model_config = ConfigDict(from_attributes=True)
 
+class FieldStateResponse(BaseModel):
+    visible: bool
+    enabled: bool
+    required: bool
+
+class RuleEvaluationRequest(BaseModel):
+    data: Dict[str, Any]
+
+class RuleChangeEvaluationRequest(RuleEvaluationRequest):
+    changed: List[str]
+    previous: Optional[Dict[str, Any]] = None
+
+class RuleEvaluationResponse(BaseModel):
+    fields: Dict[str, FieldStateResponse]
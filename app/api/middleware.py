@@ -0,0 +1,28 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.database.replicas import READ_PRIMARY_COOKIE, SAFE_METHODS
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write, pins the client's reads to the primary for a few seconds through a
+    short-lived cookie, so e.g. the form it just created is not looked up on a lagging replica.
+    """
+
+    def __init__(self, app: ASGIApp, max_age: int):
+        self.app = app
+        self.cookie = (
+            f"{READ_PRIMARY_COOKIE}=1; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax".encode("latin-1")
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", self.cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
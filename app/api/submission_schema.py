@@ -1,6 +1,7 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from enum import Enum
 
 class SubmissionCreate(BaseModel):
     data: Dict[str, Any]  
@@ -10,4 +11,31 @@ class SubmissionResponse(SubmissionCreate):
     submitted_at: datetime
     form_id: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class SubmissionPage(BaseModel):
+    items: List[SubmissionResponse]
+    next_cursor: Optional[str] = None
+
+class SubmissionBatchItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class SubmissionBatchResponse(BaseModel):
+    form_id: int
+    created: int
+    failed: int
+    results: List[SubmissionBatchItemResult]
+
+class IngestStatus(str, Enum):
+    QUEUED = "queued"
+    COMMITTED = "committed"
+    FAILED = "failed"
+
+class SubmissionReceipt(BaseModel):
+    receipt_id: str
+    form_id: int
+    status: IngestStatus
+    submission_id: Optional[int] = None
+    error: Optional[str] = None
@@ -1,63 +1,149 @@
+import asyncio
 import json
+import logging
+import uuid
+from typing import AsyncIterator, Awaitable, Optional, TypeVar
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import ValidationError
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
 
-from app.api.ai_schema import PromptRequest
-from app.api.form_schema import  FormSchemaCreate
-from app.application.services.ai_service import AIService
+from app.api.ai_schema import AIJobResponse, PromptRequest
+from app.api.deps import get_ai_job_service, get_ai_service, get_form_template_service
+from app.api.form_schema import FormSchemaCreate
+from app.application.services.ai_job_service import AIJobService
+from app.application.services.ai_service import AIService, AITimeoutError, InvalidAIResponseError
+from app.application.services.form_template_service import FormTemplate, FormTemplateService
+from app.core.config import settings
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+DISCONNECT_POLL_SECONDS = 0.5
+# nginx-ov kod za zahtev koji je klijent prekinuo; odgovor niko ne cita
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def until_disconnected(request: Request, awaitable: Awaitable[T]) -> T:
+    """ Awaits the call and cancels it when the client goes away (the model call stops unless another request shares it). """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
+async def find_template(request: PromptRequest, template_service: FormTemplateService) -> Optional[FormTemplate]:
+    """ A matching existing form, or None; a failed lookup (e.g. the database) falls through to the model. """
+    if not (settings.AI_SIMILAR_FORMS_ENABLED and request.use_existing_forms):
+        return None
+    try:
+        return await template_service.find_template(request.prompt)
+    except Exception as e:
+        logger.warning("Similar form lookup failed, generating instead: %s", e)
+        return None
+
 @router.post("/test-prompt")
-async def test_ai_prompt(request: PromptRequest, ai_service: AIService = Depends(AIService)):
-    response_text = await ai_service.generate_response(request.prompt)
+async def test_ai_prompt(request: PromptRequest, http_request: Request, ai_service: AIService = Depends(get_ai_service)):
+    response_text = await until_disconnected(http_request, ai_service.generate_response(request.prompt))
     return {"response": response_text}
 
 @router.post("/generate-form-from-text", response_model=FormSchemaCreate)
-def generate_form_from_text(
+async def generate_form_from_text(
         request: PromptRequest,
-        ai_service: AIService = Depends(AIService)
+        http_request: Request,
+        response: Response,
+        ai_service: AIService = Depends(get_ai_service),
+        template_service: FormTemplateService = Depends(get_form_template_service)
 ):
+    """
+    Form definition generated from a text description; repeated prompts are served from the cache.
+    When an existing form matches the description closely enough it is returned as a template
+    instead, without a model call (X-Form-Template-Id / X-Form-Template-Score headers).
+    """
+    try:
+        template = await find_template(request, template_service)
+        if template is not None:
+            response.headers["X-Form-Template-Id"] = str(template.form_id)
+            response.headers["X-Form-Template-Score"] = f"{template.score:.3f}"
+            return template.form
+        return await until_disconnected(http_request, ai_service.generate_form_schema(request.prompt))
+    except InvalidAIResponseError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except AITimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("An unexpected error occurred: %s", e)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred while processing the AI request.")
 
-    global ai_response_str
-    form_schema_definition = json.dumps(FormSchemaCreate.model_json_schema(), indent=2)
-
-
-    system_prompt = f"""
-    You are an expert assistant for creating web forms. Your task is to convert a user's text description into a valid JSON object that strictly follows the provided JSON schema.
-    The JSON output MUST conform to this schema:
-    {form_schema_definition}
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
 
-    Key instructions:
-    - The 'fields' array must contain objects, each with a unique 'id', a 'type', and a 'label'.
-    - 'id' should be a short, descriptive, snake_case string (e.g., 'full_name', 'user_email').
-    - 'type' must be one of the allowed values from the schema (e.g., 'text', 'select', 'checkbox').
-    - For 'select' or 'radio' types, you MUST generate an 'options' array. Each option must have a 'label' (for the user) and a 'value' (for the system).
-    - If the user implies a field is required (e.g., "I need their email"), add a 'required' validation rule.
-    - Generate relevant validation rules where appropriate (e.g., a 'pattern' validation for email fields).
-    - DO NOT include an 'id' at the root level of the JSON output. The output should be a single JSON object that can be directly parsed into a FormSchemaCreate model.
+@router.post("/generate-form-from-text/stream")
+async def stream_form_from_text(
+        request: PromptRequest,
+        ai_service: AIService = Depends(get_ai_service),
+        template_service: FormTemplateService = Depends(get_form_template_service)
+):
     """
+    Server-Sent Events while the model writes the form: 'field' with each FormField as soon as it
+    is complete and valid, then 'done' with the validated FormSchemaCreate, or 'error' with
+    {"detail": ...}. The model call stops when the client disconnects. An existing form that
+    matches the description is sent instead, after a 'template' event with its form_id and score.
+    """
+    # Pre pocetka stream-a; sesija iz zavisnosti se ne koristi dok se dogadjaji salju
+    template = await find_template(request, template_service)
 
-    try:
-
-        ai_response_str = ai_service.generate_json_from_prompt(
-            system_prompt=system_prompt,
-            user_prompt=request.prompt
-        )
+    async def events() -> AsyncIterator[str]:
+        if template is not None:
+            yield _sse("template", json.dumps({"form_id": template.form_id, "score": round(template.score, 3)}))
+            for field in template.form.fields:
+                yield _sse("field", field.model_dump_json())
+            yield _sse("done", template.form.model_dump_json())
+            return
+        try:
+            async for event, value in ai_service.stream_form_schema(request.prompt):
+                yield _sse(event, value.model_dump_json())
+        except (InvalidAIResponseError, AITimeoutError) as e:
+            yield _sse("error", json.dumps({"detail": str(e)}))
+        except Exception as e:
+            logger.exception("An unexpected error occurred: %s", e)
+            yield _sse("error", json.dumps({"detail": "An unexpected error occurred while processing the AI request."}))
 
-        ai_json = json.loads(ai_response_str)
-        validated_schema = FormSchemaCreate(**ai_json)
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxy (nginx) ne sme da baferuje dogadjaje
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        return validated_schema
+@router.post("/generate-form-from-text/jobs", response_model=AIJobResponse, status_code=202)
+async def submit_form_generation_job(
+        request: PromptRequest,
+        response: Response,
+        job_service: AIJobService = Depends(get_ai_job_service)
+):
+    """
+    Queues the generation and returns the job at once; poll GET /api/ai/jobs/{job_id} (the
+    Location header) until status is done or failed. A cached prompt is done right away.
+    """
+    job = await job_service.submit(request.prompt)
+    response.headers["Location"] = f"/api/ai/jobs/{job.job_id}"
+    return job
 
-    except json.JSONDecodeError:
-        print("AI returned invalid JSON:", ai_response_str)
-        raise HTTPException(status_code=500, detail="AI failed to generate valid JSON.")
-    except ValidationError as e:
-        print("AI JSON did not match schema:", e)
-        raise HTTPException(status_code=500, detail="AI response did not match the required form schema.")
-    except Exception as e:
-        print("An unexpected error occurred:", e)
-        raise HTTPException(status_code=500, detail="An unexpected error occurred while processing the AI request.")
\ No newline at end of file
+@router.get("/jobs/{job_id}", response_model=AIJobResponse)
+async def read_form_generation_job(job_id: uuid.UUID, job_service: AIJobService = Depends(get_ai_job_service)):
+    job = await job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
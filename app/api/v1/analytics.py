@@ -0,0 +1,139 @@
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.requests import Request
+
+from app.api.analytics_schema import (
+    CrosstabResponse, FormAnalyticsResponse, SubmissionRateResponse, TextAnalyticsResponse
+)
+from app.api.deps import get_analytics_service, get_form_service
+from app.application.services.analytics_plan import RollupResolution
+from app.application.services.analytics_service import AnalyticsService, InvalidCrosstabError, InvalidTimeRangeError
+from app.application.services.form_service import FormService
+from app.application.services.sketches import TOP_CAPACITY
+from app.application.services.submission_filters import InvalidFilterError, parse_filters
+
+router = APIRouter()
+
+ANALYTICS_CONTROL_PARAMS = {"bins", "sample"}
+CROSSTAB_CONTROL_PARAMS = {"row", "column", "limit"}
+
+@router.get("/{form_id}", response_model=FormAnalyticsResponse)
+async def read_form_analytics(
+    form_id: int,
+    request: Request,
+    bins: int = Query(10, ge=1, le=100, description="Number of histogram buckets for number fields"),
+    sample: Optional[float] = Query(
+        None, gt=0, le=100,
+        description="Percent of the form's submissions to sample; 100 forces an exact result. "
+                    "Unset: sampled automatically for unfiltered requests on forms above the row threshold"
+    ),
+    service: AnalyticsService = Depends(get_analytics_service),
+    form_service: FormService = Depends(get_form_service)
+):
+    """
+    Fill rate of every field, option counts for select/radio/checkbox fields, min/max/avg,
+    percentiles and a histogram for number fields and a histogram for date fields. Accepts the
+    same field filters as the export (field=value, field__gte=...). On huge forms an unfiltered
+    request is answered from a sample: exact=false, counts are estimates with 95% intervals.
+    """
+    db_form = await form_service.get_form_by_id(form_id)
+    if not db_form:
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    try:
+        filters = parse_filters(
+            [(key, value) for key, value in request.query_params.multi_items() if key not in ANALYTICS_CONTROL_PARAMS],
+            db_form.fields or []
+        )
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await service.get_form_analytics(db_form, filters=filters, bins=bins, sample=sample)
+
+
+@router.get("/{form_id}/crosstab", response_model=CrosstabResponse)
+async def read_form_crosstab(
+    form_id: int,
+    request: Request,
+    row: str = Query(..., description="Field whose values are the rows"),
+    column: str = Query(..., description="Field whose values are the columns"),
+    limit: int = Query(20, ge=1, le=100, description="Most frequent values kept per field; the rest count as __other__"),
+    service: AnalyticsService = Depends(get_analytics_service),
+    form_service: FormService = Depends(get_form_service)
+):
+    """
+    Submissions broken down by the answers to two fields (e.g. satisfaction by user type). Accepts
+    the same field filters as the export; cached until the form's submissions change.
+    """
+    db_form = await form_service.get_form_by_id(form_id)
+    if not db_form:
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    try:
+        filters = parse_filters(
+            [(key, value) for key, value in request.query_params.multi_items() if key not in CROSSTAB_CONTROL_PARAMS],
+            db_form.fields or []
+        )
+        return await service.get_crosstab(db_form, row, column, limit, filters)
+    except (InvalidFilterError, InvalidCrosstabError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{form_id}/summary", response_model=FormAnalyticsResponse)
+async def read_form_analytics_summary(
+    form_id: int,
+    service: AnalyticsService = Depends(get_analytics_service),
+    form_service: FormService = Depends(get_form_service)
+):
+    """
+    Fill rates, option counts and min/max/avg read from the aggregates maintained on ingest,
+    without touching the submissions. No histograms or percentiles; falls back to the full
+    computation when the form's aggregates are missing or out of date.
+    """
+    db_form = await form_service.get_form_by_id(form_id)
+    if not db_form:
+        raise HTTPException(status_code=404, detail="Form not found")
+    return await service.get_form_summary(db_form)
+
+
+@router.get("/{form_id}/timeseries", response_model=SubmissionRateResponse)
+async def read_submission_rate(
+    form_id: int,
+    resolution: RollupResolution = Query(RollupResolution.HOUR, description="Bucket size: minute, hour or day"),
+    start: Optional[datetime] = Query(None, description="Inclusive start (UTC); defaults to a window ending now"),
+    end: Optional[datetime] = Query(None, description="Exclusive end (UTC); defaults to the end of the current bucket"),
+    service: AnalyticsService = Depends(get_analytics_service),
+    form_service: FormService = Depends(get_form_service)
+):
+    """ Submissions per minute, hour or day, served from the rollups maintained on ingest. """
+    db_form = await form_service.get_form_by_id(form_id)
+    if not db_form:
+        raise HTTPException(status_code=404, detail="Form not found")
+    try:
+        return await service.get_submission_rate(db_form, resolution, start, end)
+    except InvalidTimeRangeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{form_id}/text", response_model=TextAnalyticsResponse)
+async def read_text_analytics(
+    form_id: int,
+    top: int = Query(10, ge=1, le=TOP_CAPACITY, description="Number of most frequent values per field"),
+    start: Optional[date] = Query(None, description="First day (UTC), inclusive"),
+    end: Optional[date] = Query(None, description="Last day (UTC), inclusive"),
+    service: AnalyticsService = Depends(get_analytics_service),
+    form_service: FormService = Depends(get_form_service)
+):
+    """
+    Unique values (HyperLogLog estimate with a ~95% interval) and the most frequent values
+    (Space-Saving, with lower and upper bounds per count) of text, email and tel fields.
+    """
+    db_form = await form_service.get_form_by_id(form_id)
+    if not db_form:
+        raise HTTPException(status_code=404, detail="Form not found")
+    try:
+        return await service.get_text_analytics(db_form, top, start, end)
+    except InvalidTimeRangeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
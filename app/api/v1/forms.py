@@ -1,39 +1,68 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from app.application.services.form_service import FormService
-from app.api.form_schema import FormSchemaCreate, FormSchemaResponse
+from app.api.form_schema import (
+    FormSchemaCreate, FormSchemaResponse, RuleEvaluationRequest, RuleChangeEvaluationRequest, RuleEvaluationResponse
+)
+from app.application.services.rule_engine import RuleCycleError
 from app.api.deps import get_form_service
 
 router = APIRouter()
 
 @router.post("/", response_model=FormSchemaResponse, status_code=status.HTTP_201_CREATED)
-def create_form(form: FormSchemaCreate, service: FormService = Depends(get_form_service)):
-    return service.create_form(form)
+async def create_form(form: FormSchemaCreate, service: FormService = Depends(get_form_service)):
+    try:
+        return await service.create_form(form)
+    except RuleCycleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 @router.get("/", response_model=List[FormSchemaResponse])
-def read_forms(service: FormService = Depends(get_form_service)):
-    return service.get_all_forms()
+async def read_forms(service: FormService = Depends(get_form_service)):
+    return await service.get_all_forms()
 
 @router.get("/{form_id}", response_model=FormSchemaResponse)
-def read_form(form_id: int, service: FormService = Depends(get_form_service)):
-    db_form = service.get_form_by_id(form_id)
+async def read_form(form_id: int, service: FormService = Depends(get_form_service)):
+    db_form = await service.get_form_by_id(form_id)
     if db_form is None:
         raise HTTPException(status_code=404, detail="Form not found")
     return db_form
 
 
+@router.post("/{form_id}/rules/evaluate", response_model=RuleEvaluationResponse)
+async def evaluate_form_rules(form_id: int, request: RuleEvaluationRequest, service: FormService = Depends(get_form_service)):
+    """ Evaluates the form's rules against a payload and returns the resulting field states. """
+    states = await service.evaluate_rules(form_id=form_id, data=request.data)
+    if states is None:
+        raise HTTPException(status_code=404, detail="Form not found")
+    return RuleEvaluationResponse(fields={field_id: state._asdict() for field_id, state in states.items()})
+
+
+@router.post("/{form_id}/rules/evaluate/changes", response_model=RuleEvaluationResponse)
+async def evaluate_form_rule_changes(form_id: int, request: RuleChangeEvaluationRequest, service: FormService = Depends(get_form_service)):
+    """ Returns the states of fields affected by the changed fields (only flipped ones when 'previous' is sent). """
+    states = await service.evaluate_rule_changes(
+        form_id=form_id, data=request.data, changed_fields=request.changed, previous=request.previous
+    )
+    if states is None:
+        raise HTTPException(status_code=404, detail="Form not found")
+    return RuleEvaluationResponse(fields={field_id: state._asdict() for field_id, state in states.items()})
+
+
 @router.put("/{form_id}", response_model=FormSchemaResponse, status_code=200)
-def update_form(form_id: int, form: FormSchemaCreate, service: FormService = Depends(get_form_service)):
+async def update_form(form_id: int, form: FormSchemaCreate, service: FormService = Depends(get_form_service)):
     """ Updates an existing form with the provided data. """
-    updated_form = service.update_form(form_id=form_id, form_data=form)
+    try:
+        updated_form = await service.update_form(form_id=form_id, form_data=form)
+    except RuleCycleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     if updated_form is None:
         raise HTTPException(status_code=404, detail="Form not found")
     return updated_form
 
 @router.delete("/{form_id}", status_code=204)
-def delete_form_endpoint(form_id: int, service: FormService = Depends(get_form_service)):
+async def delete_form_endpoint(form_id: int, service: FormService = Depends(get_form_service)):
     """ Deletes the form with the provided id. """
-    success = service.delete_form(form_id=form_id)
+    success = await service.delete_form_by_id(form_id=form_id)
     if not success:
         raise HTTPException(status_code=404, detail="Form not found")
     return success
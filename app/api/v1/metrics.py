@@ -0,0 +1,71 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import ai_job_workers, ai_service, form_index_loader, get_submission_ingest_buffer
+from app.core.config import settings
+from app.infrastructure.database.async_session import async_engine
+from app.infrastructure.database.pool import pool_status
+from app.infrastructure.database.replicas import replica_router
+from app.infrastructure.database.session import engine
+from app.infrastructure.cache.analytics_cache import crosstab_cache
+from app.infrastructure.cache.form_cache import form_cache
+from app.infrastructure.cache.invalidation_bus import form_invalidation_listener
+from app.infrastructure.ingest.aggregate_compactor import aggregate_compactor
+from app.infrastructure.ingest.submission_buffer import SubmissionIngestBuffer
+
+router = APIRouter()
+
+@router.get("/ingest")
+def read_ingest_metrics(buffer: SubmissionIngestBuffer = Depends(get_submission_ingest_buffer)) -> Dict[str, Any]:
+    """ Queue depth, throughput and flush latency of the write-behind submission buffer. """
+    return buffer.metrics()
+
+@router.get("/form-cache")
+def read_form_cache_metrics() -> Dict[str, Any]:
+    """ Size and hit/miss counters of the in-process form cache, plus the invalidation listener state. """
+    return {**form_cache.stats(), "invalidation_listener": form_invalidation_listener.stats()}
+
+@router.get("/analytics-cache")
+def read_analytics_cache_metrics() -> Dict[str, Any]:
+    """ Size and hit/miss counters of the in-process crosstab cache. """
+    return crosstab_cache.stats()
+
+@router.get("/aggregates")
+def read_aggregate_metrics() -> Dict[str, Any]:
+    """ Runs, folded deltas and last run time of this process's aggregate compactor. """
+    return {"enabled": settings.ANALYTICS_AGGREGATES_ENABLED, **aggregate_compactor.stats()}
+
+@router.get("/ai")
+def read_ai_metrics() -> Dict[str, Any]:
+    """
+    Model calls (in flight, coalesced, timed out), the generated-form cache, the job workers and the
+    similar-form index of this process.
+    """
+    cache = {"enabled": False}
+    if ai_service.prompt_cache is not None:
+        cache = {"enabled": True, "schema_version": ai_service.schema_version, **ai_service.prompt_cache.stats()}
+    similar_forms = {
+        "enabled": settings.AI_SIMILAR_FORMS_ENABLED, **form_index_loader.index.stats(), **form_index_loader.stats()
+    }
+    return {**ai_service.stats(), "cache": cache, "jobs": ai_job_workers.stats(), "similar_forms": similar_forms}
+
+@router.get("/db-pool")
+def read_db_pool_metrics() -> Dict[str, Any]:
+    """
+    Occupancy and checkout wait times of both connection pools of this worker. Multiply
+    max_connections_per_worker by the worker count to get the connections Postgres has to allow.
+    """
+    return {
+        "async": pool_status(async_engine.pool),
+        "sync": pool_status(engine.pool),
+        "replicas": replica_router.status(),
+        "replica_primary_fallbacks": replica_router.primary_fallbacks,
+        "pgbouncer_transaction_mode": settings.DB_PGBOUNCER_TRANSACTION_MODE,
+        "max_connections_per_worker": (
+            settings.DB_POOL_SIZE + settings.DB_POOL_MAX_OVERFLOW
+            + settings.DB_SYNC_POOL_SIZE + settings.DB_SYNC_POOL_MAX_OVERFLOW
+            + int(settings.FORM_INVALIDATION_BUS_ENABLED)
+        ),
+        "max_connections_per_worker_per_replica": settings.DB_POOL_SIZE + settings.DB_POOL_MAX_OVERFLOW,
+    }
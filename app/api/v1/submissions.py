@@ -1,14 +1,15 @@
-import csv
-import io
-from typing import List
-from fastapi import APIRouter, status, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, status, Depends, HTTPException, Query
 from starlette.requests import Request
 from starlette.responses import StreamingResponse
 
-from app.application.services.submission_service import SubmissionService
+from app.application.services.submission_service import SubmissionService, InvalidCursorError, EXPORT_FORMATS, gzip_chunks
 from app.application.services.form_service import FormService
-from app.api.deps import get_submission_service, get_form_service
-from app.api.submission_schema import SubmissionCreate
+from app.application.services.submission_filters import InvalidFilterError, parse_filters
+from app.api.deps import get_submission_service, get_form_service, get_submission_ingest_buffer
+from app.api.submission_schema import SubmissionCreate, SubmissionBatchResponse, SubmissionReceipt, SubmissionPage
+from app.infrastructure.ingest.submission_buffer import SubmissionIngestBuffer, IngestQueueFullError
+from app.core.config import settings
 
 from app.api.submission_schema import SubmissionResponse
 
@@ -16,53 +17,155 @@ from app.api.submission_schema import SubmissionResponse
 router = APIRouter()
 
 @router.post("/{form_id}/submissions", response_model=SubmissionResponse, status_code=status.HTTP_201_CREATED)
-def create_submission_for_form(
+async def create_submission_for_form(
     form_id: int,
     submission: SubmissionCreate,
     service: SubmissionService = Depends(get_submission_service),
     form_service: FormService = Depends(get_form_service)
 ):
-    db_form = form_service.get_form_by_id(form_id)
+    db_form = await form_service.get_form_by_id(form_id)
     if not db_form:
         raise HTTPException(status_code=404, detail="Form not found")
+
+    errors = service.validate_submission(db_form, submission)
+    if errors:
+        raise HTTPException(status_code=422, detail={"errors": errors})
         
-    return service.create_submission(form_id=form_id, submission_data=submission)
+    return await service.create_submission(form_id=form_id, submission_data=submission)
+
+@router.post("/{form_id}/submissions/batch", response_model=SubmissionBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_submissions_batch_for_form(
+    form_id: int,
+    submissions: List[SubmissionCreate],
+    service: SubmissionService = Depends(get_submission_service),
+    form_service: FormService = Depends(get_form_service)
+):
+    """ Creates many submissions for one form in a single transaction, reporting per-item ids and errors. """
+    if len(submissions) > settings.SUBMISSION_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds the limit of {settings.SUBMISSION_BATCH_MAX_SIZE} submissions."
+        )
 
-@router.get("/{form_id}", response_model=List[SubmissionResponse])
+    db_form = await form_service.get_form_by_id(form_id)
+    if not db_form:
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    results = await service.create_submissions(form=db_form, submissions=submissions)
+    created = sum(1 for result in results if result.id is not None)
+    return SubmissionBatchResponse(
+        form_id=form_id,
+        created=created,
+        failed=len(results) - created,
+        results=results
+    )
+
+@router.post("/{form_id}/submissions/ingest", response_model=SubmissionReceipt, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_submission_for_form(
+    form_id: int,
+    submission: SubmissionCreate,
+    buffer: SubmissionIngestBuffer = Depends(get_submission_ingest_buffer),
+    service: SubmissionService = Depends(get_submission_service),
+    form_service: FormService = Depends(get_form_service)
+):
+    """ Queues a submission for a group commit and returns a receipt that can be polled. """
+    if not buffer.running:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Buffered ingest is disabled.")
+
+    db_form = await form_service.get_form_by_id(form_id)
+    if not db_form:
+        raise HTTPException(status_code=404, detail="Form not found")
+
+    errors = service.validate_submission(db_form, submission)
+    if errors:
+        raise HTTPException(status_code=422, detail={"errors": errors})
+
+    try:
+        return buffer.submit(form_id, submission)
+    except IngestQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
+@router.get("/ingest/receipts/{receipt_id}", response_model=SubmissionReceipt)
+def read_ingest_receipt(receipt_id: str, buffer: SubmissionIngestBuffer = Depends(get_submission_ingest_buffer)):
+    receipt = buffer.get_receipt(receipt_id)
+    if receipt is None:
+        raise HTTPException(status_code=404, detail="Receipt not found")
+    return receipt
+
+@router.get("/{form_id}", response_model=SubmissionPage)
 async def read_submissions_for_form(
     form_id: int,
+    limit: int = Query(settings.SUBMISSION_PAGE_DEFAULT_SIZE, ge=1, le=settings.SUBMISSION_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None,
     service: SubmissionService = Depends(get_submission_service)
 ):
-    
-    return await service.get_submissions_by_form_id(form_id)
+    """ Newest submissions first, one page at a time; pass next_cursor back as 'cursor' for the next page. """
+    try:
+        return await service.get_submission_page(form_id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+EXPORT_CONTROL_PARAMS = {"format", "compression", "columns"}
 
 @router.get("/{form_id}/export", response_class=StreamingResponse)
 async def export_form_submissions(
     form_id: int,
     request: Request,
-    service: SubmissionService = Depends(get_submission_service)
+    format: Optional[str] = Query(None, description="csv or ndjson; negotiated from Accept when omitted"),
+    compression: Optional[str] = Query(None, description="gzip for a compressed download"),
+    columns: Optional[str] = Query(None, description="Comma-separated field ids to export"),
+    service: SubmissionService = Depends(get_submission_service),
+    form_service: FormService = Depends(get_form_service)
 ):
-    filters = dict(request.query_params)
-
-    submissions = await service.get_submissions_by_form_id(form_id=form_id, filters=filters)
+    db_form = await form_service.get_form_by_id(form_id)
+    if not db_form:
+        raise HTTPException(status_code=404, detail="Form not found")
 
-    if not submissions:
-        raise HTTPException(status_code=404, detail="No submissions found for the given criteria.")
+    if format is None:
+        format = "ndjson" if "application/x-ndjson" in request.headers.get("accept", "") else "csv"
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format '{format}'.")
+    if compression not in (None, "gzip"):
+        raise HTTPException(status_code=400, detail=f"Unsupported compression '{compression}'.")
 
-    output = io.StringIO()
-    writer = csv.writer(output)
+    selected_columns = None
+    if columns:
+        selected_columns = [column.strip() for column in columns.split(",") if column.strip()]
+        known_fields = {field.get("id") for field in db_form.fields or []}
+        unknown = [column for column in selected_columns if column not in known_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
 
-    first_submission_data = submissions[0].data
-    header = ['id', 'submitted_at'] + list(first_submission_data.keys())
-    writer.writerow(header)
+    # Ostali parametri su filteri: polje=vrednost ili polje__op=vrednost (in, gt, gte, lt, lte, prefix, contains).
+    # Proveravaju se pre StreamingResponse-a: greska u toku stream-a bi dala 200 sa praznim telom
+    try:
+        filters = parse_filters(
+            [(key, value) for key, value in request.query_params.multi_items() if key not in EXPORT_CONTROL_PARAMS],
+            db_form.fields or []
+        )
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    for submission in submissions:
-        row = [submission.id, submission.submitted_at] + [submission.data.get(key, '') for key in first_submission_data.keys()]
-        writer.writerow(row)
+    content = service.export_submissions(
+        db_form,
+        export_format=format,
+        columns=selected_columns,
+        filters=filters,
+        chunk_size=settings.SUBMISSION_EXPORT_CHUNK_SIZE
+    )
+    media_type = EXPORT_FORMATS[format]
+    filename = f"form_{form_id}_submissions.{format}"
+    if compression == "gzip":
+        content = gzip_chunks(content)
+        media_type = "application/gzip"
+        filename += ".gz"
 
-    output.seek(0)
     return StreamingResponse(
-        output,
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=form_{form_id}_submissions.csv"}
-    )
\ No newline at end of file
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+
+
+class IAIBackend(ABC):
+    """ Text generation model behind AIService: Gemini, or a deterministic local fake for tests and load tests. """
+
+    @abstractmethod
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None, json_output: bool = False) -> str:
+        """ The model's whole answer; cancelling the awaiting task cancels the upstream request. """
+        pass
+
+    @abstractmethod
+    def stream(self, prompt: str, system_instruction: Optional[str] = None, json_output: bool = False) -> AsyncIterator[str]:
+        """ The answer as it is produced, in text chunks; closing the iterator ends the upstream request. """
+        pass
@@ -0,0 +1,39 @@
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from app.domain.models.ai_job import AIJob
+
+
+class IAsyncAIJobRepository(ABC):
+
+    @abstractmethod
+    async def create(self, prompt: str, result: Optional[Dict[str, Any]] = None) -> AIJob:
+        """ A pending job, or one that is already done when the result is known (prompt cache). """
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, job_id: uuid.UUID) -> Optional[AIJob]:
+        pass
+
+    @abstractmethod
+    async def claim(self, lease_seconds: float) -> Optional[AIJob]:
+        """
+        Marks the oldest pending job running and returns it; a running job whose worker has held it
+        longer than lease_seconds (crashed or restarted) is claimed again. FOR UPDATE SKIP LOCKED,
+        so concurrent workers never claim the same job.
+        """
+        pass
+
+    @abstractmethod
+    async def finish(self, job_id: uuid.UUID, attempt: int, result: Dict[str, Any]) -> bool:
+        """
+        Stores the result of the given attempt. False when the job was meanwhile claimed again
+        (lease expired), so a late worker never overwrites a newer attempt.
+        """
+        pass
+
+    @abstractmethod
+    async def fail(self, job_id: uuid.UUID, attempt: int, error: str, retry: bool) -> bool:
+        """ Records the error of an attempt; with retry the job goes back to pending, otherwise it is failed. """
+        pass
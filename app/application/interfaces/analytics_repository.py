@@ -0,0 +1,119 @@
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.application.services.analytics_plan import (
+    CrosstabCounts, FieldAggregateSpec, FieldAggregates, RollupResolution
+)
+from app.application.services.sketches import HyperLogLog, SpaceSaving
+from app.application.services.submission_filters import SubmissionFilter
+
+
+class IAsyncAnalyticsRepository(ABC):
+
+    @abstractmethod
+    async def aggregate_fields(
+        self,
+        form_id: int,
+        specs: List[FieldAggregateSpec],
+        filters: Optional[List[SubmissionFilter]] = None,
+        bins: int = 10,
+        sample_percent: Optional[float] = None,
+    ) -> Tuple[int, Dict[str, FieldAggregates]]:
+        """
+        Returns the number of matching submissions and the aggregates of every field, in one query.
+        With sample_percent only that share of the form's rows is aggregated (a repeatable
+        row-level sample) and the counts are those of the sample.
+        """
+        pass
+
+    @abstractmethod
+    async def estimate_form_rows(self, form_id: int) -> int:
+        """ Cheap row count of a form: the store's count, or the planner's estimate. """
+        pass
+
+    @abstractmethod
+    async def get_stored_aggregates(
+        self,
+        form_id: int,
+        version: int,
+        specs: List[FieldAggregateSpec],
+    ) -> Optional[Tuple[int, Dict[str, FieldAggregates]]]:
+        """
+        Reads the incrementally maintained aggregates (no percentiles or histograms). None when
+        the form has no store or it was built for another version of the form's fields.
+        """
+        pass
+
+    @abstractmethod
+    async def get_rollup_counts(
+        self,
+        form_id: int,
+        resolution: RollupResolution,
+        start: datetime,
+        end: datetime,
+    ) -> Optional[List[Tuple[datetime, int]]]:
+        """ Non-empty buckets in [start, end) from submission_rollups; None when the form has no store. """
+        pass
+
+    @abstractmethod
+    async def count_by_bucket(
+        self,
+        form_id: int,
+        resolution: RollupResolution,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, int]]:
+        """ The same series computed from submissions (GROUP BY date_trunc over the submitted_at index). """
+        pass
+
+    @abstractmethod
+    async def get_field_sketches(
+        self,
+        form_id: int,
+        version: int,
+        field_ids: List[str],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Optional[Dict[str, Tuple[HyperLogLog, SpaceSaving]]]:
+        """
+        Daily sketches of the given fields in [start, end] (inclusive days), merged per field.
+        None when the form has no store for its current version.
+        """
+        pass
+
+    @abstractmethod
+    async def exact_text_stats(
+        self,
+        form_id: int,
+        field_ids: List[str],
+        top: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Dict[str, Tuple[int, int, List[Tuple[str, int]]]]:
+        """ Exact (filled values, distinct values, top values) per field, computed from submissions. """
+        pass
+
+    @abstractmethod
+    async def crosstab(
+        self,
+        form_id: int,
+        row: FieldAggregateSpec,
+        column: FieldAggregateSpec,
+        limit: int,
+        filters: Optional[List[SubmissionFilter]] = None,
+    ) -> CrosstabCounts:
+        """
+        Submissions per (row value, column value) pair in one grouped query. Only the `limit` most
+        frequent values of each field are kept, the rest are counted as other. Every selected
+        option of a multi-select checkbox counts as a value.
+        """
+        pass
+
+    @abstractmethod
+    async def submission_watermark(self, form_id: int) -> Tuple:
+        """
+        Changes whenever the form's submissions change: the store revision, or (count, max id)
+        for a form without a store, which misses in-place updates.
+        """
+        pass
@@ -23,3 +23,27 @@ class IFormRepository(ABC):
     @abstractmethod
     def delete(self, form_id: int) -> Optional[Form]:
         pass
+
+
+class IAsyncFormRepository(ABC):
+    """ Async counterpart of IFormRepository, used by the request path. """
+
+    @abstractmethod
+    async def get_by_id(self, form_id: int) -> Optional[Form]:
+        pass
+
+    @abstractmethod
+    async def get_all(self) -> List[Form]:
+        pass
+
+    @abstractmethod
+    async def create(self, form_data: FormSchemaCreate) -> Form:
+        pass
+
+    @abstractmethod
+    async def update(self, form_id: int, form_data: FormSchemaCreate) -> Optional[Form]:
+        pass
+
+    @abstractmethod
+    async def delete(self, form_id: int) -> Optional[Form]:
+        pass
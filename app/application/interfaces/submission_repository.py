@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Any, Optional, Tuple
 
 from app.api.submission_schema import SubmissionCreate
+from app.application.services.submission_filters import SubmissionFilter
 from app.domain.models.submission import Submission
 
 
@@ -12,7 +14,31 @@ class ISubmissionRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_all_by_form_id(self, form_id: int, filters: Dict[str, Any] = None) -> List[type[Submission]]:
+    def create_many(self, form_id: int, submissions: List[SubmissionCreate]) -> List[int]:
+        """ Inserts all submissions in a single transaction and returns their ids in input order. """
+        pass
+
+    @abstractmethod
+    def get_all_by_form_id(self, form_id: int, filters: Optional[List[SubmissionFilter]] = None) -> List[Submission]:
+        pass
+
+    @abstractmethod
+    def stream_by_form_id(
+        self,
+        form_id: int,
+        filters: Optional[List[SubmissionFilter]] = None,
+        chunk_size: int = 1000,
+        columns: Optional[List[str]] = None,
+    ) -> Iterator[Any]:
+        """
+        Yields rows from a server-side cursor, chunk_size rows at a time: (id, submitted_at, data),
+        or (id, submitted_at, *values) with only the given data keys extracted when columns is set.
+        """
+        pass
+
+    @abstractmethod
+    def get_page_by_form_id(self, form_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None) -> List[Submission]:
+        """ Newest first; 'after' is the (submitted_at, id) of the last row of the previous page. """
         pass
 
     @abstractmethod
@@ -26,3 +52,48 @@ class ISubmissionRepository(ABC):
     @abstractmethod
     def delete(self, submission_id: int) -> Optional[Submission]:
         pass
+
+
+class IAsyncSubmissionRepository(ABC):
+    """ Async counterpart of ISubmissionRepository, used by the request path. """
+
+    @abstractmethod
+    async def create(self, form_id: int, submission_data: SubmissionCreate) -> Submission:
+        pass
+
+    @abstractmethod
+    async def create_many(self, form_id: int, submissions: List[SubmissionCreate]) -> List[int]:
+        """ Inserts all submissions in a single transaction and returns their ids in input order. """
+        pass
+
+    @abstractmethod
+    async def get_all_by_form_id(self, form_id: int, filters: Optional[List[SubmissionFilter]] = None) -> List[Submission]:
+        pass
+
+    @abstractmethod
+    def stream_by_form_id(
+        self,
+        form_id: int,
+        filters: Optional[List[SubmissionFilter]] = None,
+        chunk_size: int = 1000,
+        columns: Optional[List[str]] = None,
+    ) -> AsyncIterator[Any]:
+        """ Same rows as ISubmissionRepository.stream_by_form_id, from a server-side cursor. """
+        pass
+
+    @abstractmethod
+    async def get_page_by_form_id(self, form_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None) -> List[Submission]:
+        """ Newest first; 'after' is the (submitted_at, id) of the last row of the previous page. """
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, submission_id: int) -> Optional[Submission]:
+        pass
+
+    @abstractmethod
+    async def update(self, submission_id: int, submission_data: SubmissionCreate) -> Optional[Submission]:
+        pass
+
+    @abstractmethod
+    async def delete(self, submission_id: int) -> Optional[Submission]:
+        pass
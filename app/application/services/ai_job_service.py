@@ -0,0 +1,47 @@
+import uuid
+from typing import Callable, Optional
+
+from app.api.ai_schema import AIJobResponse, AIJobStatus
+from app.api.form_schema import FormSchemaCreate
+from app.application.interfaces.ai_job_repository import IAsyncAIJobRepository
+from app.application.services.ai_service import AIService
+from app.domain.models.ai_job import AIJob
+
+
+def job_response(job: AIJob) -> AIJobResponse:
+    return AIJobResponse(
+        job_id=job.id,
+        status=AIJobStatus(job.status),
+        attempts=job.attempts,
+        result=FormSchemaCreate.model_validate(job.result) if job.result is not None else None,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+class AIJobService:
+    """ Queues AI form generation as jobs processed by the worker pool; notify wakes a worker of this process. """
+
+    def __init__(
+        self,
+        repository: IAsyncAIJobRepository,
+        ai_service: AIService,
+        notify: Optional[Callable[[], None]] = None,
+    ):
+        self.repository = repository
+        self.ai_service = ai_service
+        self.notify = notify
+
+    async def submit(self, prompt: str) -> AIJobResponse:
+        """ A new job; a prompt that is already cached gives a job that is done right away. """
+        cached = await self.ai_service.cached_form_schema(prompt)
+        job = await self.repository.create(prompt, cached.model_dump(mode="json") if cached is not None else None)
+        if cached is None and self.notify is not None:
+            self.notify()
+        return job_response(job)
+
+    async def get_job(self, job_id: uuid.UUID) -> Optional[AIJobResponse]:
+        job = await self.repository.get_by_id(job_id)
+        return job_response(job) if job is not None else None
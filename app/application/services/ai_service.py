@@ -1,26 +1,254 @@
-import google.genai as genai
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from pydantic import ValidationError
+
+from app.api.form_schema import FormField, FormSchemaCreate
+from app.application.interfaces.ai_backend import IAIBackend
+from app.application.services.json_stream import IncrementalArrayParser
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from app.infrastructure.cache.ai_prompt_cache import PromptCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Sistemski prompt se racuna jednom po procesu; sema bez razmaka jer se svaki token placa i ceka
+FORM_JSON_SCHEMA = json.dumps(FormSchemaCreate.model_json_schema(), separators=(",", ":"))
+FORM_SYSTEM_PROMPT = (
+    "You convert a user's description of a web form into one JSON object that strictly conforms to this JSON schema:"
+    f"{FORM_JSON_SCHEMA}\n"
+    "Rules: every item of 'fields' has a unique short snake_case 'id' (e.g. full_name, user_email), a 'type' "
+    "allowed by the schema and a 'label'. 'select' and 'radio' fields MUST have 'options', each with a 'label' "
+    "(shown to the user) and a 'value' (stored). Add a 'required' validation when the user implies a field is "
+    "required and other validations where they fit (e.g. a 'pattern' for email). No 'id' at the root level."
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n\"'`.,;:!?"
+
+
+class InvalidAIResponseError(ValueError):
+    """ The model's answer is not JSON or does not match FormSchemaCreate. """
+
+
+class AITimeoutError(Exception):
+    """ The model did not answer (including the wait for a free call slot) within AI_REQUEST_TIMEOUT_SECONDS. """
+
+
+def normalize_prompt(prompt: str) -> str:
+    """ Case, Unicode form, whitespace and surrounding quotes/punctuation do not change the request. """
+    normalized = unicodedata.normalize("NFKC", prompt).casefold()
+    return _WHITESPACE.sub(" ", normalized).strip(_EDGE_PUNCTUATION)
+
+
+def prompt_schema_version(model: str) -> str:
+    """ Changes with the system prompt (so with FormSchemaCreate) and the model; old cache entries stop matching. """
+    return hashlib.sha256(f"{model}\n{FORM_SYSTEM_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+
+def form_user_prompt(prompt: str) -> str:
+    return f"User request: '{prompt}'"
+
+
+def parse_form_schema(response_text: str) -> FormSchemaCreate:
+    """ Validates the model's JSON answer; raises InvalidAIResponseError with the message the API returns. """
+    try:
+        return FormSchemaCreate(**json.loads(response_text))
+    except json.JSONDecodeError:
+        logger.warning("AI returned invalid JSON: %s", response_text)
+        raise InvalidAIResponseError("AI failed to generate valid JSON.")
+    except (TypeError, ValidationError) as e:
+        logger.warning("AI JSON did not match schema: %s", e)
+        raise InvalidAIResponseError("AI response did not match the required form schema.")
+
+
+class _Flight:
+    """ One upstream generation shared by every request for the same prompt, with the number of requests awaiting it. """
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
 class AIService:
-    def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash', generation_config=genai.GenerationConfig(
-            response_mime_type='application/json',
-        ))
+    """
+    Model calls shared by the whole process (one instance, see get_ai_service). Every call is
+    async, waits for one of AI_MAX_CONCURRENT_CALLS slots and is bounded by AI_REQUEST_TIMEOUT_SECONDS.
+    Concurrent requests for the same prompt share one upstream call (single-flight), and
+    generated forms are cached by the normalized prompt and the schema version.
+    """
+
+    def __init__(
+        self,
+        backend: IAIBackend,
+        prompt_cache: Optional["PromptCache"] = None,
+        model: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+    ):
+        self.backend = backend
+        self.model = model or settings.AI_MODEL
+        self.prompt_cache = prompt_cache
+        self.schema_version = prompt_schema_version(self.model)
+        self.max_concurrency = max_concurrency or settings.AI_MAX_CONCURRENT_CALLS
+        self.timeout_seconds = timeout_seconds or settings.AI_REQUEST_TIMEOUT_SECONDS
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._flights: Dict[str, _Flight] = {}
+        self.active_calls = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.cancelled = 0
+
+    async def _call(self, prompt: str, system_instruction: Optional[str] = None, json_output: bool = False) -> str:
+        async def limited() -> str:
+            async with self._semaphore:
+                self.active_calls += 1
+                self.upstream_calls += 1
+                try:
+                    return await self.backend.generate(prompt, system_instruction, json_output)
+                finally:
+                    self.active_calls -= 1
+
+        try:
+            return await asyncio.wait_for(limited(), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise self._timed_out()
+
+    def _timed_out(self) -> AITimeoutError:
+        self.timeouts += 1
+        return AITimeoutError(f"The AI model did not respond within {self.timeout_seconds:g} seconds.")
+
+    async def _single_flight(self, key: str, start: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(start()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._flights.pop(key, None) if self._flights.get(key) is flight else None)
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            # shield: otkazivanje jednog zahteva ne prekida poziv koji cekaju i drugi
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Niko vise ne ceka (svi klijenti otisli): prekida se i upstream poziv. Kljuc se uklanja
+                # odmah, da se novi zahtev za isti prompt ne prikljuci vec otkazanom task-u
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
 
     async def generate_response(self, prompt: str) -> str:
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self._call(prompt)
         except Exception as e:
-            print(f"Error communicating with Gemini API: {e}")
+            logger.warning("Error communicating with the AI model: %s", e)
             return "Error: Could not get a response from the AI model."
 
-    def generate_json_from_prompt(self, system_prompt: str, user_prompt: str) -> str:
-        full_prompt = f"{system_prompt}\n\nUser request: '{user_prompt}'"
+    def cache_key(self, prompt: str) -> str:
+        digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        return f"form:{self.schema_version}:{digest}"
+
+    async def cached_form_schema(self, prompt: str) -> Optional[FormSchemaCreate]:
+        if self.prompt_cache is None:
+            return None
+        cached = await self.prompt_cache.aget(self.cache_key(prompt))
+        return FormSchemaCreate.model_validate_json(cached) if cached is not None else None
+
+    async def remember_form_schema(self, prompt: str, form_schema: FormSchemaCreate) -> None:
+        if self.prompt_cache is not None:
+            await self.prompt_cache.aset(self.cache_key(prompt), form_schema.model_dump_json())
+
+    async def generate_form_schema(self, prompt: str) -> FormSchemaCreate:
+        """
+        FormSchemaCreate for a text description. Raises InvalidAIResponseError for an unusable
+        answer and AITimeoutError when the model is too slow.
+        """
+        cached = await self.cached_form_schema(prompt)
+        if cached is not None:
+            return cached
+
+        async def generate() -> FormSchemaCreate:
+            response_text = await self._call(form_user_prompt(prompt), FORM_SYSTEM_PROMPT, json_output=True)
+            form_schema = parse_form_schema(response_text)
+            await self.remember_form_schema(prompt, form_schema)
+            return form_schema
+
+        return await self._single_flight(self.cache_key(prompt), generate)
+
+    async def stream_form_schema(self, prompt: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        ("field", FormField) for every field as soon as the model has written it and it validates,
+        then ("done", FormSchemaCreate) once the whole answer validates; a cached prompt replays the
+        cached form. Holds a call slot for the whole stream and is bounded by the same timeout as
+        generate_form_schema; streams are not coalesced. Closing the iterator ends the upstream call.
+        """
+        cached = await self.cached_form_schema(prompt)
+        if cached is not None:
+            for field in cached.fields:
+                yield "field", field
+            yield "done", cached
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_seconds
         try:
-            response = self.model.generate_content(full_prompt)
-            return response.text
-        except Exception as e:
-            print(f"Error generating JSON from Gemini API: {e}")
-            raise
\ No newline at end of file
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise self._timed_out()
+        self.active_calls += 1
+        self.upstream_calls += 1
+        parser = IncrementalArrayParser("fields")
+        chunks = self.backend.stream(form_user_prompt(prompt), FORM_SYSTEM_PROMPT, json_output=True)
+        emitted = set()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), max(deadline - loop.time(), 0))
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise self._timed_out()
+                for element in parser.feed(chunk):
+                    try:
+                        field = FormField.model_validate(element)
+                    except ValidationError:
+                        # Nevalidno polje se ne salje; konacna validacija cele forme prijavljuje gresku
+                        continue
+                    if field.id not in emitted:
+                        emitted.add(field.id)
+                        yield "field", field
+        finally:
+            self.active_calls -= 1
+            self._semaphore.release()
+            await chunks.aclose()
+
+        form_schema = parse_form_schema(parser.text)
+        await self.remember_form_schema(prompt, form_schema)
+        yield "done", form_schema
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout_seconds,
+            "active_calls": self.active_calls,
+            "in_flight_prompts": len(self._flights),
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+        }
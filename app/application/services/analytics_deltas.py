@@ -0,0 +1,150 @@
+import json
+import re
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.application.services.analytics_plan import FieldAggregateSpec, FieldKind
+from app.application.services.sketches import TOP_VALUE_MAX_LENGTH, HyperLogLog, SpaceSaving
+
+# Isto kao NUMERIC_PATTERN / DATE_PATTERN u repozitorijumu (Python re ne zna [[:space:]])
+NUMERIC_RE = re.compile(r"^\s*-?[0-9]+([.][0-9]+)?([eE][-+]?[0-9]+)?\s*$")
+DATE_RE = re.compile(r"^[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+
+def option_key(option: Any) -> str:
+    return json.dumps(option, sort_keys=True)
+
+
+def is_filled(value: Any) -> bool:
+    """ Same rule as the SQL fill rate: missing, null, "" and [] are empty. """
+    return value is not None and value != "" and value != []
+
+
+def _as_text(value: Any) -> str:
+    # data ->> 'field': string bez navodnika, sve ostalo kao JSON tekst
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def number_of(value: Any) -> Optional[Decimal]:
+    text = _as_text(value)
+    return Decimal(text.strip()) if NUMERIC_RE.match(text) else None
+
+
+def date_of(value: Any) -> Optional[date]:
+    text = _as_text(value)
+    if not DATE_RE.match(text):
+        return None
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return None
+
+
+def _json_equal(left: Any, right: Any) -> bool:
+    # U JSON-u true nije 1
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right
+    return left == right
+
+
+def _matches(value: Any, option: Any, multiple: bool) -> bool:
+    """ Python counterpart of data @> {"field": option} / {"field": [option]}. """
+    if multiple:
+        return isinstance(value, list) and any(_json_equal(item, option) for item in value)
+    return _json_equal(value, option)
+
+
+class FieldDelta:
+    """ Change of one field's stored aggregates; counters are signed, min/max only ever widen. """
+
+    def __init__(self, spec: FieldAggregateSpec):
+        self.spec = spec
+        self.filled = 0
+        self.option_counts = [0] * len(spec.options)
+        self.value_count = 0
+        self.value_sum = Decimal(0)
+        self.minimum: Any = None
+        self.maximum: Any = None
+
+    def _widen(self, value: Any) -> None:
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def add(self, value: Any, sign: int) -> None:
+        if not is_filled(value):
+            return
+        self.filled += sign
+        kind = self.spec.kind
+        if kind == FieldKind.OPTIONS:
+            for position, option in enumerate(self.spec.options):
+                if _matches(value, option, self.spec.multiple):
+                    self.option_counts[position] += sign
+        elif kind == FieldKind.NUMBER:
+            number = number_of(value)
+            if number is not None:
+                self.value_count += sign
+                self.value_sum += sign * number
+                if sign > 0:
+                    self._widen(number)
+        elif kind == FieldKind.DATE:
+            day = date_of(value)
+            if day is not None:
+                self.value_count += sign
+                if sign > 0:
+                    self._widen(day)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.filled or self.value_count or self.minimum is not None or any(self.option_counts))
+
+
+class FormDelta:
+    """
+    Accumulates the aggregate change caused by inserting (sign=1) or deleting (sign=-1)
+    submissions of one form, so the store can be updated with a handful of upserts.
+    """
+
+    def __init__(self, specs: List[FieldAggregateSpec]):
+        self.submission_count = 0
+        self.fields: Dict[str, FieldDelta] = {spec.field_id: FieldDelta(spec) for spec in specs}
+
+    def add(self, data: Any, sign: int = 1) -> "FormDelta":
+        self.submission_count += sign
+        if isinstance(data, dict):
+            for field_id, delta in self.fields.items():
+                delta.add(data.get(field_id), sign)
+        return self
+
+    @property
+    def empty(self) -> bool:
+        return not self.submission_count and all(delta.empty for delta in self.fields.values())
+
+
+class FieldSketches:
+    """
+    Sketches of the sketched text fields of a batch of submissions (all from the same day). Values
+    are sketched as data ->> 'field'; only inserts are sketched, deletes are not subtracted.
+    """
+
+    def __init__(self, specs: List[FieldAggregateSpec]):
+        self.distinct: Dict[str, HyperLogLog] = {spec.field_id: HyperLogLog() for spec in specs if spec.sketched}
+        self.counts: Dict[str, Counter] = {field_id: Counter() for field_id in self.distinct}
+
+    def add(self, data: Any) -> "FieldSketches":
+        if isinstance(data, dict):
+            for field_id, distinct in self.distinct.items():
+                value = data.get(field_id)
+                if is_filled(value):
+                    text = _as_text(value)
+                    distinct.add(text)
+                    self.counts[field_id][text[:TOP_VALUE_MAX_LENGTH]] += 1
+        return self
+
+    def sketches(self) -> Dict[str, Tuple[HyperLogLog, SpaceSaving]]:
+        """ Per field (distinct, top), only for fields that got a value. """
+        return {
+            field_id: (self.distinct[field_id], SpaceSaving.from_counts(counts))
+            for field_id, counts in self.counts.items() if counts
+        }
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from app.api.form_schema import FieldType
+
+PERCENTILES: Tuple[float, ...] = (0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+class FieldKind(str, Enum):
+    OPTIONS = "options"
+    NUMBER = "number"
+    DATE = "date"
+    TEXT = "text"
+
+
+class RollupResolution(str, Enum):
+    """ Bucket size of submission rate series; values are date_trunc units. """
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+    @property
+    def step(self) -> timedelta:
+        return {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}[self.value]
+
+    def truncate(self, moment: datetime) -> datetime:
+        """ Python counterpart of date_trunc(resolution, moment). """
+        moment = moment.replace(second=0, microsecond=0)
+        if self != RollupResolution.MINUTE:
+            moment = moment.replace(minute=0)
+        if self == RollupResolution.DAY:
+            moment = moment.replace(hour=0)
+        return moment
+
+
+# Slobodan tekst za koji se odrzavaju sketch-evi (distinct, top vrednosti); password nikad
+SKETCHED_TYPES = frozenset({FieldType.TEXT, FieldType.EMAIL, FieldType.TEL})
+
+
+class FieldAggregateSpec(NamedTuple):
+    """ What to aggregate for one field; options are counted with containment, so they keep their JSON type. """
+    field_id: str
+    kind: FieldKind
+    options: Tuple[Any, ...] = ()
+    multiple: bool = False
+    sketched: bool = False
+
+
+class FieldAggregates(NamedTuple):
+    """ Raw aggregates of one field as returned by the analytics repository. """
+    filled: int
+    option_counts: Tuple[int, ...] = ()
+    minimum: Optional[Any] = None
+    maximum: Optional[Any] = None
+    average: Optional[float] = None
+    percentiles: Tuple[Optional[float], ...] = ()
+    histogram: Tuple[Tuple[Any, int], ...] = ()
+    interval: Optional[str] = None
+    # Broj numerickih vrednosti i njihova standardna devijacija (za interval poverenja proseka)
+    value_count: Optional[int] = None
+    stddev: Optional[float] = None
+
+
+class CrosstabCell(NamedTuple):
+    """ One cell of a contingency table; a value is None when the field is empty. """
+    row: Optional[str]
+    column: Optional[str]
+    count: int
+    # Vrednost van prvih N je spojena u "ostalo" (row/column je tada None)
+    row_other: bool = False
+    column_other: bool = False
+
+
+class CrosstabCounts(NamedTuple):
+    cells: Tuple[CrosstabCell, ...]
+    # Broj razlicitih vrednosti polja pre ogranicenja na prvih N
+    row_values: int
+    column_values: int
+
+
+def plan_field_aggregates(fields: List[Dict[str, Any]]) -> List[FieldAggregateSpec]:
+    """
+    Picks the aggregates for every field from its type: option counts for select/radio/checkbox
+    (true/false for a checkbox without options), stats and a histogram for numbers, a histogram
+    for dates, and the fill rate for free text (plus distinct/top sketches for text, email and tel).
+    """
+    specs = []
+    for field in fields:
+        field_id = field.get("id")
+        if not field_id:
+            continue
+        try:
+            field_type = FieldType(field.get("type"))
+        except ValueError:
+            field_type = None
+        options = tuple(
+            option.get("value") if isinstance(option, dict) else option for option in field.get("options") or []
+        )
+
+        if field_type in (FieldType.SELECT, FieldType.RADIO) and options:
+            specs.append(FieldAggregateSpec(field_id, FieldKind.OPTIONS, options))
+        elif field_type == FieldType.CHECKBOX:
+            if options:
+                specs.append(FieldAggregateSpec(field_id, FieldKind.OPTIONS, options, multiple=True))
+            else:
+                specs.append(FieldAggregateSpec(field_id, FieldKind.OPTIONS, (True, False)))
+        elif field_type == FieldType.NUMBER:
+            specs.append(FieldAggregateSpec(field_id, FieldKind.NUMBER))
+        elif field_type == FieldType.DATE:
+            specs.append(FieldAggregateSpec(field_id, FieldKind.DATE))
+        else:
+            specs.append(FieldAggregateSpec(field_id, FieldKind.TEXT, sketched=field_type in SKETCHED_TYPES))
+    return specs
@@ -0,0 +1,457 @@
+import json
+import math
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.api.analytics_schema import (
+    ConfidenceInterval, CrosstabResponse, CrosstabValue, DateStats, FieldAnalytics, FormAnalyticsResponse,
+    HistogramBucket, NumberStats, OptionCount, SubmissionRateResponse, TimeSeriesPoint, DistinctEstimate,
+    TextAnalyticsResponse, TextFieldAnalytics, TopValue
+)
+from app.application.interfaces.analytics_repository import IAsyncAnalyticsRepository
+from app.application.services.analytics_plan import (
+    PERCENTILES, CrosstabCounts, FieldAggregateSpec, FieldAggregates, FieldKind, RollupResolution,
+    plan_field_aggregates
+)
+from app.application.services.submission_filters import SubmissionFilter
+from app.core.config import settings
+from app.domain.models.form import Form
+
+if TYPE_CHECKING:
+    from app.infrastructure.cache.ttl_cache import TTLCache
+
+# Podrazumevani prozor serije kada start nije zadat
+DEFAULT_WINDOWS = {
+    RollupResolution.MINUTE: timedelta(hours=6),
+    RollupResolution.HOUR: timedelta(days=7),
+    RollupResolution.DAY: timedelta(days=90),
+}
+
+
+# Intervali poverenja na uzorku su 95%
+CONFIDENCE = 0.95
+Z_SCORE = 1.96
+
+
+# Vrednost crosstab ose u koju su spojene sve van prvih N
+OTHER_VALUE = "__other__"
+
+
+class InvalidTimeRangeError(ValueError):
+    pass
+
+
+class InvalidCrosstabError(ValueError):
+    pass
+
+
+def _float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _date(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value.date().isoformat() if hasattr(value, "date") else value.isoformat()
+
+
+def _utc(moment: Optional[datetime]) -> Optional[datetime]:
+    # submitted_at je naive UTC
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _interval(estimate: float, standard_error: float, low: float = 0.0, high: float = math.inf) -> ConfidenceInterval:
+    return ConfidenceInterval(
+        low=max(low, estimate - Z_SCORE * standard_error),
+        high=min(high, estimate + Z_SCORE * standard_error),
+    )
+
+
+def _scaled(count: int, fraction: Optional[float]) -> Tuple[int, Optional[ConfidenceInterval]]:
+    """
+    Population count estimated from a count in a sample of the given fraction. Each row is in the
+    sample with probability f, so Var = N f (1 - f) and the standard error is sqrt(c (1 - f)) / f.
+    """
+    if fraction is None:
+        return count, None
+    estimate = count / fraction
+    return round(estimate), _interval(estimate, math.sqrt(count * (1 - fraction)) / fraction)
+
+
+def _option_text(value: Any) -> str:
+    """ An option value as data ->> 'field' renders it (true, 3, da). """
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _crosstab_axis(spec: FieldAggregateSpec, field: Dict[str, Any], totals: Counter) -> List[CrosstabValue]:
+    """ Options in the field's order, numbers ascending, other values by frequency; empty and other last. """
+    labels = {
+        _option_text(option.get("value")): option.get("label")
+        for option in field.get("options") or [] if isinstance(option, dict)
+    }
+    order = {_option_text(option): position for position, option in enumerate(spec.options)}
+
+    def number(value: Optional[str]) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.inf
+
+    def rank(key: Tuple[Optional[str], bool]):
+        value, other = key
+        numeric = number(value) if spec.kind == FieldKind.NUMBER else math.inf
+        return (other, value is None, order.get(value, len(order)), numeric, -totals[key], value or "")
+
+    return [
+        CrosstabValue(
+            value=OTHER_VALUE if other else value,
+            label=labels.get(value) if not other else None,
+            other=other,
+            total=totals[(value, other)],
+        )
+        for value, other in sorted(totals, key=rank)
+    ]
+
+
+def _number_histogram(aggregates: FieldAggregates, bins: int, fraction: Optional[float] = None) -> List[HistogramBucket]:
+    low, high = _float(aggregates.minimum), _float(aggregates.maximum)
+    if low is None:
+        return []
+    # Kante su 1..bins preko [min, max]; kada su min i max isti postoji samo jedna
+    width = (high - low) / bins if high > low else 0.0
+    return [
+        HistogramBucket(
+            start=low + (bucket - 1) * width,
+            end=low + bucket * width if width else high,
+            count=_scaled(count, fraction)[0],
+        )
+        for bucket, count in aggregates.histogram
+    ]
+
+
+class AnalyticsService:
+    def __init__(
+        self,
+        analytics_repository: IAsyncAnalyticsRepository,
+        crosstab_cache: Optional["TTLCache[CrosstabResponse]"] = None,
+    ):
+        self.analytics_repository = analytics_repository
+        self.crosstab_cache = crosstab_cache
+
+    async def get_form_analytics(
+        self,
+        form: Form,
+        filters: Optional[List[SubmissionFilter]] = None,
+        bins: int = 10,
+        sample: Optional[float] = None,
+    ) -> FormAnalyticsResponse:
+        """
+        Per-field aggregates picked from the field types, computed by the database in one query.
+        Unfiltered requests on forms above ANALYTICS_SAMPLE_THRESHOLD_ROWS (or any request with
+        sample= below 100) are computed on a row sample of the form and the counts are returned as
+        estimates with intervals.
+        """
+        specs = plan_field_aggregates(form.fields or [])
+        sample_percent = await self._sample_percent(form, sample, filters)
+        total, aggregates = await self.analytics_repository.aggregate_fields(form.id, specs, filters, bins, sample_percent)
+        fraction = sample_percent / 100 if sample_percent is not None else None
+        return self._response(form, specs, total, aggregates, bins, source="live", fraction=fraction)
+
+    async def _sample_percent(
+        self,
+        form: Form,
+        sample: Optional[float],
+        filters: Optional[List[SubmissionFilter]] = None,
+    ) -> Optional[float]:
+        if sample is not None:
+            return sample if sample < 100 else None
+        threshold = settings.ANALYTICS_SAMPLE_THRESHOLD_ROWS
+        # Procena je za celu formu; filter moze da ostavi malo redova, a uzorak od njih premalo
+        if not threshold or filters:
+            return None
+        rows = await self.analytics_repository.estimate_form_rows(form.id)
+        if rows <= threshold:
+            return None
+        percent = settings.ANALYTICS_SAMPLE_TARGET_ROWS / rows * 100
+        return round(max(percent, 0.01), 4) if percent < 100 else None
+
+    async def get_form_summary(self, form: Form) -> FormAnalyticsResponse:
+        """
+        Fill rates, option counts and min/max/avg from the incrementally maintained store, in
+        O(fields); falls back to the single-pass query when the store is missing or stale.
+        """
+        specs = plan_field_aggregates(form.fields or [])
+        stored = await self.analytics_repository.get_stored_aggregates(form.id, form.version, specs)
+        if stored is None:
+            return await self.get_form_analytics(form)
+        total, aggregates = stored
+        return self._response(form, specs, total, aggregates, bins=0, source="store")
+
+    async def get_submission_rate(
+        self,
+        form: Form,
+        resolution: RollupResolution,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> SubmissionRateResponse:
+        """
+        Submissions per bucket in [start, end) (UTC), every bucket present, empty ones as 0. Read
+        from the rollups maintained on ingest; computed from submissions when the form has no
+        store or the range reaches past the minute rollup retention.
+        """
+        now = datetime.utcnow()
+        start, end = _utc(start), _utc(end)
+        end = resolution.truncate(end) if end else resolution.truncate(now) + resolution.step
+        start = resolution.truncate(start) if start else end - DEFAULT_WINDOWS[resolution]
+        if start >= end:
+            raise InvalidTimeRangeError("start must be before end.")
+        points = (end - start) // resolution.step
+        if points > settings.ANALYTICS_TIMESERIES_MAX_POINTS:
+            raise InvalidTimeRangeError(
+                f"The range spans {points} {resolution.value} buckets, at most "
+                f"{settings.ANALYTICS_TIMESERIES_MAX_POINTS} are allowed; use a coarser resolution."
+            )
+
+        counts = None
+        retention = timedelta(days=settings.ANALYTICS_MINUTE_ROLLUP_RETENTION_DAYS)
+        if settings.ANALYTICS_AGGREGATES_ENABLED and (resolution != RollupResolution.MINUTE or start >= now - retention):
+            counts = await self.analytics_repository.get_rollup_counts(form.id, resolution, start, end)
+        source = "store" if counts is not None else "live"
+        if counts is None:
+            counts = await self.analytics_repository.count_by_bucket(form.id, resolution, start, end)
+
+        by_bucket = dict(counts)
+        series = [
+            TimeSeriesPoint(bucket=bucket, count=by_bucket.get(bucket, 0))
+            for bucket in (start + resolution.step * index for index in range(points))
+        ]
+        return SubmissionRateResponse(
+            form_id=form.id,
+            resolution=resolution.value,
+            start=start,
+            end=end,
+            source=source,
+            total=sum(point.count for point in series),
+            points=series,
+        )
+
+    async def get_text_analytics(
+        self,
+        form: Form,
+        top: int = 10,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> TextAnalyticsResponse:
+        """
+        Distinct-value estimates and the most frequent values of text, email and tel fields over
+        [start, end] (inclusive days, UTC), merged from the daily sketches; exact values from
+        submissions when the form has no current store.
+        """
+        if start and end and start > end:
+            raise InvalidTimeRangeError("start must not be after end.")
+        specs = [spec for spec in plan_field_aggregates(form.fields or []) if spec.sketched]
+        field_ids = [spec.field_id for spec in specs]
+        fields_by_id = {field["id"]: field for field in form.fields or [] if field.get("id")}
+
+        sketches = None
+        if settings.ANALYTICS_AGGREGATES_ENABLED:
+            sketches = await self.analytics_repository.get_field_sketches(form.id, form.version, field_ids, start, end)
+
+        results = []
+        if sketches is not None:
+            for field_id in field_ids:
+                distinct, values = sketches[field_id]
+                estimate, error = distinct.estimate(), distinct.relative_error
+                results.append(TextFieldAnalytics(
+                    field_id=field_id,
+                    type=fields_by_id[field_id].get("type"),
+                    label=fields_by_id[field_id].get("label"),
+                    values=values.total,
+                    distinct=DistinctEstimate(
+                        estimate=estimate,
+                        low=max(0, int(estimate * (1 - 2 * error))),
+                        high=round(estimate * (1 + 2 * error)),
+                        relative_error=round(error, 4),
+                    ),
+                    top=[TopValue(value=value, count=count, min_count=low) for value, count, low in values.top(top)],
+                    unlisted_max=values.floor,
+                ))
+        else:
+            exact = await self.analytics_repository.exact_text_stats(form.id, field_ids, top, start, end)
+            for field_id in field_ids:
+                total, distinct, values = exact[field_id]
+                results.append(TextFieldAnalytics(
+                    field_id=field_id,
+                    type=fields_by_id[field_id].get("type"),
+                    label=fields_by_id[field_id].get("label"),
+                    values=total,
+                    distinct=DistinctEstimate(estimate=distinct, low=distinct, high=distinct, relative_error=0.0),
+                    top=[TopValue(value=value, count=count, min_count=count) for value, count in values],
+                    unlisted_max=values[-1][1] if len(values) == top else 0,
+                ))
+
+        return TextAnalyticsResponse(
+            form_id=form.id,
+            start=start,
+            end=end,
+            source="store" if sketches is not None else "live",
+            fields=results,
+        )
+
+    async def get_crosstab(
+        self,
+        form: Form,
+        row_field: str,
+        column_field: str,
+        limit: int = 20,
+        filters: Optional[List[SubmissionFilter]] = None,
+    ) -> CrosstabResponse:
+        """
+        Contingency table of two fields (submissions per pair of values), with at most `limit`
+        values per field. Cached per form version and submission watermark: a repeated request
+        costs one primary-key lookup until a submission of the form is written.
+        """
+        specs = {spec.field_id: spec for spec in plan_field_aggregates(form.fields or [])}
+        for field_id in (row_field, column_field):
+            if field_id not in specs:
+                raise InvalidCrosstabError(f"Form has no field '{field_id}'.")
+        if row_field == column_field:
+            raise InvalidCrosstabError("row and column must be different fields.")
+
+        key = None
+        if self.crosstab_cache is not None:
+            # Watermark se cita pre tabele: upis izmedju njih daje noviji rezultat pod starim kljucem, ne obrnuto
+            watermark = await self.analytics_repository.submission_watermark(form.id)
+            # Filter checkbox-a sa opcijama drzi liste (nisu hashable), pa kljuc dobija kanonski JSON filtera
+            filter_key = json.dumps([list(submission_filter) for submission_filter in filters or ()], default=str)
+            key = (form.id, form.version, row_field, column_field, limit, filter_key, watermark)
+            cached = self.crosstab_cache.get(key)
+            if cached is not None:
+                return cached.model_copy(update={"cached": True})
+
+        counts = await self.analytics_repository.crosstab(form.id, specs[row_field], specs[column_field], limit, filters)
+        response = self._crosstab_response(form, specs[row_field], specs[column_field], counts, limit)
+        if key is not None:
+            self.crosstab_cache.set(key, response)
+        return response
+
+    @staticmethod
+    def _crosstab_response(
+        form: Form,
+        row: FieldAggregateSpec,
+        column: FieldAggregateSpec,
+        counts: CrosstabCounts,
+        limit: int,
+    ) -> CrosstabResponse:
+        fields_by_id: Dict[str, Dict[str, Any]] = {field["id"]: field for field in form.fields or [] if field.get("id")}
+        row_totals, column_totals = Counter(), Counter()
+        for cell in counts.cells:
+            row_totals[(cell.row, cell.row_other)] += cell.count
+            column_totals[(cell.column, cell.column_other)] += cell.count
+        rows = _crosstab_axis(row, fields_by_id[row.field_id], row_totals)
+        columns = _crosstab_axis(column, fields_by_id[column.field_id], column_totals)
+
+        row_index = {(None if item.other else item.value, item.other): index for index, item in enumerate(rows)}
+        column_index = {(None if item.other else item.value, item.other): index for index, item in enumerate(columns)}
+        matrix = [[0] * len(columns) for _ in rows]
+        for cell in counts.cells:
+            matrix[row_index[(cell.row, cell.row_other)]][column_index[(cell.column, cell.column_other)]] += cell.count
+
+        return CrosstabResponse(
+            form_id=form.id,
+            row_field=row.field_id,
+            column_field=column.field_id,
+            rows=rows,
+            columns=columns,
+            counts=matrix,
+            total=sum(row_totals.values()),
+            row_values=counts.row_values,
+            column_values=counts.column_values,
+            truncated=counts.row_values > limit or counts.column_values > limit,
+        )
+
+    @staticmethod
+    def _response(
+        form: Form,
+        specs: List[FieldAggregateSpec],
+        total: int,
+        aggregates: Dict[str, FieldAggregates],
+        bins: int,
+        source: str,
+        fraction: Optional[float] = None,
+    ) -> FormAnalyticsResponse:
+        """ Builds the response; with a sample fraction, counts are scaled up and get 95% intervals. """
+        fields_by_id: Dict[str, Dict[str, Any]] = {field["id"]: field for field in form.fields or [] if field.get("id")}
+        # Korekcija za konacnu populaciju kod udela uzorka
+        correction = math.sqrt(1 - fraction) if fraction is not None else 1.0
+        # Store nema histograme ni percentile
+        histograms = source == "live"
+        results = []
+        for spec in specs:
+            field = fields_by_id[spec.field_id]
+            field_aggregates = aggregates[spec.field_id]
+            filled, filled_interval = _scaled(field_aggregates.filled, fraction)
+            fill_rate = field_aggregates.filled / total if total else 0.0
+            result = FieldAnalytics(
+                field_id=spec.field_id,
+                type=field.get("type"),
+                label=field.get("label"),
+                filled=filled,
+                fill_rate=round(fill_rate, 4),
+                filled_interval=filled_interval,
+            )
+            if fraction is not None and total:
+                result.fill_rate_interval = _interval(fill_rate, math.sqrt(fill_rate * (1 - fill_rate) / total) * correction, 0.0, 1.0)
+            if spec.kind == FieldKind.OPTIONS:
+                labels = {
+                    option.get("value"): option.get("label")
+                    for option in field.get("options") or [] if isinstance(option, dict)
+                }
+                result.options = []
+                for value, count in zip(spec.options, field_aggregates.option_counts):
+                    count, interval = _scaled(count, fraction)
+                    label = labels.get(value) if not isinstance(value, bool) else None
+                    result.options.append(OptionCount(value=value, label=label, count=count, interval=interval))
+            elif spec.kind == FieldKind.NUMBER:
+                result.number = NumberStats(
+                    min=_float(field_aggregates.minimum),
+                    max=_float(field_aggregates.maximum),
+                    avg=_float(field_aggregates.average),
+                    percentiles={
+                        f"p{round(percentile * 100)}": _float(value)
+                        for percentile, value in zip(PERCENTILES, field_aggregates.percentiles)
+                    },
+                )
+                if fraction is not None and field_aggregates.value_count and field_aggregates.stddev is not None:
+                    standard_error = float(field_aggregates.stddev) / math.sqrt(field_aggregates.value_count) * correction
+                    result.number.avg_interval = _interval(float(field_aggregates.average), standard_error, -math.inf)
+                if histograms:
+                    result.histogram = _number_histogram(field_aggregates, bins, fraction)
+            elif spec.kind == FieldKind.DATE:
+                result.date = DateStats(
+                    min=_date(field_aggregates.minimum),
+                    max=_date(field_aggregates.maximum),
+                    interval=field_aggregates.interval,
+                )
+                if histograms:
+                    result.histogram = [
+                        HistogramBucket(start=_date(bucket), count=_scaled(count, fraction)[0])
+                        for bucket, count in field_aggregates.histogram
+                    ]
+            results.append(result)
+
+        total_estimate, total_interval = _scaled(total, fraction)
+        return FormAnalyticsResponse(
+            form_id=form.id,
+            total_submissions=total_estimate,
+            source=source,
+            exact=fraction is None,
+            sample_percent=round(fraction * 100, 4) if fraction is not None else None,
+            sampled_rows=total if fraction is not None else None,
+            confidence=CONFIDENCE if fraction is not None else None,
+            total_interval=total_interval,
+            fields=results,
+        )
@@ -0,0 +1,67 @@
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Tuple, TypeVar
+
+from app.domain.models.form import Form
+
+T = TypeVar("T")
+
+_registry: "weakref.WeakSet[FormArtifactCache]" = weakref.WeakSet()
+
+
+class FormArtifactCache(Generic[T]):
+    """
+    Bounded LRU of artifacts derived from a form definition (compiled validators, rule sets...).
+    Entries are keyed by form id and form version, so an updated form is rebuilt on its next use
+    even if the explicit invalidation never reached this process.
+    """
+
+    def __init__(self, builder: Callable[[Form], T], max_entries: int = 1024):
+        self._builder = builder
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+        _registry.add(self)
+
+    def get(self, form: Form) -> T:
+        version = form.version
+        with self._lock:
+            entry = self._entries.get(form.id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(form.id)
+                return entry[1]
+
+        artifact = self._builder(form)
+        self.put(form, artifact)
+        return artifact
+
+    def put(self, form: Form, artifact: T) -> None:
+        """ Stores an artifact that was already built elsewhere (e.g. while validating a form on save). """
+        with self._lock:
+            self._entries[form.id] = (form.version, artifact)
+            self._entries.move_to_end(form.id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, form_id: int) -> None:
+        with self._lock:
+            self._entries.pop(form_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def invalidate_form_artifacts(form_id: int) -> None:
+    """ Drops everything derived from the given form from every artifact cache in this process. """
+    for cache in list(_registry):
+        cache.invalidate(form_id)
+
+
+def clear_form_artifacts() -> None:
+    for cache in list(_registry):
+        cache.clear()
@@ -1,23 +1,71 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from app.domain.models.form import Form
-from app.application.interfaces.form_repository import IFormRepository
+from app.application.interfaces.form_repository import IAsyncFormRepository
 from app.api.form_schema import FormSchemaCreate
+from app.application.services.form_similarity import form_similarity_index
+from app.application.services.rule_engine import CompiledRuleSet, FieldState, check_rule_cycles, get_rule_set, rule_set_cache
+from app.core.config import settings
 
 class FormService:
-    def __init__(self, form_repo: IFormRepository):
+    def __init__(self, form_repo: IAsyncFormRepository):
         self.form_repo = form_repo
 
-    def get_form_by_id(self, form_id: int) -> Optional[Form]:
-        return self.form_repo.get_by_id(form_id)
+    async def get_form_by_id(self, form_id: int) -> Optional[Form]:
+        return await self.form_repo.get_by_id(form_id)
 
-    def get_all_forms(self) -> List[Form]:
-        return self.form_repo.get_all()
+    async def get_all_forms(self) -> List[Form]:
+        return await self.form_repo.get_all()
 
-    def create_form(self, form_data: FormSchemaCreate) -> Form:
-        return self.form_repo.create(form_data)
+    async def create_form(self, form_data: FormSchemaCreate) -> Form:
+        rule_set = self._check_rules(form_data, existing_rules=None)
+        db_form = await self.form_repo.create(form_data)
+        rule_set_cache.put(db_form, rule_set)
+        self._index(db_form)
+        return db_form
 
-    def update_form(self, form_id: int, form_data: FormSchemaCreate) -> Optional[Form]:
-        return self.form_repo.update(form_id, form_data)
+    async def update_form(self, form_id: int, form_data: FormSchemaCreate) -> Optional[Form]:
+        existing = await self.form_repo.get_by_id(form_id)
+        if existing is None:
+            return None
+        rule_set = self._check_rules(form_data, existing_rules=existing.rules)
+        db_form = await self.form_repo.update(form_id, form_data)
+        if db_form is not None:
+            rule_set_cache.put(db_form, rule_set)
+            self._index(db_form)
+        return db_form
 
-    def delete_form_by_id(self, form_id: int) -> Optional[Form]:
-        return self.form_repo.delete(form_id)
+    @staticmethod
+    def _index(form: Form) -> None:
+        if settings.AI_SIMILAR_FORMS_ENABLED:
+            form_similarity_index.add(form.id, form.name, form.description, form.fields)
+
+    def _check_rules(self, form_data: FormSchemaCreate, existing_rules: Optional[List[Any]]) -> CompiledRuleSet:
+        """ Builds the rule dependency graph before saving; raises RuleCycleError on cycles. """
+        rules = form_data.rules if "rules" in form_data.model_fields_set or existing_rules is None else existing_rules
+        return check_rule_cycles([field.model_dump() for field in form_data.fields], rules or [])
+
+    async def delete_form_by_id(self, form_id: int) -> Optional[Form]:
+        db_form = await self.form_repo.delete(form_id)
+        if db_form is not None:
+            form_similarity_index.remove(form_id)
+        return db_form
+
+    async def evaluate_rules(self, form_id: int, data: Dict[str, Any]) -> Optional[Dict[str, FieldState]]:
+        """ Returns the visible/enabled/required state of every field for the given payload. """
+        form = await self.form_repo.get_by_id(form_id)
+        if form is None:
+            return None
+        return get_rule_set(form).evaluate(data)
+
+    async def evaluate_rule_changes(
+        self,
+        form_id: int,
+        data: Dict[str, Any],
+        changed_fields: List[str],
+        previous: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, FieldState]]:
+        """ Re-evaluates only the field states that depend on the changed fields. """
+        form = await self.form_repo.get_by_id(form_id)
+        if form is None:
+            return None
+        return get_rule_set(form).evaluate_changes(data, changed_fields, previous)
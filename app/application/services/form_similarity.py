@@ -0,0 +1,238 @@
+"""
+In-process TF-IDF index over stored forms (name, description and field labels). An AI prompt that
+describes a form we already have is answered with that form as a template instead of a model
+call. Pure Python, no network and no database access; FormService keeps it current in this
+process and the invalidation bus marks forms changed by other workers as stale.
+"""
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Reci koje opisuju bilo koju formu i ne razlikuju jednu od druge (engleski i srpski)
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "create", "for", "form", "forma", "formu",
+    "from", "generate", "i", "in", "is", "it", "make", "me", "my", "need", "of", "on", "or", "our",
+    "please", "the", "to", "we", "with", "your", "za", "sa", "se", "su", "da", "na", "od", "ili",
+    "je", "koja", "koji", "kao", "mi", "moj", "moja", "treba", "napravi", "ce", "po", "do", "iz",
+})
+# Grubo korenovanje odsecanjem: porukom/poruka -> poruk, registracija/registration -> regis
+STEM_LENGTH = 5
+# Naziv forme vredi vise od pojedinacne labele
+NAME_WEIGHT = 2
+# Norme dokumenata se preracunavaju kada se broj formi promeni za ovoliko (idf se menja sa korpusom)
+RENORMALIZE_GROWTH = 1.25
+
+
+def tokenize(text: str) -> List[str]:
+    """ Case, diacritics and inflection endings do not matter; stop words and numbers are dropped. """
+    folded = unicodedata.normalize("NFKD", text.casefold().replace("đ", "dj"))
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return [
+        token[:STEM_LENGTH] for token in _TOKEN.findall(folded)
+        if len(token) > 1 and token not in STOP_WORDS and not token.isdigit()
+    ]
+
+
+def form_terms(name: Optional[str], description: Optional[str], fields: Optional[Iterable[Any]]) -> Counter:
+    terms: Counter = Counter()
+    for token in tokenize(name or ""):
+        terms[token] += NAME_WEIGHT
+    terms.update(tokenize(description or ""))
+    for field in fields or []:
+        label = field.get("label") if isinstance(field, dict) else None
+        if isinstance(label, str):
+            terms.update(tokenize(label))
+    return terms
+
+
+def _sublinear(count: float) -> float:
+    return 1.0 + math.log(count)
+
+
+class SimilarForm(NamedTuple):
+    form_id: int
+    score: float
+
+
+class FormSimilarityIndex:
+    """
+    Inverted index with sublinear tf and smoothed idf; a query is scored by cosine similarity.
+    Query terms are scanned rarest first (MaxScore): every term keeps the largest normalized weight
+    it has in any form, and once the remaining terms together can no longer lift an unseen form
+    to min_score their posting lists are only looked up for forms already found, so frequent
+    words ("email", "ime") do not make a query walk most of the index.
+
+    Mutations happen on the event loop; other threads only call mark_stale/request_rebuild.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._documents: Dict[int, Dict[str, float]] = {}
+        self._norms: Dict[int, float] = {}
+        # Gornja granica tf * idf / norma po terminu (brisanje je ne smanjuje)
+        self._max_weights: Dict[str, float] = {}
+        self._normalized_size = 0
+        self._lock = threading.Lock()
+        self._stale: Set[int] = set()
+        self._rebuild_requested = False
+        # Forme izmenjene dok traje ponovna izgradnja; posle zamene se ponovo citaju
+        self._changed_during_rebuild: Optional[Set[int]] = None
+        self.ready = False
+        self.searches = 0
+        self.matches = 0
+        self.renormalizations = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._documents)) / (1 + len(self._postings.get(term, ())))) + 1.0
+
+    def _weigh(self, form_id: int, weights: Dict[str, float], idf: Callable[[str], float]) -> None:
+        norm = math.sqrt(sum((weight * idf(term)) ** 2 for term, weight in weights.items()))
+        self._norms[form_id] = norm
+        max_weights = self._max_weights
+        for term, weight in weights.items():
+            normalized = weight * idf(term) / norm
+            if normalized > max_weights.get(term, 0.0):
+                max_weights[term] = normalized
+
+    def _maybe_renormalize(self) -> None:
+        size = len(self._documents)
+        if self._normalized_size and 1 / RENORMALIZE_GROWTH <= size / self._normalized_size <= RENORMALIZE_GROWTH:
+            return
+        self.renormalize()
+
+    def renormalize(self) -> None:
+        """ Recomputes every form's norm and the term bounds with the current idf. """
+        idf = {term: self._idf(term) for term in self._postings}
+        self._norms, self._max_weights = {}, {}
+        for form_id, weights in self._documents.items():
+            self._weigh(form_id, weights, idf.__getitem__)
+        self._normalized_size = len(self._documents)
+        self.renormalizations += 1
+
+    def add(self, form_id: int, name: Optional[str], description: Optional[str], fields: Optional[Iterable[Any]]) -> None:
+        """ Indexes a form, replacing its previous version. """
+        self.remove(form_id)
+        terms = form_terms(name, description, fields)
+        if not terms:
+            return
+        weights = {term: _sublinear(count) for term, count in terms.items()}
+        self._documents[form_id] = weights
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[form_id] = weight
+        self._weigh(form_id, weights, self._idf)
+        self._track_change(form_id)
+
+    def remove(self, form_id: int) -> None:
+        weights = self._documents.pop(form_id, None)
+        if weights is None:
+            return
+        for term in weights:
+            posting = self._postings[term]
+            del posting[form_id]
+            if not posting:
+                del self._postings[term]
+                self._max_weights.pop(term, None)
+        self._norms.pop(form_id, None)
+        self._track_change(form_id)
+
+    def _track_change(self, form_id: int) -> None:
+        if self._changed_during_rebuild is not None:
+            self._changed_during_rebuild.add(form_id)
+
+    def search(self, text: str, min_score: float, limit: int = 1) -> List[SimilarForm]:
+        """ Up to `limit` forms whose cosine similarity to the text is at least min_score, best first. """
+        self.searches += 1
+        terms = Counter(tokenize(text))
+        if not terms or not self._documents:
+            return []
+        self._maybe_renormalize()
+
+        query = {term: _sublinear(count) * self._idf(term) for term, count in terms.items()}
+        query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+        known = sorted((term for term in query if term in self._postings), key=lambda term: len(self._postings[term]))
+        # Najveci doprinos koji preostali termini mogu da daju formi koja jos nije pronadjena
+        bounds = {term: query[term] * self._max_weights[term] / query_norm for term in known}
+        remaining = sum(bounds.values())
+        scores: Dict[int, float] = {}
+        for term in known:
+            weight = query[term] * self._idf(term)
+            posting = self._postings[term]
+            if remaining >= min_score:
+                for form_id, tf in posting.items():
+                    scores[form_id] = scores.get(form_id, 0.0) + weight * tf
+            elif len(posting) < len(scores):
+                for form_id, tf in posting.items():
+                    if form_id in scores:
+                        scores[form_id] += weight * tf
+            else:
+                for form_id in scores:
+                    tf = self._documents[form_id].get(term)
+                    if tf is not None:
+                        scores[form_id] += weight * tf
+            remaining -= bounds[term]
+
+        norms = self._norms
+        candidates = (
+            SimilarForm(form_id, min(score / (query_norm * norms[form_id]), 1.0))
+            for form_id, score in scores.items()
+        )
+        found = heapq.nlargest(limit, (match for match in candidates if match.score >= min_score), key=lambda match: match.score)
+        if found:
+            self.matches += 1
+        return found
+
+    def mark_stale(self, form_id: int) -> None:
+        """ The form was changed by another process; it is re-read on the next take_stale. Thread-safe. """
+        with self._lock:
+            self._stale.add(form_id)
+
+    def take_stale(self) -> Set[int]:
+        with self._lock:
+            stale, self._stale = self._stale, set()
+        return stale
+
+    def request_rebuild(self) -> None:
+        """ Changes may have been missed (e.g. the invalidation listener reconnected). Thread-safe. """
+        with self._lock:
+            self._rebuild_requested = True
+
+    def take_rebuild_request(self) -> bool:
+        with self._lock:
+            requested, self._rebuild_requested = self._rebuild_requested, False
+        return requested
+
+    def begin_rebuild(self) -> None:
+        self._changed_during_rebuild = set()
+
+    def replace(self, other: "FormSimilarityIndex") -> None:
+        """ Swaps in a freshly built index; forms changed here while it was being built are marked stale. """
+        changed = self._changed_during_rebuild or set()
+        self._changed_during_rebuild = None
+        self._postings, self._documents = other._postings, other._documents
+        self._norms, self._max_weights = other._norms, other._max_weights
+        self._normalized_size = other._normalized_size
+        with self._lock:
+            self._stale |= changed
+        self.ready = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "forms": len(self._documents),
+            "terms": len(self._postings),
+            "stale": len(self._stale),
+            "searches": self.searches,
+            "matches": self.matches,
+            "renormalizations": self.renormalizations,
+        }
+
+
+form_similarity_index = FormSimilarityIndex()
@@ -0,0 +1,64 @@
+import logging
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from pydantic import ValidationError
+
+from app.api.form_schema import FormSchemaCreate
+from app.application.interfaces.form_repository import IAsyncFormRepository
+from app.application.services.form_similarity import FormSimilarityIndex, SimilarForm
+from app.domain.models.form import Form
+
+logger = logging.getLogger(__name__)
+
+# Nekoliko kandidata, za slucaj da je najblizi u medjuvremenu obrisan ili ne prolazi validaciju
+CANDIDATES = 3
+
+
+class FormTemplate(NamedTuple):
+    form_id: int
+    score: float
+    form: FormSchemaCreate
+
+
+def form_template(form: Form) -> FormSchemaCreate:
+    """ An existing form as a definition the builder can save as a new form. """
+    return FormSchemaCreate(
+        name=form.name,
+        description=form.description,
+        fields=form.fields,
+        rules=form.rules or [],
+        theme=form.theme,
+    )
+
+
+class FormTemplateService:
+    """ Looks up an existing form close enough to an AI prompt to be offered instead of generating one. """
+
+    def __init__(
+        self,
+        index: FormSimilarityIndex,
+        form_repo: IAsyncFormRepository,
+        min_score: float,
+        refresh: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        self.index = index
+        self.form_repo = form_repo
+        self.min_score = min_score
+        self.refresh = refresh
+
+    async def find_template(self, prompt: str) -> Optional[FormTemplate]:
+        if self.refresh is not None:
+            await self.refresh()
+        if not self.index.ready:
+            return None
+        match: SimilarForm
+        for match in self.index.search(prompt, self.min_score, limit=CANDIDATES):
+            form = await self.form_repo.get_by_id(match.form_id)
+            if form is None:
+                self.index.remove(match.form_id)
+                continue
+            try:
+                return FormTemplate(match.form_id, match.score, form_template(form))
+            except ValidationError as e:
+                logger.warning("Form %s cannot be used as a template: %s", match.form_id, e)
+        return None
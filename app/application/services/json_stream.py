@@ -0,0 +1,73 @@
+import json
+from typing import Any, List, Optional
+
+
+class IncrementalArrayParser:
+    """
+    Incremental scanner of a streamed JSON object that returns every element of one top-level
+    array (e.g. "fields") as soon as the element's closing brace arrives. Only string, escape and
+    nesting state is kept between chunks, so each character is looked at once; the buffered text
+    is what the final json.loads of the whole document parses.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        # Poslednji string na nivou korena i kljuc kome pripada sledeca vrednost
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._in_array = False
+        self._element_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """ Appends a chunk and returns the array elements completed by it, parsed. """
+        self.text += chunk
+        completed = []
+        text = self.text
+        for position in range(self._position, len(text)):
+            char = text[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start + 1:position]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif char in "{[":
+                if self._depth == 1 and char == "[" and self._current_key == self.key:
+                    self._in_array = True
+                elif self._in_array and self._depth == 2:
+                    self._element_start = position
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._in_array and self._depth == 2 and self._element_start is not None:
+                    completed.append(self._parse(text[self._element_start:position + 1]))
+                    self._element_start = None
+                elif self._in_array and self._depth == 1:
+                    self._in_array = False
+            elif char == "," and self._depth == 1:
+                self._current_key = None
+        self._position = len(text)
+        return [element for element in completed if element is not None]
+
+    @staticmethod
+    def _parse(fragment: str) -> Any:
+        try:
+            return json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
@@ -0,0 +1,296 @@
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from app.api.form_schema import FormRule, RuleCondition, RuleConditionGroup, RuleConditionOperator, RuleActionType
+from app.application.services.form_artifact_cache import FormArtifactCache
+from app.application.services.submission_validator import collect_constraints
+from app.domain.models.form import Form
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+class FieldState(NamedTuple):
+    visible: bool
+    enabled: bool
+    required: bool
+
+
+def _normalize(value: Any) -> Any:
+    """ Brings form values to a comparable form: numeric strings become numbers, 'true'/'false' booleans. """
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "false"):
+            return lowered == "true"
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def _equals(actual: Any, expected: Any) -> bool:
+    return actual == expected or _normalize(actual) == _normalize(expected)
+
+
+def _compare(actual: Any, expected: Any, greater: bool) -> bool:
+    left, right = _normalize(actual), _normalize(expected)
+    # Brojevi se porede numericki, stringovi (npr. ISO datumi) leksikografski
+    if isinstance(left, float) and isinstance(right, float) or isinstance(left, str) and isinstance(right, str):
+        return left > right if greater else left < right
+    return False
+
+
+def _contains(actual: Any, expected: Any) -> bool:
+    if isinstance(actual, str):
+        return str(expected).lower() in actual.lower()
+    if isinstance(actual, list):
+        return any(_equals(item, expected) for item in actual)
+    return False
+
+
+OPERATORS: Dict[RuleConditionOperator, Callable[[Any, Any], bool]] = {
+    RuleConditionOperator.EQUALS: _equals,
+    RuleConditionOperator.NOT_EQUALS: lambda actual, expected: not _equals(actual, expected),
+    RuleConditionOperator.GREATER_THAN: lambda actual, expected: _compare(actual, expected, greater=True),
+    RuleConditionOperator.LESS_THAN: lambda actual, expected: _compare(actual, expected, greater=False),
+    RuleConditionOperator.CONTAINS: _contains,
+}
+
+
+def _compile_condition(node: Union[RuleCondition, RuleConditionGroup]) -> Predicate:
+    if isinstance(node, RuleCondition):
+        operator = OPERATORS[node.operator]
+        field_id, expected = node.fieldId, node.value
+        return lambda data: operator(data.get(field_id), expected)
+
+    children = tuple(_compile_condition(child) for child in node.conditions)
+    return _combine(children, node.operator)
+
+
+def _combine(children: Tuple[Predicate, ...], operator: str) -> Predicate:
+    if len(children) == 1:
+        return children[0]
+    if operator == "or":
+        return lambda data: any(child(data) for child in children)
+    return lambda data: all(child(data) for child in children)
+
+
+def _condition_fields(node: Union[RuleCondition, RuleConditionGroup]) -> Iterable[str]:
+    if isinstance(node, RuleCondition):
+        yield node.fieldId
+    else:
+        for child in node.conditions:
+            yield from _condition_fields(child)
+
+
+def parse_rule(raw: Any) -> Optional[FormRule]:
+    """
+    Accepts both the FormRule shape and the legacy single-condition shape used by the seeded forms
+    ({"condition": {"field", "operator", "value"}, "target", "action"}). Unparseable rules are skipped.
+    """
+    if isinstance(raw, FormRule):
+        return raw
+    if not isinstance(raw, dict):
+        return None
+    if "condition" in raw and "target" in raw:
+        condition = raw["condition"] or {}
+        raw = {
+            "id": raw.get("id") or f"{raw['target']}:{raw.get('action')}",
+            "conditions": [{"fieldId": condition.get("field"), "operator": condition.get("operator"), "value": condition.get("value")}],
+            "actions": [{"targetFieldId": raw["target"], "type": raw.get("action")}],
+        }
+    try:
+        return FormRule.model_validate(raw)
+    except ValidationError:
+        return None
+
+
+class RuleCycleError(ValueError):
+    """ Raised when rules form a dependency cycle between fields (A controls B controls ... A). """
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__("Form rules contain a dependency cycle: " + " -> ".join(cycle))
+
+
+class _TargetPlan(NamedTuple):
+    show: Tuple[int, ...]
+    hide: Tuple[int, ...]
+    enable: Tuple[int, ...]
+    disable: Tuple[int, ...]
+    set_required: Tuple[Tuple[int, bool], ...]
+
+
+class CompiledRuleSet:
+    """
+    Rules of one form compiled into flat predicates. Every rule's condition tree is evaluated at
+    most once per payload; field states are then derived from the rule results:
+
+    - a field targeted by 'show' rules is visible only while one of them matches, 'hide' wins;
+    - 'enable'/'disable' work the same way for the enabled flag;
+    - a matching 'setRequired' sets required to its value (true when omitted), the last one wins.
+    """
+
+    def __init__(self, fields: List[Dict[str, Any]], rules: List[FormRule]):
+        self.rules = rules
+        self.base_states: Dict[str, FieldState] = {
+            field["id"]: FieldState(
+                visible=field.get("visible", True) is not False,
+                enabled=not field.get("disabled", False),
+                required=bool(collect_constraints(field).get("required")),
+            )
+            for field in fields if field.get("id")
+        }
+        self.predicates: Tuple[Predicate, ...] = tuple(
+            _combine(tuple(_compile_condition(node) for node in rule.conditions), "and") if rule.conditions else (lambda data: True)
+            for rule in rules
+        )
+        self.condition_fields: Tuple[frozenset, ...] = tuple(
+            frozenset(field_id for node in rule.conditions for field_id in _condition_fields(node))
+            for rule in rules
+        )
+
+        plans: Dict[str, Dict[str, list]] = {}
+        for index, rule in enumerate(rules):
+            for action in rule.actions:
+                plan = plans.setdefault(action.targetFieldId, {"show": [], "hide": [], "enable": [], "disable": [], "set_required": []})
+                if action.type == RuleActionType.SHOW:
+                    plan["show"].append(index)
+                elif action.type == RuleActionType.HIDE:
+                    plan["hide"].append(index)
+                elif action.type == RuleActionType.ENABLE:
+                    plan["enable"].append(index)
+                elif action.type == RuleActionType.DISABLE:
+                    plan["disable"].append(index)
+                elif action.type == RuleActionType.SET_REQUIRED:
+                    plan["set_required"].append((index, True if action.value is None else bool(action.value)))
+        self.plans: Dict[str, _TargetPlan] = {
+            target: _TargetPlan(**{kind: tuple(indices) for kind, indices in plan.items()})
+            for target, plan in plans.items()
+        }
+
+        # Graf zavisnosti: polje -> ciljna polja cija stanja zavise od njegove vrednosti
+        dependents: Dict[str, set] = {}
+        for index, rule in enumerate(rules):
+            targets = {action.targetFieldId for action in rule.actions}
+            for field_id in self.condition_fields[index]:
+                dependents.setdefault(field_id, set()).update(targets)
+        self.dependents: Dict[str, frozenset] = {field_id: frozenset(targets) for field_id, targets in dependents.items()}
+
+    def _target_state(self, field_id: str, plan: _TargetPlan, matched: Callable[[int], bool]) -> FieldState:
+        base = self.base_states.get(field_id, FieldState(True, True, False))
+        visible = any(matched(i) for i in plan.show) if plan.show else base.visible
+        if visible and any(matched(i) for i in plan.hide):
+            visible = False
+        enabled = any(matched(i) for i in plan.enable) if plan.enable else base.enabled
+        if enabled and any(matched(i) for i in plan.disable):
+            enabled = False
+        required = base.required
+        for index, value in plan.set_required:
+            if matched(index):
+                required = value
+        return FieldState(visible, enabled, required)
+
+    def evaluate(self, data: Dict[str, Any]) -> Dict[str, FieldState]:
+        results = [predicate(data) for predicate in self.predicates]
+        matched = results.__getitem__
+        states = dict(self.base_states)
+        for field_id, plan in self.plans.items():
+            states[field_id] = self._target_state(field_id, plan, matched)
+        return states
+
+    def evaluate_changes(
+        self,
+        data: Dict[str, Any],
+        changed_fields: Iterable[str],
+        previous: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, FieldState]:
+        """
+        Re-evaluates only the fields whose rules reference one of the changed fields. With the
+        previous values of the changed fields, only states that actually flipped are returned.
+        """
+        targets = set()
+        for field_id in changed_fields:
+            targets.update(self.dependents.get(field_id, ()))
+        if not targets:
+            return {}
+
+        states = self._evaluate_targets(data, targets)
+        if previous is None:
+            return states
+        before = self._evaluate_targets({**data, **previous}, targets)
+        return {field_id: state for field_id, state in states.items() if before[field_id] != state}
+
+    def _evaluate_targets(self, data: Dict[str, Any], targets: Iterable[str]) -> Dict[str, FieldState]:
+        results: Dict[int, bool] = {}
+
+        def matched(index: int) -> bool:
+            result = results.get(index)
+            if result is None:
+                result = results[index] = self.predicates[index](data)
+            return result
+
+        return {field_id: self._target_state(field_id, self.plans[field_id], matched) for field_id in targets}
+
+    def find_cycle(self) -> Optional[List[str]]:
+        """ Returns one dependency cycle as a list of field ids (first id repeated at the end), or None. """
+        visiting, done = set(), set()
+        path: List[str] = []
+
+        def visit(field_id: str) -> Optional[List[str]]:
+            visiting.add(field_id)
+            path.append(field_id)
+            for target in sorted(self.dependents.get(field_id, ())):
+                if target in visiting:
+                    return path[path.index(target):] + [target]
+                if target not in done:
+                    cycle = visit(target)
+                    if cycle:
+                        return cycle
+            visiting.discard(field_id)
+            done.add(field_id)
+            path.pop()
+            return None
+
+        for field_id in sorted(self.dependents):
+            if field_id not in done:
+                cycle = visit(field_id)
+                if cycle:
+                    return cycle
+        return None
+
+    def evaluate_many(self, payloads: Iterable[Dict[str, Any]]) -> List[Dict[str, FieldState]]:
+        """ Bulk path for exports and re-validation: one compiled rule set, many payloads. """
+        evaluate = self.evaluate
+        return [evaluate(data) for data in payloads]
+
+
+def compile_rule_set(fields: List[Dict[str, Any]], rules: List[Any]) -> CompiledRuleSet:
+    """ Collects field-level and form-level rules (in that order) and compiles them. """
+    raw_rules = [rule for field in fields for rule in (field.get("rules") or [])] + list(rules or [])
+    parsed = [rule for rule in (parse_rule(raw) for raw in raw_rules) if rule is not None]
+    return CompiledRuleSet(fields, parsed)
+
+
+def check_rule_cycles(fields: List[Dict[str, Any]], rules: List[Any]) -> CompiledRuleSet:
+    """
+    Save-time check. Clients clear the values of fields that get hidden, so a cycle between fields
+    would make the form state oscillate; such forms are rejected.
+    """
+    rule_set = compile_rule_set(fields, rules)
+    cycle = rule_set.find_cycle()
+    if cycle:
+        raise RuleCycleError(cycle)
+    return rule_set
+
+
+rule_set_cache: FormArtifactCache[CompiledRuleSet] = FormArtifactCache(
+    lambda form: compile_rule_set(form.fields or [], form.rules or [])
+)
+
+
+def get_rule_set(form: Form) -> CompiledRuleSet:
+    return rule_set_cache.get(form)
@@ -0,0 +1,115 @@
+"""
+Mergeable sketches for free-text fields: HyperLogLog for distinct counts and Space-Saving for
+the most frequent values. Both merge associatively, so per-day sketches written by different
+workers combine into the sketch of any range of days.
+"""
+import hashlib
+import math
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+HLL_PRECISION = 12
+TOP_CAPACITY = 100
+# Predugacke vrednosti se u top listi cuvaju skracene
+TOP_VALUE_MAX_LENGTH = 256
+
+
+def _hash64(value: str) -> int:
+    # Stabilan hash (hash() je nasumican po procesu), isti u svim worker-ima
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """ Dense HyperLogLog with 2^precision one-byte registers; relative standard error 1.04 / sqrt(m). """
+
+    def __init__(self, registers: Optional[bytes] = None, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError(f"Expected {self.m} HyperLogLog registers, got {len(self.registers)}.")
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def add(self, value: str) -> None:
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.m != self.m:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision.")
+        return HyperLogLog(bytes(map(max, self.registers, other.registers)), self.precision)
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.m and zeros:
+            # Mali kardinaliteti: linear counting
+            return round(self.m * math.log(self.m / zeros))
+        return round(raw)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary of at most `capacity` counters. Every count is an upper bound and
+    count - error a lower bound of the true frequency; a value that is not listed occurred at
+    most `floor` times. Merging adds counts, charging a missing value the other side's floor.
+    """
+
+    def __init__(self, counters: Optional[Dict[str, List[int]]] = None, total: int = 0, capacity: int = TOP_CAPACITY):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = counters or {}
+        self.total = total
+
+    @classmethod
+    def from_counts(cls, counts: Counter, capacity: int = TOP_CAPACITY) -> "SpaceSaving":
+        """ Exact counts of a batch, keeping the top `capacity` (what is dropped is at most the floor). """
+        top = counts.most_common(capacity)
+        return cls({value: [count, 0] for value, count in top}, sum(counts.values()), capacity)
+
+    @property
+    def floor(self) -> int:
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        own_floor, other_floor = self.floor, other.floor
+        combined = {}
+        for value in self.counters.keys() | other.counters.keys():
+            own = self.counters.get(value, (own_floor, own_floor))
+            theirs = other.counters.get(value, (other_floor, other_floor))
+            combined[value] = [own[0] + theirs[0], own[1] + theirs[1]]
+        capacity = max(self.capacity, other.capacity)
+        top = sorted(combined.items(), key=lambda item: (-item[1][0], item[0]))[:capacity]
+        return SpaceSaving(dict(top), self.total + other.total, capacity)
+
+    def top(self, limit: int) -> List[Tuple[str, int, int]]:
+        """ (value, upper bound, lower bound), most frequent first. """
+        ranked = sorted(self.counters.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [(value, count, count - error) for value, (count, error) in ranked]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "counters": [[value, count, error] for value, (count, error) in self.counters.items()],
+        }
+
+    @classmethod
+    def from_json(cls, state: Optional[Dict[str, Any]]) -> "SpaceSaving":
+        if not state:
+            return cls()
+        counters = {value: [count, error] for value, count, error in state.get("counters", [])}
+        return cls(counters, state.get("total", 0), state.get("capacity", TOP_CAPACITY))
+
@@ -0,0 +1,128 @@
+import math
+from datetime import date
+from enum import Enum
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from app.api.form_schema import FieldType
+
+
+class FilterOperator(str, Enum):
+    EQUALS = "eq"
+    IN = "in"
+    GREATER_THAN = "gt"
+    GREATER_OR_EQUAL = "gte"
+    LESS_THAN = "lt"
+    LESS_OR_EQUAL = "lte"
+    PREFIX = "prefix"
+    CONTAINS = "contains"
+
+
+RANGE_OPERATORS = frozenset({
+    FilterOperator.GREATER_THAN,
+    FilterOperator.GREATER_OR_EQUAL,
+    FilterOperator.LESS_THAN,
+    FilterOperator.LESS_OR_EQUAL,
+})
+TEXT_OPERATORS = frozenset({FilterOperator.PREFIX, FilterOperator.CONTAINS})
+
+OPERATOR_SEPARATOR = "__"
+IN_SEPARATOR = ","
+
+
+class InvalidFilterError(ValueError):
+    pass
+
+
+class SubmissionFilter(NamedTuple):
+    """
+    One typed condition on a submission's data. For 'eq' and 'in', values holds the JSON values to
+    match (any of them); for range, prefix and contains it holds a single operand.
+    """
+    field_id: str
+    operator: FilterOperator
+    values: Tuple[Any, ...]
+    numeric: bool = False
+
+
+def _number(field_id: str, raw: str) -> Any:
+    try:
+        number = float(raw)
+    except ValueError:
+        number = math.nan
+    # float() prihvata i nan/inf, koje ni JSON ni numeric poredjenje ne mogu da iskoriste
+    if not math.isfinite(number):
+        raise InvalidFilterError(f"Filter on '{field_id}' expects a number, got {raw!r}.")
+    return int(number) if number.is_integer() else number
+
+
+def _boolean(field_id: str, raw: str) -> bool:
+    lowered = raw.strip().lower()
+    if lowered not in ("true", "false"):
+        raise InvalidFilterError(f"Filter on '{field_id}' expects true or false, got {raw!r}.")
+    return lowered == "true"
+
+
+def _date(field_id: str, raw: str) -> str:
+    try:
+        return date.fromisoformat(raw[:10]).isoformat() + raw[10:]
+    except ValueError:
+        raise InvalidFilterError(f"Filter on '{field_id}' expects a date in YYYY-MM-DD format, got {raw!r}.")
+
+
+def _parse_one(field: Dict[str, Any], operator: FilterOperator, raw: str) -> SubmissionFilter:
+    field_id = field["id"]
+    try:
+        field_type = FieldType(field.get("type"))
+    except ValueError:
+        field_type = None
+    multiple = field_type == FieldType.CHECKBOX and bool(field.get("options"))
+    raw_values = raw.split(IN_SEPARATOR) if operator == FilterOperator.IN else [raw]
+
+    if field_type == FieldType.NUMBER:
+        if operator in TEXT_OPERATORS:
+            raise InvalidFilterError(f"Operator '{operator.value}' is not supported on number field '{field_id}'.")
+        numbers = tuple(_number(field_id, value) for value in raw_values)
+        if operator in RANGE_OPERATORS:
+            return SubmissionFilter(field_id, operator, numbers, numeric=True)
+        # Broj moze biti sacuvan i kao string ("4"), pa se traze oba oblika
+        return SubmissionFilter(field_id, operator, tuple(v for number in numbers for v in (number, str(number))))
+
+    if operator in RANGE_OPERATORS and field_type != FieldType.DATE:
+        raise InvalidFilterError(f"Range filters are only supported on number and date fields, not on '{field_id}'.")
+
+    if field_type == FieldType.CHECKBOX and not multiple:
+        if operator not in (FilterOperator.EQUALS, FilterOperator.IN):
+            raise InvalidFilterError(f"Operator '{operator.value}' is not supported on checkbox field '{field_id}'.")
+        return SubmissionFilter(field_id, operator, tuple(_boolean(field_id, value) for value in raw_values))
+
+    if field_type == FieldType.DATE and operator not in TEXT_OPERATORS:
+        raw_values = [_date(field_id, value) for value in raw_values]
+
+    if multiple and operator in (FilterOperator.EQUALS, FilterOperator.IN):
+        # Checkbox sa opcijama cuva listu; containment {"f": ["a"]} pogadja svaku listu koja sadrzi "a"
+        return SubmissionFilter(field_id, operator, tuple([value] for value in raw_values))
+
+    return SubmissionFilter(field_id, operator, tuple(raw_values))
+
+
+def parse_filters(params: Iterable[Tuple[str, str]], fields: List[Dict[str, Any]]) -> List[SubmissionFilter]:
+    """
+    Parses query parameters of the form field=value or field__op=value (op: eq, in, gt, gte, lt,
+    lte, prefix, contains) into typed filters. Values are coerced using the form's field types;
+    unknown fields, operators and malformed values raise InvalidFilterError.
+    """
+    fields_by_id = {field["id"]: field for field in fields if field.get("id")}
+    filters = []
+    for key, raw in params:
+        field_id, _, operator_name = key.partition(OPERATOR_SEPARATOR)
+        field = fields_by_id.get(field_id)
+        if field is None:
+            raise InvalidFilterError(f"Unknown filter field '{field_id}'.")
+        try:
+            operator = FilterOperator(operator_name or FilterOperator.EQUALS)
+        except ValueError:
+            raise InvalidFilterError(f"Unknown filter operator '{operator_name}'.")
+        if raw == "":
+            raise InvalidFilterError(f"Filter on '{field_id}' has no value.")
+        filters.append(_parse_one(field, operator, raw))
+    return filters
@@ -1,15 +1,156 @@
-from typing import List, Dict, Any
-from app.api.submission_schema import SubmissionCreate
-from app.application.interfaces.submission_repository import ISubmissionRepository
+import base64
+import binascii
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from app.api.submission_schema import SubmissionCreate, SubmissionBatchItemResult, SubmissionPage
+from app.application.interfaces.submission_repository import IAsyncSubmissionRepository
+from app.application.services.rule_engine import get_rule_set
+from app.application.services.submission_filters import SubmissionFilter
+from app.application.services.submission_validator import get_form_validator
+from app.domain.models.form import Form
 from app.domain.models.submission import Submission
 
 
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(submission: Submission) -> str:
+    """ Opaque cursor pointing just past the given row in (submitted_at, id) DESC order. """
+    raw = json.dumps([submission.submitted_at.isoformat(), submission.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        submitted_at, submission_id = json.loads(raw)
+        return datetime.fromisoformat(submitted_at), int(submission_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor.")
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+# Checkbox sa opcijama cuva listu izabranih vrednosti; u CSV celiji su odvojene ovim separatorom
+CSV_LIST_SEPARATOR = "; "
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return CSV_LIST_SEPARATOR.join(item if isinstance(item, str) else json.dumps(item, ensure_ascii=False) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+async def _encode_csv(rows: AsyncIterator[Any], field_ids: List[str], chunk_size: int) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "submitted_at"] + field_ids)
+    count = 0
+    async for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        count += 1
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def _encode_ndjson(rows: AsyncIterator[Any], field_ids: List[str], chunk_size: int) -> AsyncIterator[str]:
+    lines = []
+    async for submission_id, submitted_at, *values in rows:
+        record = {"id": submission_id, "submitted_at": submitted_at.isoformat()}
+        record.update(zip(field_ids, values))
+        lines.append(json.dumps(record, ensure_ascii=False, default=str))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def gzip_chunks(chunks: AsyncIterator[str], level: int = 6) -> AsyncIterator[bytes]:
+    """ Compresses a text stream on the fly into a single gzip member. """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk.encode("utf-8"))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
 class SubmissionService:
-    def __init__(self, submission_repository: ISubmissionRepository):
+    def __init__(self, submission_repository: IAsyncSubmissionRepository):
         self.submission_repository = submission_repository
 
-    def create_submission(self, form_id: int, submission_data: SubmissionCreate) -> Submission:
-        return  self.submission_repository.create(form_id, submission_data)
+    async def create_submission(self, form_id: int, submission_data: SubmissionCreate) -> Submission:
+        return await self.submission_repository.create(form_id, submission_data)
+
+    def validate_submission(self, form: Form, submission_data: SubmissionCreate) -> Dict[str, str]:
+        """ Checks the payload against the form's compiled validator; returns field id -> error. """
+        return self._validate(form, [submission_data])[0]
+
+    def _validate(self, form: Form, submissions: List[SubmissionCreate]) -> List[Dict[str, str]]:
+        validate = get_form_validator(form)
+        rule_set = get_rule_set(form)
+        payloads = [submission.data for submission in submissions]
+        if not rule_set.rules:
+            return [validate(data) for data in payloads]
+        # Vidljivost i obaveznost polja zavise od pravila forme
+        return [validate(data, states) for data, states in zip(payloads, rule_set.evaluate_many(payloads))]
+
+    async def create_submissions(self, form: Form, submissions: List[SubmissionCreate]) -> List[SubmissionBatchItemResult]:
+        """ Validates each item and writes the valid ones with a single bulk insert. """
+        results = [SubmissionBatchItemResult(index=index) for index in range(len(submissions))]
+        accepted = []
+        for result, errors in zip(results, self._validate(form, submissions)):
+            if errors:
+                result.error = "; ".join(f"{field_id}: {message}" for field_id, message in errors.items())
+                continue
+            accepted.append(result)
+
+        ids = await self.submission_repository.create_many(form.id, [submissions[result.index] for result in accepted])
+        for result, submission_id in zip(accepted, ids):
+            result.id = submission_id
+        return results
     
-    async def get_submissions_by_form_id(self, form_id: int, filters: Dict[str, Any] = None) -> List[type[Submission]]:
-        return  await self.submission_repository.get_all_by_form_id(form_id)
\ No newline at end of file
+    async def get_submission_page(self, form_id: int, limit: int, cursor: Optional[str] = None) -> SubmissionPage:
+        after = decode_cursor(cursor) if cursor else None
+        # Jedan red vise od trazenog govori da li postoji sledeca strana
+        rows = await self.submission_repository.get_page_by_form_id(form_id, limit + 1, after)
+        items = rows[:limit]
+        next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+        return SubmissionPage(items=items, next_cursor=next_cursor)
+
+    def export_submissions(
+        self,
+        form: Form,
+        export_format: str = "csv",
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[SubmissionFilter]] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[str]:
+        """
+        Streams the form's submissions as CSV or NDJSON text chunks. Columns default to every field
+        of the form, so the CSV header needs no read-ahead; memory use is bounded by chunk_size.
+        """
+        field_ids = columns or [field["id"] for field in form.fields or [] if field.get("id")]
+        rows = self.submission_repository.stream_by_form_id(form.id, filters, chunk_size, columns=field_ids)
+        encode = _encode_csv if export_format == "csv" else _encode_ndjson
+        return encode(rows, field_ids, chunk_size)
+
+    async def get_submissions_by_form_id(self, form_id: int, filters: Optional[List[SubmissionFilter]] = None) -> List[Submission]:
+        return await self.submission_repository.get_all_by_form_id(form_id, filters)
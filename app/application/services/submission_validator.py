@@ -0,0 +1,203 @@
+import math
+import re
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.api.form_schema import FieldType
+from app.application.services.form_artifact_cache import FormArtifactCache
+from app.domain.models.form import Form
+
+SubmissionValidator = Callable[..., Dict[str, str]]
+ValueCheck = Callable[[Any], Optional[str]]
+
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+TEXT_TYPES = {FieldType.TEXT, FieldType.TEXTAREA, FieldType.EMAIL, FieldType.TEL, FieldType.PASSWORD}
+
+REQUIRED_MESSAGE = "This field is required."
+UNKNOWN_FIELD_MESSAGE = "Unknown field."
+
+
+def collect_constraints(field: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merges the constraints a field can carry: top-level keys (required, minLength, min... as used
+    by the seeded forms) and entries of the 'validations' list ({"type": "minLength", "value": 3}
+    or just "required").
+    """
+    constraints = {
+        key: field[key]
+        for key in ("required", "minLength", "maxLength", "min", "max", "pattern")
+        if field.get(key) is not None
+    }
+    for validation in field.get("validations") or []:
+        if isinstance(validation, str):
+            constraints[validation] = True
+        elif isinstance(validation, dict):
+            name = validation.get("type") or validation.get("name")
+            if name:
+                constraints[name] = validation.get("value", True)
+    return constraints
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return None
+    if isinstance(value, int):
+        return value
+    # nan/inf (i kao string, i kao JSON NaN/Infinity) bi prosli svaku min/max proveru
+    if isinstance(value, float) and math.isfinite(value):
+        return value
+    return None
+
+
+def _number_check(minimum: Optional[float], maximum: Optional[float]) -> ValueCheck:
+    def check(value: Any) -> Optional[str]:
+        number = _to_number(value)
+        if number is None:
+            return "Must be a number."
+        if minimum is not None and number < minimum:
+            return f"Must be at least {minimum}."
+        if maximum is not None and number > maximum:
+            return f"Must be at most {maximum}."
+        return None
+    return check
+
+
+def _text_checks(field_type: FieldType, constraints: Dict[str, Any]) -> List[ValueCheck]:
+    min_length = constraints.get("minLength")
+    max_length = constraints.get("maxLength")
+    pattern = constraints.get("pattern")
+    try:
+        regex = re.compile(pattern) if isinstance(pattern, str) else None
+    except re.error:
+        regex = None
+
+    def check(value: Any) -> Optional[str]:
+        if not isinstance(value, str):
+            return "Must be a string."
+        if min_length is not None and len(value) < min_length:
+            return f"Must be at least {min_length} characters long."
+        if max_length is not None and len(value) > max_length:
+            return f"Must be at most {max_length} characters long."
+        if regex is not None and regex.fullmatch(value) is None:
+            return "Has an invalid format."
+        return None
+
+    checks = [check]
+    if field_type == FieldType.EMAIL or constraints.get("email"):
+        checks.append(lambda value: None if EMAIL_PATTERN.fullmatch(value) else "Must be a valid email address.")
+    return checks
+
+
+def _options_check(options: List[Any], multiple: bool) -> ValueCheck:
+    allowed = [option.get("value") if isinstance(option, dict) else option for option in options]
+    try:
+        allowed_set = frozenset(allowed)
+        is_allowed = allowed_set.__contains__
+    except TypeError:
+        is_allowed = allowed.__contains__
+
+    def check(value: Any) -> Optional[str]:
+        values = value if multiple and isinstance(value, list) else [value]
+        for item in values:
+            try:
+                if not is_allowed(item):
+                    return f"Value {item!r} is not one of the allowed options."
+            except TypeError:
+                return f"Value {item!r} is not one of the allowed options."
+        return None
+    return check
+
+
+def _checkbox_check(value: Any) -> Optional[str]:
+    return None if isinstance(value, bool) else "Must be true or false."
+
+
+def _date_check(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return "Must be a date in YYYY-MM-DD format."
+    # Ceo string: datum ili datum sa vremenom, bez ostatka posle njega
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return "Must be a date in YYYY-MM-DD format."
+    return None
+
+
+def _compile_field(field: Dict[str, Any]) -> Tuple[str, bool, bool, Tuple[ValueCheck, ...]]:
+    try:
+        field_type = FieldType(field.get("type"))
+    except ValueError:
+        field_type = None
+    constraints = collect_constraints(field)
+    options = field.get("options") or []
+
+    checks: List[ValueCheck] = []
+    if field_type == FieldType.NUMBER:
+        checks.append(_number_check(_to_number(constraints.get("min")), _to_number(constraints.get("max"))))
+    elif field_type in TEXT_TYPES:
+        checks.extend(_text_checks(field_type, constraints))
+    elif field_type in (FieldType.SELECT, FieldType.RADIO) and options:
+        checks.append(_options_check(options, multiple=False))
+    elif field_type == FieldType.CHECKBOX:
+        checks.append(_options_check(options, multiple=True) if options else _checkbox_check)
+    elif field_type == FieldType.DATE:
+        checks.append(_date_check)
+
+    # Obavezan checkbox bez opcija (npr. saglasnost sa uslovima) mora biti cekiran
+    false_is_empty = field_type == FieldType.CHECKBOX and not options
+    return field["id"], bool(constraints.get("required")), false_is_empty, tuple(checks)
+
+
+def compile_form_validator(fields: List[Dict[str, Any]]) -> SubmissionValidator:
+    """
+    Turns a form's field definitions into a validation function. All schema interpretation
+    (types, options, constraints, regexes) happens here once; the returned function only walks
+    a flat tuple of precompiled checks and returns a field id -> error message mapping.
+
+    When rule-derived field states are passed in, hidden fields are skipped and the state's
+    required flag replaces the one from the field definition.
+    """
+    compiled = tuple(_compile_field(field) for field in fields if field.get("id"))
+    known_fields = frozenset(field_id for field_id, _, _, _ in compiled)
+
+    def validate(data: Dict[str, Any], field_states: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        errors: Dict[str, str] = {}
+        for field_id, required, false_is_empty, checks in compiled:
+            if field_states is not None:
+                state = field_states.get(field_id)
+                if state is not None:
+                    if not state.visible:
+                        continue
+                    required = state.required
+            value = data.get(field_id)
+            if value is None or value == "" or value == [] or (false_is_empty and value is False):
+                if required:
+                    errors[field_id] = REQUIRED_MESSAGE
+                continue
+            for check in checks:
+                message = check(value)
+                if message is not None:
+                    errors[field_id] = message
+                    break
+        for key in data.keys() - known_fields:
+            errors[key] = UNKNOWN_FIELD_MESSAGE
+        return errors
+
+    return validate
+
+
+form_validator_cache: FormArtifactCache[SubmissionValidator] = FormArtifactCache(
+    lambda form: compile_form_validator(form.fields or [])
+)
+
+
+def get_form_validator(form: Form) -> SubmissionValidator:
+    return form_validator_cache.get(form)
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import computed_field
 
@@ -11,14 +11,110 @@ class Settings(BaseSettings):
     DB_NAME: str
 
     GEMINI_API_KEY: str
+    AI_MODEL: str = "gemini-2.5-flash"
+    # gemini ili fake (deterministicki lokalni model, bez mreze, za testove i load test)
+    AI_BACKEND: str = "gemini"
+    AI_FAKE_LATENCY_MS: int = 200
+    # Najvise ovoliko poziva modela istovremeno po procesu; ostali cekaju slobodno mesto
+    AI_MAX_CONCURRENT_CALLS: int = 8
+    # Ukljucuje i cekanje na slobodno mesto
+    AI_REQUEST_TIMEOUT_SECONDS: float = 60
+    # Pozadinski poslovi generisanja (ai_jobs); worker-i rade u svakom API procesu
+    AI_JOB_WORKERS_ENABLED: bool = True
+    AI_JOB_WORKERS: int = 4
+    # Ukupno pokusaja po poslu (nevalidan JSON ili odgovor koji ne odgovara semi se ponavlja)
+    AI_JOB_MAX_ATTEMPTS: int = 3
+    AI_JOB_POLL_SECONDS: float = 2
+    # Running posao stariji od ovoga (worker je pao) preuzima drugi worker; mora biti > AI_REQUEST_TIMEOUT_SECONDS
+    AI_JOB_LEASE_SECONDS: float = 180
+    # Kes generisanih formi po normalizovanom promptu i verziji seme; AI_CACHE_PATH (SQLite) dodaje nivo na disku
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_MAX_ENTRIES: int = 1024
+    AI_CACHE_TTL_SECONDS: float = 86400
+    AI_CACHE_PATH: str = ""
+    # Prompt koji opisuje postojecu formu (TF-IDF slicnost >= AI_SIMILAR_FORM_MIN_SCORE) dobija nju kao sablon, bez poziva modela
+    AI_SIMILAR_FORMS_ENABLED: bool = True
+    AI_SIMILAR_FORM_MIN_SCORE: float = 0.6
+
+    # Connection pool (po worker procesu). Request path koristi async pool; sinhroni pool
+    # sluzi seed-u, skriptama i ingest thread-u, pa je manji.
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_SYNC_POOL_SIZE: int = 2
+    DB_SYNC_POOL_MAX_OVERFLOW: int = 3
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # PgBouncer (pool_mode=transaction): bez server-side prepared statement-a
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = False
+
+    # Read replike: postgresql://... URL-ovi odvojeni zarezom; prazno = sve ide na primary
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_COOLDOWN_SECONDS: float = 30
+    # Koliko dugo posle upisa klijent cita sa primary-ja (read-your-writes cookie)
+    DB_READ_YOUR_WRITES_SECONDS: int = 10
 
     RUN_SEED: bool = False
     CLEAR_DATA: bool = False
+
+    SUBMISSION_BATCH_MAX_SIZE: int = 1000
+    SUBMISSION_PAGE_DEFAULT_SIZE: int = 50
+    SUBMISSION_PAGE_MAX_SIZE: int = 500
+    SUBMISSION_EXPORT_CHUNK_SIZE: int = 1000
+
+    # In-process form cache (get_by_id)
+    FORM_CACHE_ENABLED: bool = True
+    FORM_CACHE_MAX_ENTRIES: int = 1024
+    FORM_CACHE_TTL_SECONDS: float = 300
+    # Cross-worker invalidation over Postgres LISTEN/NOTIFY
+    FORM_INVALIDATION_BUS_ENABLED: bool = True
+    FORM_INVALIDATION_CHANNEL: str = "formforge_form_invalidation"
+    # LISTEN ne radi kroz PgBouncer u transaction modu; tada ovde ide direktan DSN ka Postgres-u
+    FORM_INVALIDATION_LISTEN_URL: Optional[str] = None
+
+    # Write-behind ingest (POST /api/submissions/{form_id}/submissions/ingest)
+    SUBMISSION_INGEST_BUFFER_ENABLED: bool = False
+    SUBMISSION_INGEST_QUEUE_SIZE: int = 10000
+    SUBMISSION_INGEST_BATCH_SIZE: int = 500
+    SUBMISSION_INGEST_FLUSH_INTERVAL_MS: int = 50
+    SUBMISSION_INGEST_RECEIPT_HISTORY: int = 100000
+
+    # Agregati analitike (form_aggregates tabele): upis submisija dodaje deltu, kompaktor je sabira.
+    # Iskljuceno dok benchmarks/aggregate_ingest_benchmark.py ne pokaze cenu na ciljnoj bazi.
+    # Posle ukljucivanja na postojecoj bazi: uv run rebuild-aggregates --all
+    ANALYTICS_AGGREGATES_ENABLED: bool = False
+    # Koliko cesto pozadinski kompaktor sabira delte (toliko agregati kasne); 0 = samo uv run compact-aggregates
+    ANALYTICS_AGGREGATE_COMPACTION_INTERVAL_SECONDS: float = 5
+    ANALYTICS_AGGREGATE_COMPACTION_BATCH_SIZE: int = 1000
+    # Minutni rollup-ovi stariji od ovoga se brisu (uv run prune-rollups); stariji upiti idu na submisije
+    ANALYTICS_MINUTE_ROLLUP_RETENTION_DAYS: int = 14
+    ANALYTICS_TIMESERIES_MAX_POINTS: int = 5000
+    # Analitika forme sa vise od ovoliko submisija se racuna na uzorku redova forme; 0 = nikad automatski.
+    # Zahtev sa filterima se automatski ne uzorkuje (broj filtriranih redova se ne zna unapred)
+    ANALYTICS_SAMPLE_THRESHOLD_ROWS: int = 2_000_000
+    # Koliko redova forme uzorak treba da ima
+    ANALYTICS_SAMPLE_TARGET_ROWS: int = 200_000
+    # Crosstab rezultati se kesiraju po formi i watermark-u submisija (form_aggregates.revision)
+    ANALYTICS_CROSSTAB_CACHE_ENABLED: bool = True
+    ANALYTICS_CROSSTAB_CACHE_MAX_ENTRIES: int = 512
+    # Za forme bez store-a watermark ne vidi izmene submisija na mestu; TTL ogranicava zastarelost
+    ANALYTICS_CROSSTAB_CACHE_TTL_SECONDS: float = 600
     
     @computed_field
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @computed_field
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @computed_field
+    @property
+    def ASYNC_DATABASE_REPLICA_URLS(self) -> List[str]:
+        urls = [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+        return [url.replace("postgresql://", "postgresql+asyncpg://", 1) for url in urls]
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,166 @@
+"""
+Odrzavanje agregata analitike:
+
+    uv run rebuild-aggregates [form_id ...|--all]   ponovo racuna agregate iz submisija (backfill)
+    uv run check-aggregates [form_id ...|--all]     poredi agregate sa punim preracunavanjem u SQL-u
+    uv run compact-aggregates                       sabira delte koje kompaktor jos nije sabrao
+    uv run prune-rollups                            brise minutne rollup-ove starije od retencije
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.services.analytics_plan import (
+    FieldAggregateSpec, FieldAggregates, FieldKind, RollupResolution, plan_field_aggregates
+)
+from app.application.services.sketches import TOP_CAPACITY
+from app.domain.models.analytics_aggregate import SubmissionRollup
+from app.domain.models.form import Form
+from app.core.config import settings
+from app.infrastructure.database.async_session import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories.aggregate_store import (
+    COMPACTION_LOCK_NAMESPACE, AsyncAggregateStore, minute_rollup_cutoff
+)
+from app.infrastructure.repositories.analytics_repository import AsyncAnalyticsRepository
+
+AVERAGE_TOLERANCE = Decimal("1e-9")
+
+
+async def _form_ids(form_ids: Sequence[int]) -> List[int]:
+    if form_ids:
+        return list(form_ids)
+    async with AsyncSessionLocal() as session:
+        return list(await session.scalars(select(Form.id).order_by(Form.id)))
+
+
+async def rebuild_aggregates(form_ids: Sequence[int] = ()) -> Dict[int, Optional[int]]:
+    """ Rebuilds the given forms (all forms when empty), each in its own transaction. """
+    rebuilt = {}
+    for form_id in await _form_ids(form_ids):
+        async with AsyncSessionLocal() as session:
+            rebuilt[form_id] = await AsyncAggregateStore(session).rebuild(form_id)
+    return rebuilt
+
+
+def compare_aggregates(
+    specs: List[FieldAggregateSpec],
+    stored: Any,
+    live: Any,
+) -> List[str]:
+    """
+    Differences between the store and a full recompute. Counters must match exactly; min/max
+    only have to enclose the live values, since deletes never narrow them.
+    """
+    (stored_total, stored_fields), (live_total, live_fields) = stored, live
+    problems = []
+    if stored_total != live_total:
+        problems.append(f"submission count {stored_total} != {live_total}")
+    for spec in specs:
+        have: FieldAggregates = stored_fields[spec.field_id]
+        want: FieldAggregates = live_fields[spec.field_id]
+        prefix = f"field '{spec.field_id}':"
+        if have.filled != want.filled:
+            problems.append(f"{prefix} filled {have.filled} != {want.filled}")
+        for option, have_count, want_count in zip(spec.options, have.option_counts, want.option_counts):
+            if have_count != want_count:
+                problems.append(f"{prefix} option {option!r} {have_count} != {want_count}")
+        if spec.kind not in (FieldKind.NUMBER, FieldKind.DATE) or want.minimum is None:
+            continue
+        if have.minimum is None or have.minimum > want.minimum or have.maximum < want.maximum:
+            problems.append(f"{prefix} bounds [{have.minimum}, {have.maximum}] do not enclose [{want.minimum}, {want.maximum}]")
+        if spec.kind == FieldKind.NUMBER and abs((have.average or 0) - (want.average or 0)) > AVERAGE_TOLERANCE:
+            problems.append(f"{prefix} avg {have.average} != {want.average}")
+    return problems
+
+
+async def prune_rollups() -> int:
+    """ Deletes minute rollups older than the retention; hour and day rollups are kept. """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            delete(SubmissionRollup).where(
+                SubmissionRollup.resolution == RollupResolution.MINUTE.value,
+                SubmissionRollup.bucket < minute_rollup_cutoff(),
+            )
+        )
+        await session.commit()
+        return result.rowcount
+
+
+async def _compare_rollups(repository: AsyncAnalyticsRepository, form_id: int) -> List[str]:
+    problems = []
+    for resolution in RollupResolution:
+        start = minute_rollup_cutoff() if resolution == RollupResolution.MINUTE else datetime.min
+        stored = dict(await repository.get_rollup_counts(form_id, resolution, start, datetime.max))
+        live = dict(await repository.count_by_bucket(form_id, resolution, start))
+        for bucket in sorted(set(stored) | set(live)):
+            if stored.get(bucket, 0) != live.get(bucket, 0):
+                problems.append(f"{resolution.value} rollup {bucket.isoformat()}: {stored.get(bucket, 0)} != {live.get(bucket, 0)}")
+    return problems
+
+
+async def _compare_sketches(repository: AsyncAnalyticsRepository, form_id: int, version: int, specs: List[FieldAggregateSpec]) -> List[str]:
+    """
+    Sketches only see inserts, so after a delete or an update they still count the old values:
+    their totals are not compared and the checks are one-sided: the distinct estimate must not be
+    more than four standard errors below the exact count, and a listed count must not be below the
+    exact one.
+    """
+    field_ids = [spec.field_id for spec in specs if spec.sketched]
+    sketches = await repository.get_field_sketches(form_id, version, field_ids)
+    exact = await repository.exact_text_stats(form_id, field_ids, TOP_CAPACITY)
+    problems = []
+    for field_id in field_ids:
+        distinct, values = sketches[field_id]
+        _, exact_distinct, exact_top = exact[field_id]
+        prefix = f"field '{field_id}':"
+        if distinct.estimate() < exact_distinct - 4 * distinct.relative_error * exact_distinct - 1:
+            problems.append(f"{prefix} distinct estimate {distinct.estimate()} too far below {exact_distinct}")
+        exact_counts = dict(exact_top)
+        for value, count, _ in values.top(TOP_CAPACITY):
+            if value in exact_counts and exact_counts[value] > count:
+                problems.append(f"{prefix} top value {value!r} count {count} is below the exact {exact_counts[value]}")
+    return problems
+
+
+async def check_aggregates(form_ids: Sequence[int] = ()) -> Dict[int, List[str]]:
+    """ Problems per form; a form without a current store is reported as such. """
+    report = {}
+    for form_id in await _form_ids(form_ids):
+        async with async_engine.connect() as connection:
+            # Kompaktori cekaju dok traje provera: lock sesije se uzima pre snapshot-a, pa niko ne menja
+            # store posle njega i delte se mogu sabrati u snapshot-u bez konflikta
+            await connection.execute(select(func.pg_advisory_lock(COMPACTION_LOCK_NAMESPACE, form_id)))
+            await connection.commit()
+            try:
+                await connection.execution_options(isolation_level="REPEATABLE READ")
+                session = AsyncSession(bind=connection)
+                report[form_id] = await _check_form(session, form_id)
+            finally:
+                # Sabrane delte se vracaju; ostaju kompaktoru
+                await connection.rollback()
+                await connection.execution_options(isolation_level="READ COMMITTED")
+                await connection.execute(select(func.pg_advisory_unlock(COMPACTION_LOCK_NAMESPACE, form_id)))
+                await connection.commit()
+    return report
+
+
+async def _check_form(session: AsyncSession, form_id: int) -> List[str]:
+    """ Compares the store, with the pending deltas folded in, to a recompute in the same snapshot. """
+    form = (await session.execute(select(Form.fields, Form.version).where(Form.id == form_id))).first()
+    if form is None:
+        return ["form does not exist"]
+    await AsyncAggregateStore(session).fold_pending(form_id, settings.ANALYTICS_AGGREGATE_COMPACTION_BATCH_SIZE)
+    specs = plan_field_aggregates(form.fields or [])
+    repository = AsyncAnalyticsRepository(session)
+    stored = await repository.get_stored_aggregates(form_id, form.version, specs)
+    if stored is None:
+        return ["no aggregates for the current version of the form, run rebuild-aggregates"]
+    live = await repository.aggregate_fields(form_id, specs, bins=1)
+    return (
+        compare_aggregates(specs, stored, live)
+        + await _compare_rollups(repository, form_id)
+        + await _compare_sketches(repository, form_id, form.version, specs)
+    )
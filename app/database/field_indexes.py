@@ -0,0 +1,65 @@
+"""
+Per-field expression indexes za submisije jedne forme.
+
+Filteri jednakosti i pripadnosti (eq, in) idu preko GIN indeksa nad celom data kolonom. Range,
+prefix i contains filteri porede izraz nad jednim poljem (data ->> 'polje'), pa za polja po kojima
+se cesto filtrira ima smisla napraviti parcijalni indeks nad istim tim izrazom:
+
+    uv run index-field <form_id> <field_id> <numeric|text|prefix|trigram> [--drop]
+"""
+import hashlib
+import re
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.infrastructure.database.session import engine
+from app.infrastructure.repositories.submission_repository import numeric_value, text_value
+
+# kind -> (izraz nad poljem, metod indeksa, operator class)
+INDEX_KINDS = {
+    "numeric": (numeric_value, "btree", ""),      # gt/gte/lt/lte nad brojevima
+    "text": (text_value, "btree", ""),            # gt/gte/lt/lte nad datumima (ISO stringovi)
+    "prefix": (text_value, "btree", " text_pattern_ops"),
+    "trigram": (text_value, "gin", " gin_trgm_ops"),  # contains; zahteva CREATE EXTENSION pg_trgm
+}
+
+
+def field_index_name(form_id: int, field_id: str, kind: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "_", field_id.lower()).strip("_")[:24]
+    digest = hashlib.sha1(field_id.encode()).hexdigest()[:6]
+    return f"ix_submissions_f{form_id}_{slug}_{digest}_{kind}"
+
+
+def _render(expression) -> str:
+    return str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def field_index_ddl(form_id: int, field_id: str, kind: str, concurrently: bool = True) -> str:
+    """
+    CREATE INDEX for one field of one form. The indexed expression is rendered from the same
+    builders the repository filters with, so the planner can match them.
+    """
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Unknown index kind '{kind}', expected one of: {', '.join(INDEX_KINDS)}")
+    build, method, opclass = INDEX_KINDS[kind]
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {field_index_name(form_id, field_id, kind)} "
+        f"ON submissions USING {method} (({_render(build(field_id))}){opclass}) "
+        f"WHERE form_id = {int(form_id)}"
+    )
+
+
+def create_field_index(form_id: int, field_id: str, kind: str) -> str:
+    ddl = field_index_ddl(form_id, field_id, kind)
+    # CONCURRENTLY ne moze unutar transakcije
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(ddl))
+    return field_index_name(form_id, field_id, kind)
+
+
+def drop_field_index(form_id: int, field_id: str, kind: str) -> str:
+    name = field_index_name(form_id, field_id, kind)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    return name
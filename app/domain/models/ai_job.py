@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, Uuid
+from sqlalchemy.dialects.postgresql import JSONB
+from .base import Base
+
+
+class AIJob(Base):
+    """ Background AI form generation; status goes pending -> running -> done | failed (running -> pending on retry). """
+    __tablename__ = "ai_jobs"
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    prompt = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="pending", server_default="pending")
+    # Broj preuzimanja; svako je jedan poziv modela (ponavlja se kada odgovor nije validan)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Worker-i traze najstariji pending (ili istekli running) posao
+        Index("ix_ai_jobs_open", status, created_at, postgresql_where=status.in_(("pending", "running"))),
+    )
@@ -0,0 +1,76 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Index, Integer, LargeBinary, Numeric, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from .base import Base
+
+
+class FormAggregate(Base):
+    """ Incrementally maintained analytics of one form; valid only while fields_version == forms.version. """
+    __tablename__ = "form_aggregates"
+    form_id = Column(Integer, ForeignKey("forms.id", ondelete="CASCADE"), primary_key=True)
+    fields_version = Column(Integer, nullable=False)
+    submission_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    # Raste sa svakom kompakcijom delti i rebuild-om; watermark za kes analitike
+    revision = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class FieldAggregate(Base):
+    __tablename__ = "form_field_aggregates"
+    form_id = Column(Integer, ForeignKey("forms.id", ondelete="CASCADE"), primary_key=True)
+    field_id = Column(String, primary_key=True)
+    filled = Column(BigInteger, nullable=False, default=0, server_default="0")
+    # Number polja: broj numerickih vrednosti i njihova suma (avg = value_sum / value_count)
+    value_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    value_sum = Column(Numeric, nullable=False, default=0, server_default="0")
+    # Min/max se pri brisanju ne suzavaju; posle brisanja su granice, ne tacne vrednosti
+    value_min = Column(Numeric, nullable=True)
+    value_max = Column(Numeric, nullable=True)
+    date_min = Column(Date, nullable=True)
+    date_max = Column(Date, nullable=True)
+
+
+class OptionAggregate(Base):
+    __tablename__ = "form_option_aggregates"
+    form_id = Column(Integer, ForeignKey("forms.id", ondelete="CASCADE"), primary_key=True)
+    field_id = Column(String, primary_key=True)
+    # JSON oblik opcije ("a", true, 3), da se "true" i true ne bi spojili
+    option = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+class SubmissionRollup(Base):
+    """ Submissions of a form per minute/hour/day bucket (UTC, date_trunc of submitted_at). """
+    __tablename__ = "submission_rollups"
+    form_id = Column(Integer, ForeignKey("forms.id", ondelete="CASCADE"), primary_key=True)
+    resolution = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+class FieldSketch(Base):
+    """ Distinct-count (HyperLogLog) and top-values (Space-Saving) sketches of one text field for one day. """
+    __tablename__ = "field_sketches"
+    form_id = Column(Integer, ForeignKey("forms.id", ondelete="CASCADE"), primary_key=True)
+    field_id = Column(String, primary_key=True)
+    bucket = Column(Date, primary_key=True)
+    hll = Column(LargeBinary, nullable=False)
+    top = Column(JSONB, nullable=False)
+
+
+class AggregateDelta(Base):
+    """ One submission write not yet folded into the aggregates (append-only; the compactor deletes it). """
+    __tablename__ = "aggregate_deltas"
+    id = Column(BigInteger, primary_key=True)
+    form_id = Column(Integer, ForeignKey("forms.id", ondelete="CASCADE"), nullable=False)
+    # Payload-i dodatih i uklonjenih submisija (izmena je jedno i drugo)
+    added = Column(JSONB, nullable=False)
+    removed = Column(JSONB, nullable=False)
+    # submitted_at dodatih submisija (isti za ceo batch; NULL kod izmene) i svake uklonjene
+    added_at = Column(DateTime, nullable=True)
+    removed_at = Column(ARRAY(DateTime), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_aggregate_deltas_form_id_id", form_id, id),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, JSON, Integer
+from sqlalchemy import Column, String, JSON, Index, Integer
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base, relationship
 from .base import Base
 
@@ -8,8 +9,14 @@ class Form(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(String, nullable=True)
-    fields = Column(JSON, nullable=False)
+    fields = Column(JSONB, nullable=False)
     rules = Column(JSON, nullable=True, default=[])
     theme = Column(JSON, nullable=True)
+    # Povecava se pri svakoj izmeni; kljuc za kesirane artefakte forme (validator, pravila)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     submissions = relationship("Submission", back_populates="form")
 
+    __table_args__ = (
+        Index("ix_forms_fields_gin", fields, postgresql_using="gin"),
+    )
+
@@ -1,13 +1,34 @@
 from datetime import datetime
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, ColumnElement, DateTime, ForeignKey, Index, Integer, func, literal_column, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from .base import Base
 
+# Seed uzorka analitike; ugradjen je u indeks ispod, pa promena trazi novu migraciju
+SAMPLE_SEED = 42
+
+
+def sample_key(submission_id: ColumnElement) -> ColumnElement:
+    """ Seeded 32-bit hash of the submission id: rows below a key threshold form a sample of the form. """
+    # Konstante se renderuju u SQL-u, da se izraz poklopi sa indeksom i u generickom planu
+    hashed = func.hashint8extended(submission_id, literal_column(str(SAMPLE_SEED)))
+    return hashed.op("&")(literal_column(str(0xFFFFFFFF)))
+
+
 class Submission(Base):
     __tablename__ = "submissions"
     id = Column(Integer, primary_key=True, index=True)
-    submitted_at = Column(DateTime, default=datetime.utcnow)
-    data = Column(JSON, nullable=False)
+    submitted_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=text("timezone('utc', now())"))
+    data = Column(JSONB, nullable=False)
     form_id = Column(Integer, ForeignKey("forms.id"), nullable=False)
     form = relationship("Form", back_populates="submissions")
+
+    __table_args__ = (
+        # Keyset paginacija i listanje po formi: (form_id, submitted_at DESC, id DESC)
+        Index("ix_submissions_form_id_submitted_at_id", form_id, submitted_at.desc(), id.desc()),
+        # Filteri jednakosti/pripadnosti se prevode u data @> '{...}', sto jsonb_path_ops GIN pokriva
+        Index("ix_submissions_data_gin", data, postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"}),
+        # Uzorak forme za analitiku: opseg kljuca se cita iz indeksa, pa se ostali redovi forme ne citaju
+        Index("ix_submissions_form_id_sample_key", form_id, sample_key(id)),
+    )
     
\ No newline at end of file
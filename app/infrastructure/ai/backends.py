@@ -0,0 +1,17 @@
+from typing import Optional
+
+from app.application.interfaces.ai_backend import IAIBackend
+from app.core.config import settings
+from app.infrastructure.ai.fake_backend import FakeAIBackend
+from app.infrastructure.ai.gemini_backend import GeminiBackend
+
+AI_BACKENDS = ("gemini", "fake")
+
+
+def create_ai_backend(name: Optional[str] = None) -> IAIBackend:
+    name = (name or settings.AI_BACKEND).lower()
+    if name == "gemini":
+        return GeminiBackend(api_key=settings.GEMINI_API_KEY, model=settings.AI_MODEL)
+    if name == "fake":
+        return FakeAIBackend(latency_seconds=settings.AI_FAKE_LATENCY_MS / 1000)
+    raise ValueError(f"Unknown AI_BACKEND '{name}', expected one of: {', '.join(AI_BACKENDS)}")
@@ -0,0 +1,70 @@
+"""
+Deterministican lokalni "model" za testove i load test bez mreze (AI_BACKEND=fake): isti prompt
+uvek daje istu formu, a kasnjenje je podesivo (AI_FAKE_LATENCY_MS).
+"""
+import asyncio
+import json
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.application.interfaces.ai_backend import IAIBackend
+
+# (kljucne reci, polje) redom kojim se polja dodaju u formu
+FAKE_FIELDS = [
+    (("ime", "name", "prezime"), {"id": "ime", "type": "text", "label": "Ime i prezime", "validations": ["required"]}),
+    (("email", "e-mail", "mejl"), {
+        "id": "email", "type": "email", "label": "Email",
+        "validations": ["required", {"type": "pattern", "value": "^[^@\\s]+@[^@\\s]+$"}],
+    }),
+    (("telefon", "phone", "tel"), {"id": "telefon", "type": "tel", "label": "Telefon"}),
+    (("datum", "date", "rodjen", "rođen"), {"id": "datum", "type": "date", "label": "Datum"}),
+    (("drzava", "država", "country"), {
+        "id": "drzava", "type": "select", "label": "Država",
+        "options": [{"label": "Srbija", "value": "rs"}, {"label": "Hrvatska", "value": "hr"}, {"label": "Drugo", "value": "other"}],
+    }),
+    (("ocena", "rating", "zadovoljstvo"), {"id": "ocena", "type": "number", "label": "Ocena (1-5)"}),
+    (("poruka", "message", "komentar", "comment"), {"id": "poruka", "type": "textarea", "label": "Poruka"}),
+    (("saglasnost", "consent", "uslovi", "terms"), {"id": "saglasnost", "type": "checkbox", "label": "Slažem se sa uslovima"}),
+]
+DEFAULT_FIELD = {"id": "odgovor", "type": "text", "label": "Odgovor"}
+
+# Velicina delova u kojima fake stream vraca odgovor
+STREAM_CHUNK_SIZE = 48
+
+_USER_REQUEST = re.compile(r"User request: '(.*)'", re.S)
+
+
+def fake_form(prompt: str) -> Dict[str, Any]:
+    match = _USER_REQUEST.search(prompt)
+    request = (match.group(1) if match else prompt).strip()
+    lowered = request.lower()
+    fields: List[Dict[str, Any]] = [field for keywords, field in FAKE_FIELDS if any(word in lowered for word in keywords)]
+    return {
+        "name": request[:60] or "Forma",
+        "description": f"Generated locally for: {request[:200]}",
+        "fields": fields or [DEFAULT_FIELD],
+        "rules": [],
+    }
+
+
+class FakeAIBackend(IAIBackend):
+    """ Answers after a fixed latency, without network; counts the calls it received. A stream spreads the latency over its chunks. """
+
+    def __init__(self, latency_seconds: float = 0.2):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None, json_output: bool = False) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+        if json_output:
+            return json.dumps(fake_form(prompt), ensure_ascii=False)
+        return f"Fake response to: {prompt}"
+
+    async def stream(self, prompt: str, system_instruction: Optional[str] = None, json_output: bool = False) -> AsyncIterator[str]:
+        self.calls += 1
+        text = json.dumps(fake_form(prompt), ensure_ascii=False) if json_output else f"Fake response to: {prompt}"
+        chunks = [text[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(text), STREAM_CHUNK_SIZE)]
+        for chunk in chunks:
+            await asyncio.sleep(self.latency_seconds / len(chunks))
+            yield chunk
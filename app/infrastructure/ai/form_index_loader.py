@@ -0,0 +1,108 @@
+"""
+Puni indeks slicnih formi iz baze pri pokretanju i odrzava ga azurnim za forme koje su menjali
+drugi procesi (invalidation bus ih oznaci kao zastarele, ovde se ponovo citaju).
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.services.form_similarity import FormSimilarityIndex
+from app.domain.models.form import Form
+
+logger = logging.getLogger(__name__)
+
+# Samo tekst koji se indeksira; pravila i tema se ne ucitavaju
+_INDEXED_COLUMNS = (Form.id, Form.name, Form.description, Form.fields)
+
+
+def _add_rows(index: FormSimilarityIndex, rows: Sequence[Any]) -> None:
+    for row in rows:
+        index.add(row.id, row.name, row.description, row.fields)
+
+
+class FormSimilarityIndexLoader:
+    """
+    Builds a fresh index in the background (keyset batches, indexed in a thread) and swaps it in,
+    so startup and requests are not blocked; re-reads stale forms before each lookup.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], index: FormSimilarityIndex, batch_size: int = 1000):
+        self._session_factory = session_factory
+        self.index = index
+        self.batch_size = batch_size
+        self._build_task: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.last_build_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        """ (Re)builds the whole index in a background task; lookups use the current index meanwhile. """
+        if self._build_task is not None and not self._build_task.done():
+            return
+        self.index.begin_rebuild()
+        self._build_task = asyncio.create_task(self._build(), name="form-similarity-index-build")
+
+    async def stop(self) -> None:
+        if self._build_task is not None:
+            self._build_task.cancel()
+            await asyncio.gather(self._build_task, return_exceptions=True)
+            self._build_task = None
+
+    async def _build(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        fresh = FormSimilarityIndex()
+        try:
+            async with self._session_factory() as session:
+                after_id = 0
+                while True:
+                    rows = (await session.execute(
+                        select(*_INDEXED_COLUMNS).where(Form.id > after_id).order_by(Form.id).limit(self.batch_size)
+                    )).all()
+                    if not rows:
+                        break
+                    # Novi indeks jos nije deljen, pa se puni van event loop-a
+                    await asyncio.to_thread(_add_rows, fresh, rows)
+                    after_id = rows[-1].id
+            await asyncio.to_thread(fresh.renormalize)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning("Building the form similarity index failed: %s", e)
+            # Sledeci lookup pokusava ponovo
+            self.index.request_rebuild()
+            return
+        self.index.replace(fresh)
+        self.builds += 1
+        self.last_build_seconds = loop.time() - started
+        logger.info("Form similarity index built: %d forms in %.1fs", len(fresh), self.last_build_seconds)
+
+    async def refresh(self) -> None:
+        """ Re-reads forms other processes changed; starts a full rebuild when one was requested. """
+        if self.index.take_rebuild_request():
+            self.start()
+        stale = self.index.take_stale()
+        if not stale:
+            return
+        try:
+            async with self._session_factory() as session:
+                rows = (await session.execute(select(*_INDEXED_COLUMNS).where(Form.id.in_(stale)))).all()
+        except Exception:
+            for form_id in stale:
+                self.index.mark_stale(form_id)
+            raise
+        _add_rows(self.index, rows)
+        for form_id in stale - {row.id for row in rows}:
+            self.index.remove(form_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "building": self._build_task is not None and not self._build_task.done(),
+            "builds": self.builds,
+            "last_build_seconds": self.last_build_seconds,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,55 @@
+import threading
+from typing import AsyncIterator, Optional
+
+import google.genai as genai
+from google.genai import types
+
+from app.application.interfaces.ai_backend import IAIBackend
+
+
+class GeminiBackend(IAIBackend):
+    """ Gemini over the SDK's async client (client.aio); no thread is blocked for the round trip. """
+
+    def __init__(self, api_key: str, model: str):
+        self.api_key = api_key
+        self.model = model
+        self._client: Optional[genai.Client] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> genai.Client:
+        # Klijent se pravi pri prvom pozivu, ne pri importu
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    @staticmethod
+    def _config(system_instruction: Optional[str], json_output: bool) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            response_mime_type="application/json" if json_output else None,
+        )
+
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None, json_output: bool = False) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=self._config(system_instruction, json_output),
+        )
+        return response.text
+
+    async def stream(self, prompt: str, system_instruction: Optional[str] = None, json_output: bool = False) -> AsyncIterator[str]:
+        chunks = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config=self._config(system_instruction, json_output),
+        )
+        # aclose() ovog generatora ne zatvara unutrasnji; bez ovoga HTTP stream ostaje otvoren do GC-a
+        try:
+            async for chunk in chunks:
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            await chunks.aclose()
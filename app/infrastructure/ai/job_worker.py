@@ -0,0 +1,124 @@
+"""
+Pool AI worker-a u API procesu: N asyncio taskova preuzima poslove iz ai_jobs (FOR UPDATE SKIP
+LOCKED), pa vise procesa moze da radi nad istom tabelom. Konekcija se ne drzi dok traje poziv
+modela; posao koji je worker preuzeo pa pao vraca se u red kada istekne lease.
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.services.ai_service import AIService
+from app.domain.models.ai_job import AIJob
+from app.infrastructure.repositories.ai_job_repository import AsyncAIJobRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AIJobWorkerPool:
+    """
+    Bounded pool of job workers. A worker claims a job, generates the form (at most `workers` jobs
+    run at once per process, and AIService's semaphore still caps the model calls), and stores the
+    result. An invalid or failed answer puts the job back in the queue until max_attempts.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        ai_service: AIService,
+        workers: int,
+        poll_interval: float,
+        lease_seconds: float,
+        max_attempts: int,
+    ):
+        self._session_factory = session_factory
+        self._ai_service = ai_service
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self.busy = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._work(), name=f"ai-job-worker-{index}") for index in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """ A job was queued in this process; a waiting worker picks it up without waiting for the poll. """
+        self._wake.set()
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                async with self._session_factory() as session:
+                    job = await AsyncAIJobRepository(session).claim(self.lease_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Claiming an AI job failed: %s", e)
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+            self.busy += 1
+            try:
+                await self._process(job)
+            finally:
+                self.busy -= 1
+
+    async def _record(self, method: str, job: AIJob, *args) -> None:
+        try:
+            async with self._session_factory() as session:
+                if not await getattr(AsyncAIJobRepository(session), method)(job.id, job.attempts, *args):
+                    logger.info("AI job %s was claimed again, result of attempt %s dropped", job.id, job.attempts)
+        except Exception as e:
+            logger.warning("Storing the state of AI job %s failed: %s", job.id, e)
+
+    async def _process(self, job: AIJob) -> None:
+        try:
+            form_schema = await self._ai_service.generate_form_schema(job.prompt)
+        except asyncio.CancelledError as e:
+            if asyncio.current_task().cancelling():
+                # Gasenje procesa: posao se odmah vraca u red umesto da ceka istek lease-a
+                await self._record("fail", job, "Worker stopped before the job finished.", True)
+                raise
+            # Otkazan je deljeni poziv modela, a ne ovaj worker: obican neuspeh pokusaja
+            error: BaseException = e
+        except Exception as e:
+            error = e
+        else:
+            await self._record("finish", job, form_schema.model_dump(mode="json"))
+            self.completed += 1
+            return
+        retry = job.attempts < self.max_attempts
+        self.retried += retry
+        self.failed += not retry
+        await self._record("fail", job, str(error) or type(error).__name__, retry)
+        if retry:
+            self.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "busy": self.busy,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
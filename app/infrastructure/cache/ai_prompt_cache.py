@@ -0,0 +1,109 @@
+"""
+Kes rezultata AI generisanja formi: LRU u memoriji procesa ispred opcionog SQLite fajla na
+disku, koji prezivljava restart i deli se izmedju worker-a na istoj masini.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCache:
+    """
+    Two-tier cache of generated forms (JSON strings). Memory is checked first; a disk hit is
+    promoted back into memory. Both tiers expire entries after the same TTL. Async code uses
+    aget/aset, which run the disk tier in a thread so SQLite I/O (and its busy timeout) never
+    blocks the event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.memory: TTLCache[str] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self.disk_hits = 0
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Jedna konekcija po procesu, serijalizovana lock-om (poziva se iz vise thread-ova)
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS prompt_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_prompt_cache_expires_at ON prompt_cache (expires_at)")
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None or not self.path:
+            return value
+        try:
+            with self._lock:
+                row = self._disk().execute(
+                    "SELECT value FROM prompt_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Prompt cache read from %s failed: %s", self.path, e)
+            return None
+        if row is None:
+            return None
+        self.disk_hits += 1
+        self.memory.set(key, row[0])
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if not self.path:
+            return
+        try:
+            with self._lock, self._disk() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO prompt_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, time.time() + self.ttl_seconds),
+                )
+                connection.execute("DELETE FROM prompt_cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            # Disk je samo drugi nivo; greska ne sme da obori generisanje
+            logger.warning("Prompt cache write to %s failed: %s", self.path, e)
+
+    async def aget(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None or not self.path:
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str) -> None:
+        if not self.path:
+            self.memory.set(key, value)
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.path:
+            with self._lock, self._disk() as connection:
+                connection.execute("DELETE FROM prompt_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.memory.stats(), "disk_path": self.path, "disk_hits": self.disk_hits}
+
+
+ai_prompt_cache = PromptCache(
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+    path=settings.AI_CACHE_PATH or None,
+)
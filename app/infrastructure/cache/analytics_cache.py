@@ -0,0 +1,9 @@
+from app.api.analytics_schema import CrosstabResponse
+from app.core.config import settings
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+# Procesni kes crosstab rezultata; kljuc sadrzi watermark submisija forme, pa upis ne treba da ga invalidira
+crosstab_cache: TTLCache[CrosstabResponse] = TTLCache(
+    max_entries=settings.ANALYTICS_CROSSTAB_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYTICS_CROSSTAB_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,9 @@
+from app.core.config import settings
+from app.domain.models.form import Form
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+# Procesni kes formi (snapshot-ovi, ne objekti vezani za sesiju), deli ga svaki CachedFormRepository
+form_cache: TTLCache[Form] = TTLCache(
+    max_entries=settings.FORM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.FORM_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,191 @@
+import logging
+import os
+import select
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+import psycopg2
+from psycopg2 import sql
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.application.services.form_artifact_cache import invalidate_form_artifacts, clear_form_artifacts
+from app.application.services.form_similarity import form_similarity_index
+from app.core.config import settings
+from app.infrastructure.cache.form_cache import form_cache
+
+logger = logging.getLogger(__name__)
+
+# Oznaka ovog procesa; sopstvene notifikacije se preskacu jer je lokalni kes vec azuriran
+ORIGIN = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+FLUSH_ALL = "*"
+
+
+_NOTIFY = text("SELECT pg_notify(:channel, :payload)")
+
+
+def _notify_params(session, form_id: int) -> Optional[Dict[str, str]]:
+    if not settings.FORM_INVALIDATION_BUS_ENABLED or session.get_bind().dialect.name != "postgresql":
+        return None
+    return {"channel": settings.FORM_INVALIDATION_CHANNEL, "payload": f"{ORIGIN}:{form_id}"}
+
+
+def publish_form_invalidation(session: Session, form_id: int) -> None:
+    """
+    Queues a NOTIFY for the form inside the caller's transaction; Postgres delivers it to the
+    other workers only if (and when) that transaction commits.
+    """
+    params = _notify_params(session, form_id)
+    if params is not None:
+        session.execute(_NOTIFY, params)
+
+
+async def publish_form_invalidation_async(session: AsyncSession, form_id: int) -> None:
+    """ publish_form_invalidation for an AsyncSession. """
+    params = _notify_params(session, form_id)
+    if params is not None:
+        await session.execute(_NOTIFY, params)
+
+
+class FormInvalidationListener:
+    """
+    One LISTEN connection per worker process. Notifications from other workers evict the local
+    form cache and derived form artifacts. Whenever the connection has to be re-established the
+    listener flushes everything, since notifications sent while it was down are lost.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        on_invalidate: Callable[[int], None],
+        on_flush: Callable[[], None],
+        poll_interval: float = 1.0,
+        max_backoff: float = 30.0,
+    ):
+        self._dsn = dsn
+        self._channel = channel
+        self._on_invalidate = on_invalidate
+        self._on_flush = on_flush
+        self._poll_interval = poll_interval
+        self._max_backoff = max_backoff
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connection = None
+
+        self.connected = False
+        self.reconnects = 0
+        self.notifications = 0
+        self.flushes = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="form-invalidation-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None,
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "notifications": self.notifications,
+            "flushes": self.flushes,
+            "last_error": self.last_error,
+        }
+
+    def _connect(self) -> None:
+        connection = psycopg2.connect(self._dsn)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self._channel)))
+        self._connection = connection
+        self.connected = True
+
+    def _disconnect(self) -> None:
+        self.connected = False
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except psycopg2.Error:
+                pass
+            self._connection = None
+
+    def _run(self) -> None:
+        backoff = self._poll_interval
+        first_connect = True
+        while not self._stop.is_set():
+            try:
+                self._connect()
+                if not first_connect:
+                    self.reconnects += 1
+                    self._flush()
+                first_connect = False
+                backoff = self._poll_interval
+                self._listen()
+            except (psycopg2.Error, OSError) as e:
+                self.last_error = str(e)
+                logger.warning("Form invalidation listener lost its connection: %s", e)
+                self._disconnect()
+                first_connect = False
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self._max_backoff)
+        self._disconnect()
+
+    def _listen(self) -> None:
+        connection = self._connection
+        while not self._stop.is_set():
+            readable, _, _ = select.select([connection], [], [], self._poll_interval)
+            if not readable:
+                continue
+            connection.poll()
+            while connection.notifies:
+                self._handle(connection.notifies.pop(0).payload)
+
+    def _handle(self, payload: str) -> None:
+        self.notifications += 1
+        origin, _, form_id = payload.rpartition(":")
+        if origin == ORIGIN:
+            return
+        if form_id == FLUSH_ALL:
+            self._flush()
+            return
+        try:
+            self._on_invalidate(int(form_id))
+        except ValueError:
+            logger.warning("Ignoring malformed form invalidation payload %r", payload)
+
+    def _flush(self) -> None:
+        self.flushes += 1
+        self._on_flush()
+
+
+def _evict_form(form_id: int) -> None:
+    form_cache.pop(form_id)
+    invalidate_form_artifacts(form_id)
+    form_similarity_index.mark_stale(form_id)
+
+
+def _flush_forms() -> None:
+    form_cache.clear()
+    clear_form_artifacts()
+    form_similarity_index.request_rebuild()
+
+
+form_invalidation_listener = FormInvalidationListener(
+    dsn=settings.FORM_INVALIDATION_LISTEN_URL or settings.DATABASE_URL,
+    channel=settings.FORM_INVALIDATION_CHANNEL,
+    on_invalidate=_evict_form,
+    on_flush=_flush_forms,
+)
@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.infrastructure.database.pool import InstrumentedAsyncQueuePool, async_connect_args, engine_options
+
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    connect_args=async_connect_args(),
+    **engine_options(InstrumentedAsyncQueuePool, settings.DB_POOL_SIZE, settings.DB_POOL_MAX_OVERFLOW)
+)
+
+# expire_on_commit=False: posle commit-a atributi ostaju ucitani, nema lazy load-a (I/O) van await-a
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    """
+    Async varijanta get_db za endpoint-e: sesija nad asyncpg pool-om, upiti ne blokiraju event loop.
+    Sinhroni SessionLocal ostaje za seed, migracije i ingest thread.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,134 @@
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.config import settings
+
+
+class PoolStats:
+    """ Checkout counters of one pool: wait time, overflow connections and checkout timeouts. """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._waits: deque = deque(maxlen=window)
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, wait: float, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_events += overflowed
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self._waits.append(wait)
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts = self.checkouts
+
+        def percentile(fraction: float) -> float:
+            return round(waits[min(len(waits) - 1, int(len(waits) * fraction))] * 1000, 3) if waits else 0.0
+
+        return {
+            "checkouts": checkouts,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_seconds_total / checkouts * 1000, 3) if checkouts else 0.0,
+            "wait_ms_p50": percentile(0.50),
+            "wait_ms_p95": percentile(0.95),
+            "wait_ms_p99": percentile(0.99),
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+        }
+
+
+class _InstrumentedPoolMixin:
+    """ Times every checkout; a checkout that had to open a connection beyond pool_size counts as overflow. """
+
+    stats: PoolStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout(time.perf_counter() - start)
+            raise
+        overflow = self.overflow()
+        self.stats.record_checkout(time.perf_counter() - start, overflowed=overflow > 0 and overflow > overflow_before)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() pravi novi pool; brojaci se prenose
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(poolclass: Type[Pool], pool_size: int, max_overflow: int) -> Dict[str, Any]:
+    return {
+        "poolclass": poolclass,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def async_connect_args() -> Dict[str, Any]:
+    """
+    PgBouncer u transaction modu ne garantuje da je sledeca transakcija na istoj server konekciji,
+    pa asyncpg ne sme da kesira prepared statement-e niti da ih ponovo koristi po imenu.
+    """
+    if not settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        return {}
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """ Current occupancy of a pool plus its checkout counters. """
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            timeout_seconds=pool.timeout(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
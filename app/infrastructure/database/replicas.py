@@ -0,0 +1,130 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.infrastructure.database.async_session import AsyncSessionLocal, get_async_db
+from app.infrastructure.database.pool import InstrumentedAsyncQueuePool, async_connect_args, engine_options, pool_status
+
+logger = logging.getLogger(__name__)
+
+READ_PRIMARY_COOKIE = "ff_read_primary"
+READ_PRIMARY_HEADER = "x-read-primary"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReplicaRouter:
+    """
+    Round-robin over the read replicas with passive health checks: a replica that fails to hand
+    out a connection is skipped for cooldown_seconds. With no healthy replica, reads go to the primary.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], cooldown_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.engines = engines
+        self._cooldown = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cursor = itertools.count()
+        self._unhealthy_until: Dict[int, float] = {}
+        self._failures: Dict[int, int] = {}
+        self._last_errors: Dict[int, str] = {}
+        self.primary_fallbacks = 0
+
+    def pick(self) -> Optional[AsyncEngine]:
+        now = self._clock()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = next(self._cursor) % len(self.engines)
+                if self._unhealthy_until.get(index, 0.0) <= now:
+                    return self.engines[index]
+            if self.engines:
+                self.primary_fallbacks += 1
+        return None
+
+    def mark_failed(self, engine: AsyncEngine, error: BaseException) -> None:
+        index = self.engines.index(engine)
+        logger.warning("Read replica %s is unavailable, skipping it for %ss: %s", engine.url.host, self._cooldown, error)
+        with self._lock:
+            self._unhealthy_until[index] = self._clock() + self._cooldown
+            self._failures[index] = self._failures.get(index, 0) + 1
+            self._last_errors[index] = str(error)
+
+    def status(self) -> List[Dict[str, Any]]:
+        now = self._clock()
+        return [
+            {
+                "host": engine.url.host,
+                "healthy": self._unhealthy_until.get(index, 0.0) <= now,
+                "retry_in_seconds": round(max(self._unhealthy_until.get(index, 0.0) - now, 0.0), 1),
+                "failures": self._failures.get(index, 0),
+                "last_error": self._last_errors.get(index),
+                "pool": pool_status(engine.pool),
+            }
+            for index, engine in enumerate(self.engines)
+        ]
+
+
+replica_router = ReplicaRouter(
+    engines=[
+        create_async_engine(
+            url,
+            connect_args=async_connect_args(),
+            **engine_options(InstrumentedAsyncQueuePool, settings.DB_POOL_SIZE, settings.DB_POOL_MAX_OVERFLOW)
+        )
+        for url in settings.ASYNC_DATABASE_REPLICA_URLS
+    ],
+    cooldown_seconds=settings.DB_REPLICA_COOLDOWN_SECONDS,
+)
+
+
+def wants_primary(request: Request) -> bool:
+    """
+    Writes read from the primary too. Read-your-writes: the client wrote recently (cookie) or
+    explicitly asks for the primary (header).
+    """
+    return (
+        request.method not in SAFE_METHODS
+        or READ_PRIMARY_COOKIE in request.cookies
+        or request.headers.get(READ_PRIMARY_HEADER) == "1"
+    )
+
+
+async def get_async_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Session for read-only queries: a healthy replica when one is configured, otherwise the
+    request's primary session. The connection is taken up front so an unreachable replica
+    fails over here and not in the middle of the endpoint.
+    """
+    if not replica_router.engines or wants_primary(request):
+        yield db
+        return
+
+    engine = replica_router.pick()
+    while engine is not None:
+        session = AsyncSessionLocal(bind=engine)
+        try:
+            await session.connection()
+        except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+            await session.close()
+            replica_router.mark_failed(engine, e)
+            engine = replica_router.pick()
+            continue
+        try:
+            yield session
+        finally:
+            await session.close()
+        return
+
+    yield db
+
+
+async def dispose_replicas() -> None:
+    for engine in replica_router.engines:
+        await engine.dispose()
@@ -1,8 +1,12 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.infrastructure.database.pool import InstrumentedQueuePool, engine_options
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL,
+    **engine_options(InstrumentedQueuePool, settings.DB_SYNC_POOL_SIZE, settings.DB_SYNC_POOL_MAX_OVERFLOW)
+)
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,87 @@
+"""
+Periodicno sabira aggregate_deltas u agregate analitike (vidi aggregate_store). Vise procesa moze
+da ga pokrece istovremeno: formu koju vec sabira drugi kompaktor ovaj preskace.
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.domain.models.analytics_aggregate import AggregateDelta
+from app.infrastructure.database.async_session import AsyncSessionLocal
+from app.infrastructure.repositories.aggregate_store import AsyncAggregateStore
+
+logger = logging.getLogger(__name__)
+
+
+async def compact_pending(session_factory: Callable[[], AsyncSession], batch_size: int) -> Dict[int, Optional[int]]:
+    """ Compacts every form with pending deltas, each in its own transaction; None marks a skipped form. """
+    async with session_factory() as session:
+        form_ids: List[int] = list(await session.scalars(select(AggregateDelta.form_id).distinct()))
+    folded = {}
+    for form_id in form_ids:
+        async with session_factory() as session:
+            folded[form_id] = await AsyncAggregateStore(session).compact(form_id, batch_size)
+    return folded
+
+
+class AggregateCompactor:
+    """ Background task that folds pending aggregate deltas every interval seconds. """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], interval: float, batch_size: int):
+        self._session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.deltas_folded = 0
+        self.last_run_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(), name="aggregate-compactor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                folded = await compact_pending(self._session_factory, self.batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning("Compacting aggregate deltas failed: %s", e)
+            else:
+                self.runs += 1
+                self.deltas_folded += sum(count or 0 for count in folded.values())
+                self.last_run_seconds = loop.time() - started
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "deltas_folded": self.deltas_folded,
+            "last_run_seconds": self.last_run_seconds,
+            "last_error": self.last_error,
+        }
+
+
+aggregate_compactor = AggregateCompactor(
+    session_factory=AsyncSessionLocal,
+    interval=settings.ANALYTICS_AGGREGATE_COMPACTION_INTERVAL_SECONDS,
+    batch_size=settings.ANALYTICS_AGGREGATE_COMPACTION_BATCH_SIZE,
+)
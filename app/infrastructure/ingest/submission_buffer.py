@@ -0,0 +1,198 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.api.submission_schema import SubmissionCreate, SubmissionReceipt, IngestStatus
+from app.core.config import settings
+from app.infrastructure.database.session import SessionLocal
+from app.infrastructure.repositories.submission_repository import SubmissionRepository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class IngestQueueFullError(Exception):
+    """ Raised when the ingest queue is at capacity and the caller should retry later. """
+
+
+class SubmissionIngestBuffer:
+    """
+    Write-behind buffer for submissions. Requests enqueue a submission and get a receipt back
+    immediately, a single background thread group-commits queued submissions in batches that
+    are closed either by size or by the flush window.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        receipt_history: int,
+    ):
+        self._session_factory = session_factory
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._receipt_history = receipt_history
+        self._receipts: "OrderedDict[str, SubmissionReceipt]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self._enqueued_total = 0
+        self._rejected_total = 0
+        self._committed_total = 0
+        self._failed_total = 0
+        self._flush_count = 0
+        self._flush_seconds_total = 0.0
+        self._flush_seconds_max = 0.0
+        self._last_flush_seconds = 0.0
+        self._last_batch_size = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="submission-ingest-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """ Stops accepting work and blocks until everything already queued has been committed. """
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, form_id: int, submission: SubmissionCreate) -> SubmissionReceipt:
+        receipt = SubmissionReceipt(receipt_id=uuid.uuid4().hex, form_id=form_id, status=IngestStatus.QUEUED)
+        try:
+            self._queue.put_nowait((receipt, submission))
+        except queue.Full:
+            with self._lock:
+                self._rejected_total += 1
+            raise IngestQueueFullError("Submission ingest queue is full.")
+
+        with self._lock:
+            self._enqueued_total += 1
+            self._remember(receipt)
+        return receipt
+
+    def get_receipt(self, receipt_id: str) -> Optional[SubmissionReceipt]:
+        with self._lock:
+            return self._receipts.get(receipt_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "enqueued_total": self._enqueued_total,
+                "rejected_total": self._rejected_total,
+                "committed_total": self._committed_total,
+                "failed_total": self._failed_total,
+                "flush_count": self._flush_count,
+                "last_batch_size": self._last_batch_size,
+                "last_flush_seconds": self._last_flush_seconds,
+                "avg_flush_seconds": self._flush_seconds_total / self._flush_count if self._flush_count else 0.0,
+                "max_flush_seconds": self._flush_seconds_max,
+            }
+
+    def _remember(self, receipt: SubmissionReceipt) -> None:
+        self._receipts[receipt.receipt_id] = receipt
+        while len(self._receipts) > self._receipt_history:
+            self._receipts.popitem(last=False)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+        # Drain: sve sto je ostalo u redu upisuje se pre gasenja
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining.append(item)
+        for start in range(0, len(remaining), self._batch_size):
+            self._flush(remaining[start:start + self._batch_size])
+
+    def _flush(self, batch: List[Any]) -> None:
+        started = time.perf_counter()
+        groups: Dict[int, List[Any]] = defaultdict(list)
+        for receipt, submission in batch:
+            groups[receipt.form_id].append((receipt, submission))
+
+        committed = failed = 0
+        session = self._session_factory()
+        try:
+            repository = SubmissionRepository(db_session=session)
+            for form_id, items in groups.items():
+                try:
+                    ids = repository.create_many(form_id, [submission for _, submission in items])
+                except Exception as e:
+                    session.rollback()
+                    logger.exception("Failed to flush %d submissions for form %d", len(items), form_id)
+                    with self._lock:
+                        for receipt, _ in items:
+                            receipt.status = IngestStatus.FAILED
+                            receipt.error = str(e)
+                    failed += len(items)
+                    continue
+
+                with self._lock:
+                    for (receipt, _), submission_id in zip(items, ids):
+                        receipt.status = IngestStatus.COMMITTED
+                        receipt.submission_id = submission_id
+                committed += len(items)
+        finally:
+            session.close()
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._committed_total += committed
+            self._failed_total += failed
+            self._flush_count += 1
+            self._flush_seconds_total += elapsed
+            self._flush_seconds_max = max(self._flush_seconds_max, elapsed)
+            self._last_flush_seconds = elapsed
+            self._last_batch_size = len(batch)
+
+
+submission_ingest_buffer = SubmissionIngestBuffer(
+    session_factory=SessionLocal,
+    max_queue_size=settings.SUBMISSION_INGEST_QUEUE_SIZE,
+    batch_size=settings.SUBMISSION_INGEST_BATCH_SIZE,
+    flush_interval=settings.SUBMISSION_INGEST_FLUSH_INTERVAL_MS / 1000,
+    receipt_history=settings.SUBMISSION_INGEST_RECEIPT_HISTORY,
+)
@@ -0,0 +1,443 @@
+"""
+Incrementally maintained analytics aggregates (form_aggregates, form_field_aggregates,
+form_option_aggregates).
+
+Upis submisija ne dira agregate: u istoj transakciji dodaje jedan red u aggregate_deltas (payload-i
+i vremena dodatih i uklonjenih submisija) i ne zakljucava nijedan red, pa se istovremeni upisi u
+istu formu ne cekaju. Kompaktor (AggregateCompactor u pozadini ili uv run compact-aggregates)
+brise delte forme i sabira ih u agregate: jedan UPDATE form_aggregates (koji vraca polja forme) i
+po jedan visestruki upsert za polja, opcije i submission_rollups (broj submisija po
+minutu/satu/danu), sa sabiranjem u ON CONFLICT; sketch-evi tekstualnih polja (field_sketches, po
+danu) se citaju, spajaju u Python-u i upisuju nazad. Agregati zato kasne za upisima do jednog
+intervala kompakcije. Agregati polja vaze dok je form_aggregates.fields_version jednak
+forms.version; izmena forme koja menja tip ili opcije polja ih ostavlja zastarelim do rebuild-a
+(uv run rebuild-aggregates). Rollup-ovi ne zavise od polja i odrzavaju se za svaku formu koja ima
+red u form_aggregates.
+
+Ingest i kompaktor drze deljeni, a rebuild ekskluzivni advisory lock po formi, pa rebuild ne
+moze da izgubi ni da dvaput uracuna submisije upisane dok traje. Kompaktori jedne forme se
+iskljucuju posebnim advisory lock-om (drugi preskace formu), sto cini spajanje sketch-eva bezbednim.
+"""
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, Executable, Row, delete, exists, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.application.services.analytics_deltas import FieldSketches, FormDelta, option_key
+from app.application.services.analytics_plan import FieldKind, RollupResolution, plan_field_aggregates
+from app.application.services.sketches import HyperLogLog, SpaceSaving
+from app.core.config import settings
+from app.domain.models.analytics_aggregate import (
+    AggregateDelta, FieldAggregate, FieldSketch, FormAggregate, OptionAggregate, SubmissionRollup
+)
+from app.domain.models.form import Form
+from app.domain.models.submission import Submission
+
+AGGREGATE_LOCK_NAMESPACE = 46016
+COMPACTION_LOCK_NAMESPACE = 46017
+
+
+def lock_statement(form_id: int, exclusive: bool = False) -> Executable:
+    lock = func.pg_advisory_xact_lock if exclusive else func.pg_advisory_xact_lock_shared
+    return select(lock(AGGREGATE_LOCK_NAMESPACE, form_id))
+
+
+def compaction_lock_statement(form_id: int) -> Executable:
+    """ True when this transaction may compact the form, False when another compactor is at it. """
+    return select(func.pg_try_advisory_xact_lock(COMPACTION_LOCK_NAMESPACE, form_id))
+
+
+def delta_statement(
+    form_id: int,
+    added: Sequence[Any],
+    removed: Sequence[Any],
+    added_at: Optional[datetime],
+    removed_at: Sequence[datetime],
+) -> Executable:
+    """ Appends one write to aggregate_deltas; nothing is written for a form without a store. """
+    row = select(
+        literal(form_id),
+        literal(list(added), JSONB),
+        literal(list(removed), JSONB),
+        literal(added_at, DateTime),
+        literal(list(removed_at), ARRAY(DateTime)),
+        literal(datetime.utcnow(), DateTime),
+    ).where(exists().where(FormAggregate.form_id == form_id))
+    # Core insert, ne postgresql: dijalektov Insert nema cache key i kompajlirao bi se pri svakom upisu
+    return AggregateDelta.__table__.insert().from_select(
+        ["form_id", "added", "removed", "added_at", "removed_at", "created_at"], row
+    )
+
+
+def take_deltas_statement(form_id: int, up_to_id: int, limit: int) -> Executable:
+    """ Deletes the form's oldest pending deltas (at most limit, none after up_to_id) and returns them. """
+    batch = (
+        select(AggregateDelta.id)
+        .where(AggregateDelta.form_id == form_id, AggregateDelta.id <= up_to_id)
+        .order_by(AggregateDelta.id)
+        .limit(limit)
+    )
+    return (
+        delete(AggregateDelta)
+        .where(AggregateDelta.id.in_(batch.scalar_subquery()))
+        .returning(AggregateDelta.added, AggregateDelta.removed, AggregateDelta.added_at, AggregateDelta.removed_at)
+    )
+
+
+def count_statement(form_id: int, change: int) -> Executable:
+    """
+    Bumps the submission count and the revision and returns the form's fields and whether the field aggregates
+    are current; no row means the form has no store to maintain. Only the compactor and rebuild write
+    this row, so ingest never waits for its lock.
+    """
+    return (
+        update(FormAggregate)
+        .where(FormAggregate.form_id == form_id, FormAggregate.form_id == Form.id)
+        .values(
+            submission_count=FormAggregate.submission_count + change,
+            revision=FormAggregate.revision + 1,
+            updated_at=datetime.utcnow(),
+        )
+        .returning(Form.fields, (FormAggregate.fields_version == Form.version).label("current"))
+    )
+
+
+def minute_rollup_cutoff() -> datetime:
+    return RollupResolution.MINUTE.truncate(
+        datetime.utcnow() - timedelta(days=settings.ANALYTICS_MINUTE_ROLLUP_RETENTION_DAYS)
+    )
+
+
+def rollup_upsert(form_id: int, added_at: Iterable[datetime], removed_at: Iterable[datetime]) -> Optional[Executable]:
+    """
+    Adds the submissions to their minute/hour/day buckets and takes the removed ones out. Minute
+    buckets older than the retention are not decremented: prune-rollups may have deleted them, and
+    the upsert would bring them back with a negative count.
+    """
+    cutoff = minute_rollup_cutoff()
+    counts: Counter = Counter()
+    for sign, moments in ((1, added_at), (-1, removed_at)):
+        for moment in moments:
+            for resolution in RollupResolution:
+                bucket = resolution.truncate(moment)
+                if sign < 0 and resolution == RollupResolution.MINUTE and bucket < cutoff:
+                    continue
+                counts[resolution.value, bucket] += sign
+    rows = [
+        {"form_id": form_id, "resolution": resolution, "bucket": bucket, "count": count}
+        for (resolution, bucket), count in counts.items() if count
+    ]
+    if not rows:
+        return None
+    statement = insert(SubmissionRollup).values(rows)
+    table = SubmissionRollup.__table__.c
+    return statement.on_conflict_do_update(
+        index_elements=[table.form_id, table.resolution, table.bucket],
+        set_={"count": table.count + statement.excluded.count},
+    )
+
+
+def field_upserts(form_id: int, delta: FormDelta) -> List[Executable]:
+    field_rows, option_counts = [], {}
+    for field_id, field_delta in delta.fields.items():
+        if field_delta.empty:
+            continue
+        number = field_delta.spec.kind == FieldKind.NUMBER
+        field_rows.append({
+            "form_id": form_id,
+            "field_id": field_id,
+            "filled": field_delta.filled,
+            "value_count": field_delta.value_count,
+            "value_sum": field_delta.value_sum,
+            "value_min": field_delta.minimum if number else None,
+            "value_max": field_delta.maximum if number else None,
+            "date_min": None if number else field_delta.minimum,
+            "date_max": None if number else field_delta.maximum,
+        })
+        # Opcija koja se ponavlja u definiciji polja ima isti broj na svakoj poziciji, a u upsert-u sme jednom
+        for option, count in zip(field_delta.spec.options, field_delta.option_counts):
+            option_counts[field_id, option_key(option)] = count
+    option_rows = [
+        {"form_id": form_id, "field_id": field_id, "option": option, "count": count}
+        for (field_id, option), count in option_counts.items() if count
+    ]
+
+    statements = []
+    if field_rows:
+        statement = insert(FieldAggregate).values(field_rows)
+        table, excluded = FieldAggregate.__table__.c, statement.excluded
+        statements.append(statement.on_conflict_do_update(
+            index_elements=[table.form_id, table.field_id],
+            set_={
+                "filled": table.filled + excluded.filled,
+                "value_count": table.value_count + excluded.value_count,
+                "value_sum": table.value_sum + excluded.value_sum,
+                # least/greatest preskacu NULL
+                "value_min": func.least(table.value_min, excluded.value_min),
+                "value_max": func.greatest(table.value_max, excluded.value_max),
+                "date_min": func.least(table.date_min, excluded.date_min),
+                "date_max": func.greatest(table.date_max, excluded.date_max),
+            },
+        ))
+    if option_rows:
+        statement = insert(OptionAggregate).values(option_rows)
+        table = OptionAggregate.__table__.c
+        statements.append(statement.on_conflict_do_update(
+            index_elements=[table.form_id, table.field_id, table.option],
+            set_={"count": table.count + statement.excluded.count},
+        ))
+    return statements
+
+
+def init_statement(form: Form) -> Executable:
+    """ Empty store for a new form, so its submissions are aggregated from the first one. """
+    return insert(FormAggregate).values(form_id=form.id, fields_version=form.version or 1, submission_count=0)
+
+
+def carry_over_statement(form_id: int, old_version: int, old_fields: Any, new_fields: Any) -> Optional[Executable]:
+    """
+    A form edit that keeps every field's type and options (labels, rules, theme...) leaves the
+    aggregates valid, so the store follows the new version instead of going stale.
+    """
+    if plan_field_aggregates(old_fields or []) != plan_field_aggregates(new_fields or []):
+        return None
+    return (
+        update(FormAggregate)
+        .where(FormAggregate.form_id == form_id, FormAggregate.fields_version == old_version)
+        .values(fields_version=old_version + 1)
+    )
+
+
+def rollup_rebuild_statement(form_id: int, resolution: RollupResolution) -> Executable:
+    bucket = func.date_trunc(literal(resolution.value), Submission.submitted_at)
+    counts = (
+        select(Submission.form_id, literal(resolution.value), bucket, func.count())
+        .where(Submission.form_id == form_id)
+        .group_by(Submission.form_id, bucket)
+    )
+    return insert(SubmissionRollup).from_select(["form_id", "resolution", "bucket", "count"], counts)
+
+
+def rebuild_delete_statements(form_id: int) -> List[Executable]:
+    # Delte upisane pre rebuild-a su vec u submisijama koje rebuild broji
+    return [
+        delete(model).where(model.form_id == form_id)
+        for model in (FieldAggregate, OptionAggregate, SubmissionRollup, FieldSketch, AggregateDelta)
+    ]
+
+
+def rebuild_statements(form_id: int, version: int, delta: FormDelta) -> List[Executable]:
+    upsert = insert(FormAggregate).values(form_id=form_id, fields_version=version, submission_count=delta.submission_count)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[FormAggregate.form_id],
+        set_={
+            "fields_version": version,
+            "submission_count": delta.submission_count,
+            "revision": FormAggregate.revision + 1,
+            "updated_at": datetime.utcnow(),
+        },
+    )
+    return [
+        upsert,
+        *field_upserts(form_id, delta),
+        # Rollup-ovi se racunaju u bazi, preko indeksa (form_id, submitted_at, id)
+        *(rollup_rebuild_statement(form_id, resolution) for resolution in RollupResolution),
+    ]
+
+
+def sketch_select(form_id: int, day: date, field_ids: List[str]) -> Executable:
+    return (
+        select(FieldSketch.field_id, FieldSketch.hll, FieldSketch.top)
+        .where(FieldSketch.form_id == form_id, FieldSketch.bucket == day, FieldSketch.field_id.in_(field_ids))
+    )
+
+
+def sketch_upsert(
+    form_id: int,
+    day: date,
+    stored_rows: Sequence[Row],
+    sketches: Dict[str, Tuple[HyperLogLog, SpaceSaving]],
+) -> Optional[Executable]:
+    """
+    Writes the day's sketches merged with what is stored. Merging happens here, not in SQL; it is
+    safe because the compaction lock lets one compactor at a time fold a form, and rebuild
+    excludes compactors with its exclusive lock.
+    """
+    stored = {row.field_id: row for row in stored_rows}
+    rows = []
+    for field_id, (distinct, top) in sketches.items():
+        if field_id in stored:
+            distinct = distinct.merge(HyperLogLog(stored[field_id].hll))
+            top = top.merge(SpaceSaving.from_json(stored[field_id].top))
+        rows.append({"form_id": form_id, "field_id": field_id, "bucket": day, "hll": distinct.to_bytes(), "top": top.to_json()})
+    if not rows:
+        return None
+    statement = insert(FieldSketch).values(rows)
+    table = FieldSketch.__table__.c
+    return statement.on_conflict_do_update(
+        index_elements=[table.form_id, table.field_id, table.bucket],
+        set_={"hll": statement.excluded.hll, "top": statement.excluded.top},
+    )
+
+
+def fold_statements(form_id: int, store: Row, deltas: Sequence[Row]) -> List[Executable]:
+    """ Upserts for a batch of deltas, given the (fields, current) row returned by count_statement. """
+    statements = []
+    added_at = [delta.added_at for delta in deltas if delta.added_at for _ in delta.added]
+    removed_at = [moment for delta in deltas for moment in delta.removed_at]
+    rollup = rollup_upsert(form_id, added_at, removed_at)
+    if rollup is not None:
+        statements.append(rollup)
+    if store.current:
+        form_delta = FormDelta(plan_field_aggregates(store.fields or []))
+        for delta in deltas:
+            for data in delta.added:
+                form_delta.add(data, 1)
+            for data in delta.removed:
+                form_delta.add(data, -1)
+        statements += field_upserts(form_id, form_delta)
+    return statements
+
+
+def added_sketches(store: Row, deltas: Sequence[Row]) -> Dict[date, Dict[str, Tuple[HyperLogLog, SpaceSaving]]]:
+    """ Per day, sketches of newly inserted submissions; updates and deletes are not sketched. """
+    if not store.current:
+        return {}
+    specs = plan_field_aggregates(store.fields or [])
+    days: Dict[date, FieldSketches] = {}
+    for delta in deltas:
+        if not (delta.added and delta.added_at):
+            continue
+        day = delta.added_at.date()
+        if day not in days:
+            days[day] = FieldSketches(specs)
+        for data in delta.added:
+            days[day].add(data)
+    return {day: sketches.sketches() for day, sketches in days.items()}
+
+
+class AggregateStore:
+    """
+    Records writes for the compactor inside the caller's transaction; the caller commits.
+    added_at is the submitted_at of the added submissions, removed_at those of the removed ones
+    (an update passes neither, it does not change the submission rate).
+    """
+
+    def __init__(self, db_session: Session):
+        self.session = db_session
+
+    def apply(
+        self,
+        form_id: int,
+        added: Sequence[Any] = (),
+        removed: Sequence[Any] = (),
+        added_at: Optional[datetime] = None,
+        removed_at: Sequence[datetime] = (),
+    ) -> None:
+        if not settings.ANALYTICS_AGGREGATES_ENABLED or not (added or removed):
+            return
+        self.session.execute(lock_statement(form_id))
+        self.session.execute(delta_statement(form_id, added, removed, added_at, removed_at))
+
+
+class AsyncAggregateStore:
+    def __init__(self, db_session: AsyncSession):
+        self.session = db_session
+
+    async def apply(
+        self,
+        form_id: int,
+        added: Sequence[Any] = (),
+        removed: Sequence[Any] = (),
+        added_at: Optional[datetime] = None,
+        removed_at: Sequence[datetime] = (),
+    ) -> None:
+        if not settings.ANALYTICS_AGGREGATES_ENABLED or not (added or removed):
+            return
+        await self.session.execute(lock_statement(form_id))
+        await self.session.execute(delta_statement(form_id, added, removed, added_at, removed_at))
+
+    async def compact(self, form_id: int, batch_size: int = 1000) -> Optional[int]:
+        """
+        Folds the form's pending deltas into the store in one transaction and returns how many were
+        folded; None when another compactor is folding the form.
+        """
+        if not await self.session.scalar(compaction_lock_statement(form_id)):
+            await self.session.rollback()
+            return None
+        folded = await self.fold_pending(form_id, batch_size)
+        await self.session.commit()
+        return folded
+
+    async def fold_pending(self, form_id: int, batch_size: int = 1000) -> int:
+        """
+        Folds the deltas pending when it starts, in batches of batch_size, without committing. The
+        caller holds the compaction lock of the form.
+        """
+        await self.session.execute(lock_statement(form_id))
+        # Delte upisane za vreme kompakcije ostaju za sledecu, da vruca forma ne zadrzi kompaktor
+        up_to_id = await self.session.scalar(select(func.max(AggregateDelta.id)).where(AggregateDelta.form_id == form_id))
+        folded = 0
+        while up_to_id is not None:
+            deltas = (await self.session.execute(take_deltas_statement(form_id, up_to_id, batch_size))).all()
+            if not deltas:
+                break
+            folded += len(deltas)
+            change = sum(len(delta.added) - len(delta.removed) for delta in deltas)
+            store = (await self.session.execute(count_statement(form_id, change))).first()
+            if store is None:
+                continue
+            for statement in fold_statements(form_id, store, deltas):
+                await self.session.execute(statement)
+            for day, sketches in added_sketches(store, deltas).items():
+                if not sketches:
+                    continue
+                stored = (await self.session.execute(sketch_select(form_id, day, list(sketches)))).all()
+                upsert = sketch_upsert(form_id, day, stored, sketches)
+                if upsert is not None:
+                    await self.session.execute(upsert)
+        return folded
+
+    async def rebuild(self, form_id: int, chunk_size: int = 5000) -> Optional[int]:
+        """
+        Recomputes the store of one form from its submissions in one transaction and returns the
+        number of submissions aggregated (None when the form does not exist).
+        """
+        await self.session.execute(lock_statement(form_id, exclusive=True))
+        form = (await self.session.execute(select(Form.fields, Form.version).where(Form.id == form_id))).first()
+        if form is None:
+            await self.session.rollback()
+            return None
+
+        for statement in rebuild_delete_statements(form_id):
+            await self.session.execute(statement)
+
+        specs = plan_field_aggregates(form.fields or [])
+        delta = FormDelta(specs)
+        # Dan po dan: sketch-evi su po danu, a upis ne sme da se mesa sa otvorenim kursorom
+        day_column = func.date(Submission.submitted_at)
+        days = list(await self.session.scalars(
+            select(day_column).where(Submission.form_id == form_id).group_by(day_column).order_by(day_column)
+        ))
+        for day in days:
+            start = datetime.combine(day, time.min)
+            statement = select(Submission.data).where(
+                Submission.form_id == form_id, Submission.submitted_at >= start, Submission.submitted_at < start + timedelta(days=1)
+            )
+            sketches = FieldSketches(specs)
+            result = await self.session.stream(statement.execution_options(yield_per=chunk_size))
+            async for data in result.scalars():
+                delta.add(data)
+                sketches.add(data)
+            upsert = sketch_upsert(form_id, day, [], sketches.sketches())
+            if upsert is not None:
+                await self.session.execute(upsert)
+
+        for statement in rebuild_statements(form_id, form.version, delta):
+            await self.session.execute(statement)
+        await self.session.commit()
+        return delta.submission_count
@@ -0,0 +1,73 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.ai_schema import AIJobStatus
+from app.application.interfaces.ai_job_repository import IAsyncAIJobRepository
+from app.domain.models.ai_job import AIJob
+
+
+class AsyncAIJobRepository(IAsyncAIJobRepository):
+    """ Every method commits: a job's state must be visible to the status endpoint and other workers at once. """
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def create(self, prompt: str, result: Optional[Dict[str, Any]] = None) -> AIJob:
+        now = datetime.utcnow()
+        job = AIJob(id=uuid.uuid4(), prompt=prompt, created_at=now)
+        if result is not None:
+            job.status, job.result, job.finished_at = AIJobStatus.DONE.value, result, now
+        self.db.add(job)
+        await self.db.commit()
+        return job
+
+    async def get_by_id(self, job_id: uuid.UUID) -> Optional[AIJob]:
+        return await self.db.scalar(select(AIJob).where(AIJob.id == job_id))
+
+    async def claim(self, lease_seconds: float) -> Optional[AIJob]:
+        now = datetime.utcnow()
+        candidate = (
+            select(AIJob.id)
+            .where(or_(
+                AIJob.status == AIJobStatus.PENDING.value,
+                and_(AIJob.status == AIJobStatus.RUNNING.value, AIJob.started_at < now - timedelta(seconds=lease_seconds)),
+            ))
+            .order_by(AIJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        statement = (
+            update(AIJob)
+            .where(AIJob.id == candidate)
+            .values(status=AIJobStatus.RUNNING.value, started_at=now, attempts=AIJob.attempts + 1)
+            .returning(AIJob)
+            .execution_options(synchronize_session=False)
+        )
+        job = await self.db.scalar(statement)
+        await self.db.commit()
+        return job
+
+    async def _complete(self, job_id: uuid.UUID, attempt: int, **values) -> bool:
+        statement = (
+            update(AIJob)
+            .where(AIJob.id == job_id, AIJob.status == AIJobStatus.RUNNING.value, AIJob.attempts == attempt)
+            .values(**values)
+            .returning(AIJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = await self.db.scalar(statement)
+        await self.db.commit()
+        return updated is not None
+
+    async def finish(self, job_id: uuid.UUID, attempt: int, result: Dict[str, Any]) -> bool:
+        return await self._complete(job_id, attempt, status=AIJobStatus.DONE.value, result=result, error=None, finished_at=datetime.utcnow())
+
+    async def fail(self, job_id: uuid.UUID, attempt: int, error: str, retry: bool) -> bool:
+        if retry:
+            return await self._complete(job_id, attempt, status=AIJobStatus.PENDING.value, error=error, started_at=None)
+        return await self._complete(job_id, attempt, status=AIJobStatus.FAILED.value, error=error, finished_at=datetime.utcnow())
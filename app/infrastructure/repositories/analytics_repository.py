@@ -0,0 +1,402 @@
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    ColumnElement, DateTime, Float, FromClause, Select, case, cast, func, literal, select, text, true, type_coerce
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.interfaces.analytics_repository import IAsyncAnalyticsRepository
+from app.application.services.analytics_deltas import option_key
+from app.application.services.analytics_plan import (
+    PERCENTILES, CrosstabCell, CrosstabCounts, FieldAggregateSpec, FieldAggregates, FieldKind, RollupResolution
+)
+from app.application.services.sketches import HyperLogLog, SpaceSaving
+from app.application.services.submission_filters import SubmissionFilter
+from app.core.config import settings
+from app.domain.models.analytics_aggregate import (
+    FieldAggregate, FieldSketch, FormAggregate, OptionAggregate, SubmissionRollup
+)
+from app.domain.models.submission import Submission, sample_key
+from app.infrastructure.repositories.submission_repository import apply_filters, date_value, numeric_value, text_value
+
+# Prazna vrednost: kljuc ne postoji, JSON null, "" ili []
+EMPTY_TEXT_VALUES = ("", "[]")
+
+
+def _filled(value: ColumnElement) -> ColumnElement:
+    return func.coalesce(value, "").not_in(EMPTY_TEXT_VALUES)
+
+
+def _within_days(statement: Select, start: Optional[date], end: Optional[date]) -> Select:
+    if start is not None:
+        statement = statement.where(Submission.submitted_at >= datetime.combine(start, time.min))
+    if end is not None:
+        statement = statement.where(Submission.submitted_at < datetime.combine(end + timedelta(days=1), time.min))
+    return statement
+
+
+def _category(spec: FieldAggregateSpec, name: str) -> Tuple[ColumnElement, Optional[FromClause]]:
+    """
+    The field's value as a crosstab category, NULL when empty. A multi-select checkbox is expanded
+    into one row per selected option (LATERAL jsonb_array_elements_text); [] and a missing value
+    give a single NULL, so the submission is still counted.
+    """
+    if not spec.multiple:
+        return func.nullif(func.nullif(text_value(spec.field_id), ""), "[]"), None
+    raw = Submission.data[spec.field_id]
+    # CASE redom, jer jsonb_array_length puca na vrednosti koja nije niz
+    values = case(
+        (func.jsonb_typeof(raw) == "array", case((func.jsonb_array_length(raw) > 0, raw), else_=literal([None], JSONB))),
+        else_=func.jsonb_build_array(raw),
+    )
+    elements = func.jsonb_array_elements_text(values).table_valued("value").lateral(name)
+    return func.nullif(elements.c.value, ""), elements
+
+
+def _sampled(percent: float) -> ColumnElement:
+    """
+    Row-level (Bernoulli) sample of a form's submissions: a row is in it when its sample key (seeded
+    hash of the id) falls below the fraction, so every refresh picks the same rows. The sample of
+    each form is kept by ix_submissions_form_id_sample_key, which Postgres maintains on every insert
+    and delete: the planner reads the key range of the form from it and fetches only the sampled rows.
+    """
+    return sample_key(Submission.id) < int(percent / 100 * 2 ** 32)
+
+
+def _date_interval(low: ColumnElement, high: ColumnElement) -> ColumnElement:
+    """ Histogram granularity from the span of the dates (date - date is a number of days). """
+    span = high - low
+    return case((span > 731, literal("month")), (span > 92, literal("week")), else_=literal("day"))
+
+
+class AsyncAnalyticsRepository(IAsyncAnalyticsRepository):
+    """
+    All field aggregates of a form in a single statement:
+
+        WITH form_rows AS MATERIALIZED (submissions of the form, filtered),
+             bounds AS (min/max of every number and date field)
+        SELECT count(*), count(*) FILTER (...), min/max/avg, percentile_cont(...) WITHIN GROUP, ...
+        FROM form_rows, bounds
+        GROUP BY GROUPING SETS ((), (bucket_1), (bucket_2), ...)
+
+    submissions is scanned once; the () set yields the per-field stats, each (bucket_i) set the
+    histogram of one field, told apart by GROUPING(bucket_i).
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self.session = db_session
+
+    async def aggregate_fields(
+        self,
+        form_id: int,
+        specs: List[FieldAggregateSpec],
+        filters: Optional[List[SubmissionFilter]] = None,
+        bins: int = 10,
+        sample_percent: Optional[float] = None,
+    ) -> Tuple[int, Dict[str, FieldAggregates]]:
+        rows = select(Submission.data).where(Submission.form_id == form_id)
+        if sample_percent is not None:
+            rows = rows.where(_sampled(sample_percent))
+        rows = apply_filters(rows, filters).cte("form_rows").prefix_with("MATERIALIZED")
+        data = rows.c.data
+
+        ranged = [(index, spec) for index, spec in enumerate(specs) if spec.kind in (FieldKind.NUMBER, FieldKind.DATE)]
+        values = {
+            index: numeric_value(spec.field_id, data) if spec.kind == FieldKind.NUMBER else date_value(spec.field_id, data)
+            for index, spec in ranged
+        }
+        bound_columns = []
+        for index, _ in ranged:
+            bound_columns += [func.min(values[index]).label(f"lo{index}"), func.max(values[index]).label(f"hi{index}")]
+        bounds = select(*bound_columns).select_from(rows).cte("bounds") if ranged else None
+
+        columns = [func.count().label("total")]
+        buckets: Dict[int, ColumnElement] = {}
+        for index, spec in enumerate(specs):
+            raw = text_value(spec.field_id, data)
+            columns.append(func.count().filter(_filled(raw)).label(f"f{index}"))
+
+            if spec.kind == FieldKind.OPTIONS:
+                for position, option in enumerate(spec.options):
+                    contained = {spec.field_id: [option] if spec.multiple else option}
+                    columns.append(func.count().filter(data.contains(contained)).label(f"o{index}_{position}"))
+
+            elif spec.kind in (FieldKind.NUMBER, FieldKind.DATE):
+                value = values[index]
+                low, high = bounds.c[f"lo{index}"], bounds.c[f"hi{index}"]
+                columns += [func.min(value).label(f"min{index}"), func.max(value).label(f"max{index}")]
+                if spec.kind == FieldKind.NUMBER:
+                    columns += [
+                        func.avg(value).label(f"avg{index}"),
+                        func.count(value).label(f"c{index}"),
+                        func.stddev_samp(value).label(f"sd{index}"),
+                        # percentile_cont nad nizom vraca double precision[], ne jedan broj
+                        type_coerce(func.percentile_cont(array(PERCENTILES)).within_group(value), ARRAY(Float)).label(f"p{index}"),
+                    ]
+                    # width_bucket vraca bins+1 za maksimum, pa se ogranicava na poslednji bin
+                    buckets[index] = case(
+                        (value.is_(None), None),
+                        (high > low, func.least(func.width_bucket(value, low, high, bins), bins)),
+                        else_=1,
+                    )
+                else:
+                    interval = _date_interval(low, high)
+                    columns.append(func.min(interval).label(f"interval{index}"))
+                    buckets[index] = func.date_trunc(interval, cast(value, DateTime))
+
+        statement = select(*columns)
+        if buckets:
+            for index, bucket in buckets.items():
+                statement = statement.add_columns(bucket.label(f"b{index}"), func.grouping(bucket).label(f"g{index}"))
+            statement = statement.select_from(rows.join(bounds, true()))
+            statement = statement.group_by(func.grouping_sets(text("()"), *buckets.values()))
+        else:
+            statement = statement.select_from(rows)
+
+        result = (await self.session.execute(statement)).mappings().all()
+        return self._collect(specs, result, list(buckets))
+
+    @staticmethod
+    def _collect(specs: List[FieldAggregateSpec], result, bucketed: List[int]) -> Tuple[int, Dict[str, FieldAggregates]]:
+        totals = None
+        histograms: Dict[int, list] = {index: [] for index in bucketed}
+        for row in result:
+            # GROUPING(b) = 0 samo u redovima grupisanim po toj kanti; red sa svim jedinicama je set ()
+            grouped = [index for index in bucketed if row[f"g{index}"] == 0]
+            if not grouped:
+                totals = row
+            elif row[f"b{grouped[0]}"] is not None:
+                histograms[grouped[0]].append((row[f"b{grouped[0]}"], row["total"]))
+
+        aggregates = {}
+        for index, spec in enumerate(specs):
+            aggregates[spec.field_id] = FieldAggregates(
+                filled=totals[f"f{index}"],
+                option_counts=tuple(totals[f"o{index}_{position}"] for position in range(len(spec.options))),
+                minimum=totals.get(f"min{index}"),
+                maximum=totals.get(f"max{index}"),
+                average=totals.get(f"avg{index}"),
+                value_count=totals.get(f"c{index}"),
+                stddev=totals.get(f"sd{index}"),
+                percentiles=tuple(totals.get(f"p{index}") or ()),
+                histogram=tuple(sorted(histograms.get(index, ()))),
+                interval=totals.get(f"interval{index}"),
+            )
+        return totals["total"], aggregates
+
+    async def get_stored_aggregates(
+        self,
+        form_id: int,
+        version: int,
+        specs: List[FieldAggregateSpec],
+    ) -> Optional[Tuple[int, Dict[str, FieldAggregates]]]:
+        stored = await self.session.scalar(
+            select(FormAggregate).where(FormAggregate.form_id == form_id, FormAggregate.fields_version == version)
+        )
+        if stored is None:
+            return None
+        fields = {row.field_id: row for row in await self.session.scalars(select(FieldAggregate).where(FieldAggregate.form_id == form_id))}
+        options = {
+            (row.field_id, row.option): row.count
+            for row in await self.session.scalars(select(OptionAggregate).where(OptionAggregate.form_id == form_id))
+        }
+
+        aggregates = {}
+        for spec in specs:
+            row = fields.get(spec.field_id)
+            if row is None:
+                aggregates[spec.field_id] = FieldAggregates(filled=0, option_counts=(0,) * len(spec.options))
+                continue
+            number = spec.kind == FieldKind.NUMBER
+            aggregates[spec.field_id] = FieldAggregates(
+                filled=row.filled,
+                option_counts=tuple(options.get((spec.field_id, option_key(option)), 0) for option in spec.options),
+                minimum=row.value_min if number else row.date_min,
+                maximum=row.value_max if number else row.date_max,
+                average=row.value_sum / row.value_count if number and row.value_count else None,
+            )
+        return stored.submission_count, aggregates
+
+    async def get_rollup_counts(
+        self,
+        form_id: int,
+        resolution: RollupResolution,
+        start: datetime,
+        end: datetime,
+    ) -> Optional[List[Tuple[datetime, int]]]:
+        if await self.session.scalar(select(FormAggregate.form_id).where(FormAggregate.form_id == form_id)) is None:
+            return None
+        statement = (
+            select(SubmissionRollup.bucket, SubmissionRollup.count)
+            .where(
+                SubmissionRollup.form_id == form_id,
+                SubmissionRollup.resolution == resolution.value,
+                SubmissionRollup.bucket >= start,
+                SubmissionRollup.bucket < end,
+                SubmissionRollup.count != 0,
+            )
+            .order_by(SubmissionRollup.bucket)
+        )
+        return [(bucket, count) for bucket, count in await self.session.execute(statement)]
+
+    async def count_by_bucket(
+        self,
+        form_id: int,
+        resolution: RollupResolution,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, int]]:
+        bucket = func.date_trunc(literal(resolution.value), Submission.submitted_at)
+        statement = select(bucket, func.count()).where(Submission.form_id == form_id)
+        if start is not None:
+            statement = statement.where(Submission.submitted_at >= start)
+        if end is not None:
+            statement = statement.where(Submission.submitted_at < end)
+        statement = statement.group_by(bucket).order_by(bucket)
+        return [(row[0], row[1]) for row in await self.session.execute(statement)]
+
+    async def get_field_sketches(
+        self,
+        form_id: int,
+        version: int,
+        field_ids: List[str],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Optional[Dict[str, Tuple[HyperLogLog, SpaceSaving]]]:
+        current = await self.session.scalar(
+            select(FormAggregate.form_id).where(FormAggregate.form_id == form_id, FormAggregate.fields_version == version)
+        )
+        if current is None:
+            return None
+        statement = select(FieldSketch.field_id, FieldSketch.hll, FieldSketch.top).where(
+            FieldSketch.form_id == form_id, FieldSketch.field_id.in_(field_ids)
+        )
+        if start is not None:
+            statement = statement.where(FieldSketch.bucket >= start)
+        if end is not None:
+            statement = statement.where(FieldSketch.bucket <= end)
+
+        # Dnevni sketch-evi se spajaju u jedan po polju
+        merged = {field_id: (HyperLogLog(), SpaceSaving()) for field_id in field_ids}
+        for field_id, hll, top in await self.session.execute(statement):
+            distinct, values = merged[field_id]
+            merged[field_id] = (distinct.merge(HyperLogLog(hll)), values.merge(SpaceSaving.from_json(top)))
+        return merged
+
+    async def exact_text_stats(
+        self,
+        form_id: int,
+        field_ids: List[str],
+        top: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Dict[str, Tuple[int, int, List[Tuple[str, int]]]]:
+        if not field_ids:
+            return {}
+        columns = []
+        for index, field_id in enumerate(field_ids):
+            value = text_value(field_id)
+            columns += [
+                func.count().filter(_filled(value)).label(f"n{index}"),
+                func.count(value.distinct()).filter(_filled(value)).label(f"d{index}"),
+            ]
+        totals = (await self.session.execute(
+            _within_days(select(*columns).where(Submission.form_id == form_id), start, end)
+        )).mappings().one()
+
+        stats = {}
+        for index, field_id in enumerate(field_ids):
+            value = text_value(field_id)
+            statement = select(value, func.count().label("count")).where(Submission.form_id == form_id, _filled(value))
+            statement = _within_days(statement, start, end).group_by(value).order_by(func.count().desc(), value).limit(top)
+            values = [(row[0], row[1]) for row in await self.session.execute(statement)]
+            stats[field_id] = (totals[f"n{index}"], totals[f"d{index}"], values)
+        return stats
+
+    async def crosstab(
+        self,
+        form_id: int,
+        row: FieldAggregateSpec,
+        column: FieldAggregateSpec,
+        limit: int,
+        filters: Optional[List[SubmissionFilter]] = None,
+    ) -> CrosstabCounts:
+        """
+        WITH pairs AS (SELECT a, b, count(*) FROM submissions ... GROUP BY a, b),
+             top_rows AS (the `limit` values of a with the largest sum, plus count(*) OVER ()), top_columns
+        SELECT a or other, b or other, sum(n) FROM pairs LEFT JOIN top_rows LEFT JOIN top_columns GROUP BY ...
+
+        submissions is read once; the caps are applied to the (much smaller) pairs.
+        """
+        row_value, row_values = _category(row, "row_values")
+        column_value, column_values = _category(column, "column_values")
+        source = Submission.__table__
+        for expanded in (row_values, column_values):
+            if expanded is not None:
+                source = source.join(expanded, true())
+        pairs = select(row_value.label("a"), column_value.label("b"), func.count().label("n"))
+        pairs = apply_filters(pairs.select_from(source).where(Submission.form_id == form_id), filters)
+        pairs = pairs.group_by(row_value, column_value).cte("pairs")
+
+        def top(value: ColumnElement, name: str):
+            return (
+                select(value.label("value"), func.count().over().label("total_values"))
+                .group_by(value)
+                .order_by(func.sum(pairs.c.n).desc(), value)
+                .limit(limit)
+                .cte(name)
+            )
+
+        top_rows, top_columns = top(pairs.c.a, "top_rows"), top(pairs.c.b, "top_columns")
+        row_other, column_other = top_rows.c.total_values.is_(None), top_columns.c.total_values.is_(None)
+        row_key = case((row_other, None), else_=pairs.c.a)
+        column_key = case((column_other, None), else_=pairs.c.b)
+        statement = (
+            select(
+                row_key.label("row"),
+                row_other.label("row_other"),
+                column_key.label("column"),
+                column_other.label("column_other"),
+                func.sum(pairs.c.n).label("count"),
+                select(func.max(top_rows.c.total_values)).correlate(None).scalar_subquery().label("row_values"),
+                select(func.max(top_columns.c.total_values)).correlate(None).scalar_subquery().label("column_values"),
+            )
+            .select_from(
+                pairs
+                .outerjoin(top_rows, pairs.c.a.is_not_distinct_from(top_rows.c.value))
+                .outerjoin(top_columns, pairs.c.b.is_not_distinct_from(top_columns.c.value))
+            )
+            .group_by(row_key, row_other, column_key, column_other)
+        )
+
+        result = (await self.session.execute(statement)).mappings().all()
+        cells = tuple(
+            CrosstabCell(item["row"], item["column"], int(item["count"]), item["row_other"], item["column_other"])
+            for item in result
+        )
+        row_count = result[0]["row_values"] if result else 0
+        column_count = result[0]["column_values"] if result else 0
+        return CrosstabCounts(cells, row_count or 0, column_count or 0)
+
+    async def submission_watermark(self, form_id: int) -> Tuple:
+        if settings.ANALYTICS_AGGREGATES_ENABLED:
+            revision = await self.session.scalar(select(FormAggregate.revision).where(FormAggregate.form_id == form_id))
+            if revision is not None:
+                return ("store", revision)
+        # Bez store-a: count i max(id) preko indeksa forme; izmena submisije na mestu se ne vidi
+        count, last_id = (await self.session.execute(
+            select(func.count(), func.max(Submission.id)).where(Submission.form_id == form_id)
+        )).one()
+        return ("live", count, last_id)
+
+    async def estimate_form_rows(self, form_id: int) -> int:
+        stored = await self.session.scalar(select(FormAggregate.submission_count).where(FormAggregate.form_id == form_id))
+        if stored is not None:
+            return stored
+        # Bez store-a: procena planera (statistika tabele), bez citanja submisija
+        plan = await self.session.scalar(text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM submissions WHERE form_id = {int(form_id)}"))
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,67 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.form_schema import FormSchemaCreate
+from app.application.interfaces.form_repository import IAsyncFormRepository
+from app.application.services.form_artifact_cache import invalidate_form_artifacts
+from app.core.config import settings
+from app.domain.models.form import Form
+from app.infrastructure.repositories.aggregate_store import carry_over_statement, init_statement
+from app.infrastructure.cache.invalidation_bus import publish_form_invalidation_async
+
+
+class AsyncFormRepository(IAsyncFormRepository):
+    """ Reads go through read_session (a replica when routed there), writes always use db_session. """
+
+    def __init__(self, db_session: AsyncSession, read_session: Optional[AsyncSession] = None):
+        self.db = db_session
+        self.read_db = read_session or db_session
+
+    async def get_by_id(self, form_id: int) -> Optional[Form]:
+        return await self.read_db.scalar(select(Form).where(Form.id == form_id))
+
+    async def get_all(self) -> List[Form]:
+        return list(await self.read_db.scalars(select(Form)))
+
+    async def _get_for_write(self, form_id: int) -> Optional[Form]:
+        return await self.db.scalar(select(Form).where(Form.id == form_id))
+
+    async def create(self, form_data: FormSchemaCreate) -> Form:
+        db_form = Form(**form_data.model_dump())
+        self.db.add(db_form)
+        if settings.ANALYTICS_AGGREGATES_ENABLED:
+            await self.db.flush()
+            await self.db.execute(init_statement(db_form))
+        await self.db.commit()
+        await self.db.refresh(db_form)
+        return db_form
+
+    async def update(self, form_id: int, form_data: FormSchemaCreate) -> Optional[Form]:
+        db_form = await self._get_for_write(form_id)
+        if not db_form:
+            return None
+        old_version, old_fields = db_form.version, db_form.fields
+        update_data = form_data.model_dump(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(db_form, key, value)
+        db_form.version = Form.version + 1
+        carry_over = carry_over_statement(form_id, old_version, old_fields, db_form.fields)
+        if carry_over is not None:
+            await self.db.execute(carry_over)
+        await publish_form_invalidation_async(self.db, form_id)
+        await self.db.commit()
+        await self.db.refresh(db_form)
+        invalidate_form_artifacts(form_id)
+        return db_form
+
+    async def delete(self, form_id: int) -> Optional[Form]:
+        db_form = await self._get_for_write(form_id)
+        if not db_form:
+            return None
+        await self.db.delete(db_form)
+        await publish_form_invalidation_async(self.db, form_id)
+        await self.db.commit()
+        invalidate_form_artifacts(form_id)
+        return db_form
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.submission_schema import SubmissionCreate
+from app.application.interfaces.submission_repository import IAsyncSubmissionRepository
+from app.application.services.submission_filters import SubmissionFilter
+from app.domain.models.submission import Submission
+from app.infrastructure.repositories.aggregate_store import AsyncAggregateStore
+from app.infrastructure.repositories.submission_repository import (
+    all_by_form_statement, insert_many_statement, page_statement, stream_statement
+)
+
+
+class AsyncSubmissionRepository(IAsyncSubmissionRepository):
+    """ Listing and export read through read_session (a replica when routed there), writes use db_session. """
+
+    def __init__(self, db_session: AsyncSession, read_session: Optional[AsyncSession] = None):
+        self.session = db_session
+        self.read_session = read_session or db_session
+        self.aggregates = AsyncAggregateStore(db_session)
+
+    async def create(self, form_id: int, submission_data: SubmissionCreate) -> Submission:
+        db_submission = Submission(form_id=form_id, data=submission_data.data, submitted_at=datetime.utcnow())
+        self.session.add(db_submission)
+        await self.aggregates.apply(form_id, added=[submission_data.data], added_at=db_submission.submitted_at)
+        await self.session.commit()
+        await self.session.refresh(db_submission)
+        return db_submission
+
+    async def create_many(self, form_id: int, submissions: List[SubmissionCreate]) -> List[int]:
+        if not submissions:
+            return []
+
+        submitted_at = datetime.utcnow()
+        rows = [{"form_id": form_id, "data": submission.data, "submitted_at": submitted_at} for submission in submissions]
+        ids = list(await self.session.scalars(insert_many_statement(), rows))
+        await self.aggregates.apply(form_id, added=[row["data"] for row in rows], added_at=submitted_at)
+        await self.session.commit()
+        return ids
+
+    async def get_all_by_form_id(self, form_id: int, filters: Optional[List[SubmissionFilter]] = None) -> List[Submission]:
+        return list(await self.read_session.scalars(all_by_form_statement(form_id, filters)))
+
+    async def stream_by_form_id(
+        self,
+        form_id: int,
+        filters: Optional[List[SubmissionFilter]] = None,
+        chunk_size: int = 1000,
+        columns: Optional[List[str]] = None,
+    ) -> AsyncIterator[Row]:
+        # session.stream: asyncpg kursor, redovi stizu u chunk-ovima od chunk_size
+        result = await self.read_session.stream(stream_statement(form_id, filters, chunk_size, columns))
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    async def get_page_by_form_id(self, form_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None) -> List[Submission]:
+        return list(await self.read_session.scalars(page_statement(form_id, limit, after)))
+
+    async def get_by_id(self, submission_id: int) -> Optional[Submission]:
+        return await self.session.get(Submission, submission_id)
+
+    async def update(self, submission_id: int, submission_data: SubmissionCreate) -> Optional[Submission]:
+        db_submission = await self.get_by_id(submission_id)
+        if db_submission is None:
+            return None
+        await self.aggregates.apply(db_submission.form_id, added=[submission_data.data], removed=[db_submission.data])
+        db_submission.data = submission_data.data
+        await self.session.commit()
+        await self.session.refresh(db_submission)
+        return db_submission
+
+    async def delete(self, submission_id: int) -> Optional[Submission]:
+        db_submission = await self.get_by_id(submission_id)
+        if db_submission is None:
+            return None
+        await self.session.delete(db_submission)
+        await self.aggregates.apply(
+            db_submission.form_id,
+            removed=[db_submission.data],
+            removed_at=[db_submission.submitted_at],
+        )
+        await self.session.commit()
+        return db_submission
@@ -0,0 +1,98 @@
+from typing import List, Optional
+
+from app.api.form_schema import FormSchemaCreate
+from app.application.interfaces.form_repository import IAsyncFormRepository, IFormRepository
+from app.domain.models.form import Form
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+
+def snapshot(form: Form) -> Form:
+    """ Detached, read-only copy of a form that can be shared between requests and sessions. """
+    return Form(
+        id=form.id,
+        name=form.name,
+        description=form.description,
+        fields=form.fields,
+        rules=form.rules,
+        theme=form.theme,
+        version=form.version,
+    )
+
+
+class CachedFormRepository(IFormRepository):
+    """
+    Read-through cache in front of another form repository. get_by_id is served from the cache;
+    every write goes to the wrapped repository and then refreshes or evicts the cached entry.
+    """
+
+    def __init__(self, inner: IFormRepository, cache: TTLCache[Form]):
+        self.inner = inner
+        self.cache = cache
+
+    def get_by_id(self, form_id: int) -> Optional[Form]:
+        cached = self.cache.get(form_id)
+        if cached is not None:
+            return cached
+        db_form = self.inner.get_by_id(form_id)
+        if db_form is None:
+            return None
+        cached = snapshot(db_form)
+        self.cache.set(form_id, cached)
+        return cached
+
+    def get_all(self) -> List[Form]:
+        return self.inner.get_all()
+
+    def create(self, form_data: FormSchemaCreate) -> Form:
+        db_form = self.inner.create(form_data)
+        self.cache.set(db_form.id, snapshot(db_form))
+        return db_form
+
+    def update(self, form_id: int, form_data: FormSchemaCreate) -> Optional[Form]:
+        self.cache.pop(form_id)
+        db_form = self.inner.update(form_id, form_data)
+        if db_form is not None:
+            self.cache.set(form_id, snapshot(db_form))
+        return db_form
+
+    def delete(self, form_id: int) -> Optional[Form]:
+        self.cache.pop(form_id)
+        return self.inner.delete(form_id)
+
+
+class AsyncCachedFormRepository(IAsyncFormRepository):
+    """ CachedFormRepository for the async repositories; a cache hit never touches the database. """
+
+    def __init__(self, inner: IAsyncFormRepository, cache: TTLCache[Form]):
+        self.inner = inner
+        self.cache = cache
+
+    async def get_by_id(self, form_id: int) -> Optional[Form]:
+        cached = self.cache.get(form_id)
+        if cached is not None:
+            return cached
+        db_form = await self.inner.get_by_id(form_id)
+        if db_form is None:
+            return None
+        cached = snapshot(db_form)
+        self.cache.set(form_id, cached)
+        return cached
+
+    async def get_all(self) -> List[Form]:
+        return await self.inner.get_all()
+
+    async def create(self, form_data: FormSchemaCreate) -> Form:
+        db_form = await self.inner.create(form_data)
+        self.cache.set(db_form.id, snapshot(db_form))
+        return db_form
+
+    async def update(self, form_id: int, form_data: FormSchemaCreate) -> Optional[Form]:
+        self.cache.pop(form_id)
+        db_form = await self.inner.update(form_id, form_data)
+        if db_form is not None:
+            self.cache.set(form_id, snapshot(db_form))
+        return db_form
+
+    async def delete(self, form_id: int) -> Optional[Form]:
+        self.cache.pop(form_id)
+        return await self.inner.delete(form_id)
@@ -1,8 +1,12 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.application.interfaces.form_repository import IFormRepository
+from app.core.config import settings
 from app.domain.models.form import Form
 from app.api.form_schema import FormSchemaCreate
+from app.application.services.form_artifact_cache import invalidate_form_artifacts
+from app.infrastructure.cache.invalidation_bus import publish_form_invalidation
+from app.infrastructure.repositories.aggregate_store import carry_over_statement, init_statement
 
 class FormRepository(IFormRepository):
     def __init__(self, db_session: Session):
@@ -17,6 +21,9 @@ class FormRepository(IFormRepository):
     def create(self, form_data: FormSchemaCreate) -> Form:
         db_form = Form(**form_data.model_dump())
         self.db.add(db_form)
+        if settings.ANALYTICS_AGGREGATES_ENABLED:
+            self.db.flush()
+            self.db.execute(init_statement(db_form))
         self.db.commit()
         self.db.refresh(db_form)
         return db_form
@@ -25,12 +32,19 @@ class FormRepository(IFormRepository):
         db_form = self.get_by_id(form_id)
         if not db_form:
             return None
+        old_version, old_fields = db_form.version, db_form.fields
         update_data = form_data.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_form, key, value)
+        db_form.version = Form.version + 1
+        carry_over = carry_over_statement(form_id, old_version, old_fields, db_form.fields)
+        if carry_over is not None:
+            self.db.execute(carry_over)
         self.db.add(db_form)
+        publish_form_invalidation(self.db, form_id)
         self.db.commit()
         self.db.refresh(db_form)
+        invalidate_form_artifacts(form_id)
         return db_form
 
     def delete(self, form_id: int) -> Optional[Form]:
@@ -38,5 +52,7 @@ class FormRepository(IFormRepository):
         if not db_form:
             return None
         self.db.delete(db_form)
+        publish_form_invalidation(self.db, form_id)
         self.db.commit()
+        invalidate_form_artifacts(form_id)
         return db_form
@@ -1,10 +1,106 @@
-from typing import Dict, Any, List, Optional
+import operator
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
 
 from app.api.submission_schema import SubmissionCreate
 from app.application.interfaces.submission_repository import ISubmissionRepository
+from app.application.services.submission_filters import FilterOperator, SubmissionFilter
 from app.domain.models.submission import Submission
+from app.infrastructure.repositories.aggregate_store import AggregateStore
+from sqlalchemy import ColumnElement, Date, Numeric, Row, Select, case, cast, func, insert, or_, select, tuple_
 from sqlalchemy.orm import Session
 
+NUMERIC_PATTERN = r"^[[:space:]]*-?[0-9]+([.][0-9]+)?([eE][-+]?[0-9]+)?[[:space:]]*$"
+DATE_PATTERN = r"^[0-9]{4}-[0-9]{2}-[0-9]{2}"
+
+_COMPARISONS = {
+    FilterOperator.GREATER_THAN: operator.gt,
+    FilterOperator.GREATER_OR_EQUAL: operator.ge,
+    FilterOperator.LESS_THAN: operator.lt,
+    FilterOperator.LESS_OR_EQUAL: operator.le,
+}
+
+
+def text_value(field_id: str, data: ColumnElement = Submission.data) -> ColumnElement:
+    """ data ->> 'field'; the expression per-field prefix/trigram indexes are built on. """
+    return data[field_id].astext
+
+
+def numeric_value(field_id: str, data: ColumnElement = Submission.data) -> ColumnElement:
+    """
+    The field as numeric, NULL when it does not hold a number (numbers may be stored as JSON
+    numbers or numeric strings). Per-field range indexes are built on exactly this expression.
+    """
+    value = text_value(field_id, data)
+    return case((value.regexp_match(NUMERIC_PATTERN), cast(value, Numeric)))
+
+
+def date_value(field_id: str, data: ColumnElement = Submission.data) -> ColumnElement:
+    """ The field as a date (first 10 characters of an ISO string), NULL otherwise. """
+    value = text_value(field_id, data)
+    return case((value.regexp_match(DATE_PATTERN), cast(func.substr(value, 1, 10), Date)))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def filter_clause(submission_filter: SubmissionFilter) -> ColumnElement:
+    field_id, filter_operator, values, numeric = submission_filter
+    if filter_operator in (FilterOperator.EQUALS, FilterOperator.IN):
+        # data @> '{"field": value}' koristi GIN indeks (jsonb_path_ops) nad celom kolonom
+        return or_(*(Submission.data.contains({field_id: value}) for value in values))
+    if filter_operator in _COMPARISONS:
+        expression = numeric_value(field_id) if numeric else text_value(field_id)
+        return _COMPARISONS[filter_operator](expression, values[0])
+    if filter_operator == FilterOperator.PREFIX:
+        return text_value(field_id).like(_escape_like(values[0]) + "%", escape="\\")
+    return text_value(field_id).ilike("%" + _escape_like(values[0]) + "%", escape="\\")
+
+
+def apply_filters(statement: Select, filters: Optional[List[SubmissionFilter]]) -> Select:
+    for submission_filter in filters or []:
+        statement = statement.where(filter_clause(submission_filter))
+    return statement
+
+
+# Izrazi upita su zajednicki za sinhroni i async repozitorijum
+
+def insert_many_statement():
+    # Jedan INSERT ... VALUES (...), (...) RETURNING id za ceo batch
+    return insert(Submission).returning(Submission.id, sort_by_parameter_order=True)
+
+
+def all_by_form_statement(form_id: int, filters: Optional[List[SubmissionFilter]] = None) -> Select:
+    statement = apply_filters(select(Submission).where(Submission.form_id == form_id), filters)
+    return statement.order_by(Submission.submitted_at.desc())
+
+
+def stream_statement(
+    form_id: int,
+    filters: Optional[List[SubmissionFilter]] = None,
+    chunk_size: int = 1000,
+    columns: Optional[List[str]] = None,
+) -> Select:
+    if columns is None:
+        selected = [Submission.data]
+    else:
+        # Projekcija u SQL-u: iz JSON-a se izvlace samo trazeni kljucevi
+        selected = [Submission.data[key].label(f"c{index}") for index, key in enumerate(columns)]
+    statement = select(Submission.id, Submission.submitted_at, *selected).where(Submission.form_id == form_id)
+    statement = apply_filters(statement, filters)
+    statement = statement.order_by(Submission.submitted_at.desc(), Submission.id.desc())
+    # yield_per ukljucuje server-side kursor: u memoriji je uvek najvise jedan chunk redova
+    return statement.execution_options(yield_per=chunk_size)
+
+
+def page_statement(form_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None) -> Select:
+    statement = select(Submission).where(Submission.form_id == form_id)
+    if after is not None:
+        # Keyset: nastavlja tacno iza poslednjeg reda, bez OFFSET-a, preko indeksa (form_id, submitted_at, id)
+        statement = statement.where(tuple_(Submission.submitted_at, Submission.id) < tuple_(*after))
+    return statement.order_by(Submission.submitted_at.desc(), Submission.id.desc()).limit(limit)
+
 
 class SubmissionRepository(ISubmissionRepository):
     def __init__(self, db_session: Session):
@@ -14,24 +110,46 @@ class SubmissionRepository(ISubmissionRepository):
         
         db_submission = Submission(
             form_id=form_id,
-            data = submission_data.data
+            data = submission_data.data,
+            submitted_at=datetime.utcnow()
         )
 
         self.session.add(db_submission)
+        AggregateStore(self.session).apply(form_id, added=[submission_data.data], added_at=db_submission.submitted_at)
         self.session.commit()
         self.session.refresh(db_submission)
         return db_submission
 
-    async def get_all_by_form_id(self, form_id: int, filters: Dict[str, Any] = None) -> List[type[Submission]]:
+    def create_many(self, form_id: int, submissions: List[SubmissionCreate]) -> List[int]:
+        if not submissions:
+            return []
+
+        # Isti submitted_at za ceo batch, da bi se rollup-ovi poklopili sa upisanim redovima
+        submitted_at = datetime.utcnow()
+        rows = [{"form_id": form_id, "data": submission.data, "submitted_at": submitted_at} for submission in submissions]
+        ids = list(self.session.scalars(insert_many_statement(), rows))
+        AggregateStore(self.session).apply(form_id, added=[row["data"] for row in rows], added_at=submitted_at)
+        self.session.commit()
+        return ids
 
-        query = self.session.query(Submission).filter(Submission.form_id == form_id)
+    def get_all_by_form_id(self, form_id: int, filters: Optional[List[SubmissionFilter]] = None) -> List[Submission]:
+        return list(self.session.scalars(all_by_form_statement(form_id, filters)))
 
-        if filters:
-            for key, value in filters.items():
-                if value:
-                    query = query.filter(Submission.data[key].astext().ilike(f"%{value}%"))
+    def stream_by_form_id(
+        self,
+        form_id: int,
+        filters: Optional[List[SubmissionFilter]] = None,
+        chunk_size: int = 1000,
+        columns: Optional[List[str]] = None,
+    ) -> Iterator[Row]:
+        result = self.session.execute(stream_statement(form_id, filters, chunk_size, columns))
+        try:
+            yield from result
+        finally:
+            result.close()
 
-        return query.order_by(Submission.submitted_at.desc()).all()
+    def get_page_by_form_id(self, form_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None) -> List[Submission]:
+        return list(self.session.scalars(page_statement(form_id, limit, after)))
 
     def get_by_id(self, submission_id: int) -> Optional[Submission]:
         pass
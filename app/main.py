@@ -1,16 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.forms import router as form_routes
 from app.api.v1.submissions import router as submission_routes
 from app.api.v1.ai import  router as ai_routes
+from app.api.v1.metrics import router as metrics_routes
+from app.api.v1.analytics import router as analytics_routes
 
 
+from app.core.config import settings
 from app.domain.models.base import Base
 from app.infrastructure.database.session import engine
+from app.infrastructure.database.async_session import async_engine
+from app.infrastructure.database.replicas import replica_router, dispose_replicas
+from app.api.middleware import ReadYourWritesMiddleware
+from app.infrastructure.ingest.submission_buffer import submission_ingest_buffer
+from app.infrastructure.ingest.aggregate_compactor import aggregate_compactor
+from app.infrastructure.cache.invalidation_bus import form_invalidation_listener
+from app.api.deps import ai_job_workers, form_index_loader
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.SUBMISSION_INGEST_BUFFER_ENABLED:
+        submission_ingest_buffer.start()
+    if settings.FORM_INVALIDATION_BUS_ENABLED:
+        form_invalidation_listener.start()
+    if settings.AI_JOB_WORKERS_ENABLED:
+        ai_job_workers.start()
+    if settings.AI_SIMILAR_FORMS_ENABLED:
+        form_index_loader.start()
+    if settings.ANALYTICS_AGGREGATES_ENABLED and settings.ANALYTICS_AGGREGATE_COMPACTION_INTERVAL_SECONDS > 0:
+        aggregate_compactor.start()
+    yield
+    await aggregate_compactor.stop()
+    await form_index_loader.stop()
+    # Poslovi u toku se vracaju u red (preuzima ih drugi worker)
+    await ai_job_workers.stop()
+    await asyncio.to_thread(form_invalidation_listener.stop)
+    # Drain: sve prihvacene submisije se upisuju pre gasenja workera
+    await asyncio.to_thread(submission_ingest_buffer.stop)
+    await async_engine.dispose()
+    await dispose_replicas()
 
-app = FastAPI(title="FormForge API")
+
+app = FastAPI(title="FormForge API", lifespan=lifespan)
 
 # --- CORS Middleware ---
 origins = [
@@ -29,12 +66,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], 
     allow_headers=["*"], 
+    # Da builder vidi da je odgovor postojeca forma (sablon), a ne generisana
+    expose_headers=["X-Form-Template-Id", "X-Form-Template-Score"],
 )
 
+# Bez replika nema potrebe za read-your-writes cookie-jem
+if replica_router.engines:
+    app.add_middleware(ReadYourWritesMiddleware, max_age=settings.DB_READ_YOUR_WRITES_SECONDS)
+
 
 app.include_router(form_routes, prefix="/api/forms", tags=["Forms"])
 app.include_router(submission_routes, prefix="/api/submissions", tags=["Submissions"])
 app.include_router(ai_routes, prefix="/api/ai", tags=["AI"])
+app.include_router(metrics_routes, prefix="/api/metrics", tags=["Metrics"])
+app.include_router(analytics_routes, prefix="/api/analytics", tags=["Analytics"])
 
 # Add explicit routes without trailing slash to avoid redirects that break CORS
 from typing import List
@@ -44,9 +89,9 @@ from app.application.services.form_service import FormService
 from fastapi import Depends
 
 @app.get("/api/forms", response_model=List[FormSchemaResponse], include_in_schema=False)
-def read_forms_no_slash(service: FormService = Depends(get_form_service)):
+async def read_forms_no_slash(service: FormService = Depends(get_form_service)):
     """Handle /api/forms without trailing slash to avoid CORS issues with redirects"""
-    return service.get_all_forms()
+    return await service.get_all_forms()
 
 
 @app.get("/api/health")
@@ -0,0 +1,127 @@
+"""
+Cost of the analytics aggregates on concurrent single inserts into one form.
+
+Radi nad pravom Postgres bazom (DATABASE_URL iz .env): pravi test formu sa store-om, pa isti broj
+istovremenih pojedinacnih upisa (svaki u svojoj transakciji) pusta u tri rezima:
+  off     bez agregata
+  deltas  upis dodaje deltu, kompaktor je sabira posle (trenutni dizajn)
+  inline  delta se sabira u istoj transakciji (row lock na form_aggregates i prepisivanje sketch-eva,
+          kao kada se store azurirao pri svakom upisu)
+Na kraju proverava da store broji sve submisije i brise formu sa svim podacima (upisi su commit-ovani).
+
+Pokretanje:  python benchmarks/aggregate_ingest_benchmark.py [istovremenih_upisa] [upisa_po_workeru]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import delete, func, insert, select
+
+from app.api.submission_schema import SubmissionCreate
+from app.core.config import settings
+from app.domain.models.analytics_aggregate import FormAggregate
+from app.domain.models.form import Form
+from app.domain.models.submission import Submission
+from app.infrastructure.database.async_session import AsyncSessionLocal, async_engine
+from app.infrastructure.repositories.aggregate_store import AsyncAggregateStore, COMPACTION_LOCK_NAMESPACE, init_statement
+from app.infrastructure.repositories.async_submission_repository import AsyncSubmissionRepository
+
+FIELDS = [
+    {"id": "drzava", "type": "select", "label": "Država",
+     "options": [{"value": f"c{i}", "label": f"Zemlja {i}"} for i in range(5)]},
+    {"id": "broj_gostiju", "type": "number", "label": "Broj Gostiju"},
+    {"id": "ime", "type": "text", "label": "Ime"},
+]
+
+
+def _percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def _data(worker: int, index: int) -> dict:
+    return {"drzava": f"c{index % 5}", "broj_gostiju": index % 50, "ime": f"ime_{worker}_{index}"}
+
+
+async def _insert(form_id: int, data: dict, mode: str) -> None:
+    async with AsyncSessionLocal() as session:
+        if mode != "inline":
+            await AsyncSubmissionRepository(session).create(form_id, SubmissionCreate(data=data))
+            return
+        store = AsyncAggregateStore(session)
+        submission = Submission(form_id=form_id, data=data)
+        session.add(submission)
+        await session.flush()
+        await store.apply(form_id, added=[data], added_at=submission.submitted_at)
+        await session.execute(select(func.pg_advisory_xact_lock(COMPACTION_LOCK_NAMESPACE, form_id)))
+        await store.fold_pending(form_id)
+        await session.commit()
+
+
+async def _run(form_id: int, mode: str, workers: int, per_worker: int) -> list:
+    settings.ANALYTICS_AGGREGATES_ENABLED = mode != "off"
+
+    async def worker(number: int) -> list:
+        latencies = []
+        for index in range(per_worker):
+            started = time.perf_counter()
+            await _insert(form_id, _data(number, index), mode)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    return [latency for latencies in await asyncio.gather(*(worker(number) for number in range(workers))) for latency in latencies]
+
+
+async def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    per_worker = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    async with AsyncSessionLocal() as session:
+        form = (await session.execute(
+            insert(Form).values(name="aggregate-ingest-benchmark", fields=FIELDS, rules=[]).returning(Form)
+        )).scalar_one()
+        await session.execute(init_statement(form))
+        await session.commit()
+        form_id = form.id
+
+    problems = []
+    try:
+        print(f"{workers} istovremenih upisa x {per_worker}, forma {form_id}")
+        for mode in ("off", "deltas", "inline"):
+            started = time.perf_counter()
+            latencies = await _run(form_id, mode, workers, per_worker)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{mode:7} {len(latencies) / elapsed:8.0f} upisa/s   p50 {_percentile(latencies, 0.5):6.1f} ms"
+                f"   p99 {_percentile(latencies, 0.99):6.1f} ms"
+            )
+            if mode == "deltas":
+                started = time.perf_counter()
+                async with AsyncSessionLocal() as session:
+                    folded = await AsyncAggregateStore(session).compact(form_id, settings.ANALYTICS_AGGREGATE_COMPACTION_BATCH_SIZE)
+                print(f"        kompakcija {folded} delti: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        async with AsyncSessionLocal() as session:
+            stored = await session.scalar(select(FormAggregate.submission_count).where(FormAggregate.form_id == form_id))
+        # Upisi u rezimu off nisu ni dodali deltu
+        expected = 2 * workers * per_worker
+        if stored != expected:
+            problems.append(f"store counts {stored} submissions, expected {expected}")
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Submission).where(Submission.form_id == form_id))
+            await session.execute(delete(Form).where(Form.id == form_id))
+            await session.commit()
+        await async_engine.dispose()
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Load test of AI form generation against the local fake backend (no network): concurrency cap,
+single-flight coalescing of identical prompts and the prompt cache.
+
+Pokretanje:  python benchmarks/ai_load.py [broj_zahteva] [razlicitih_promptova] [latencija_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.application.services.ai_service import AIService
+from app.core.config import settings
+from app.infrastructure.ai.fake_backend import FakeAIBackend
+from app.infrastructure.cache.ai_prompt_cache import PromptCache
+
+TEMPLATES = [
+    "Kontakt forma sa imenom, email-om i porukom",
+    "Registracija korisnika: ime, email, telefon, datum rodjenja, drzava i saglasnost sa uslovima",
+    "Anketa o zadovoljstvu sa ocenom i komentarom",
+    "Prijava za dogadjaj: ime, email i datum",
+]
+
+
+def _percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def _prompt(key: int) -> str:
+    return f"{TEMPLATES[key % len(TEMPLATES)]} #{key}"
+
+
+def _variant(prompt: str, index: int) -> str:
+    """ The same request written differently; normalize_prompt maps all of them to one cache key. """
+    return (prompt, prompt.upper(), f"  {prompt.replace(' ', '  ')} ")[index % 3]
+
+
+async def _run(service: AIService, prompts) -> list:
+    async def one(prompt: str) -> float:
+        started = time.perf_counter()
+        await service.generate_form_schema(prompt)
+        return time.perf_counter() - started
+
+    return await asyncio.gather(*(one(prompt) for prompt in prompts))
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    latency_ms = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    backend = FakeAIBackend(latency_seconds=latency_ms / 1000)
+    service = AIService(
+        backend,
+        prompt_cache=PromptCache(max_entries=settings.AI_CACHE_MAX_ENTRIES, ttl_seconds=settings.AI_CACHE_TTL_SECONDS),
+    )
+    # Promptovi se ponavljaju (galerija sablona) i razlikuju samo u velicini slova i razmacima
+    prompts = [_variant(_prompt(index % distinct), index) for index in range(requests)]
+
+    for label in ("cold", "warm"):
+        started = time.perf_counter()
+        latencies = await _run(service, prompts)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{label}: {requests} requests in {elapsed:.2f}s ({requests / elapsed:.0f}/s), "
+            f"p50 {_percentile(latencies, 0.5):.2f} ms, p99 {_percentile(latencies, 0.99):.2f} ms, "
+            f"upstream calls {backend.calls}"
+        )
+    print(service.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Smoke check: per-field analytics SQL runs against Postgres and matches a Python recompute.
+
+Radi nad pravom Postgres bazom (DATABASE_URL iz .env): u jednoj transakciji pravi test formu i
+submisije, pokrece AsyncAnalyticsRepository.aggregate_fields i poredi rezultat sa vrednostima
+izracunatim u Python-u. Uzorak (sample_percent) mora da bude ponovljiv i da broji samo redove forme;
+zato se pravi i druga forma koja ga ne sme poremetiti. Na kraju sve vraca (ROLLBACK).
+
+Pokretanje:  python benchmarks/analytics_smoke.py [broj_submisija]
+"""
+import asyncio
+import math
+import os
+import random
+import statistics
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.services.analytics_plan import PERCENTILES, plan_field_aggregates
+from app.domain.models.form import Form
+from app.domain.models.submission import Submission
+from app.infrastructure.database.async_session import async_engine
+from app.infrastructure.repositories.analytics_repository import AsyncAnalyticsRepository
+
+FIELDS = [
+    {"id": "drzava", "type": "select", "label": "Država",
+     "options": [{"value": f"c{i}", "label": f"Zemlja {i}"} for i in range(5)]},
+    {"id": "interesovanja", "type": "checkbox", "label": "Interesovanja",
+     "options": [{"value": f"i{i}", "label": f"Interesovanje {i}"} for i in range(4)]},
+    {"id": "broj_gostiju", "type": "number", "label": "Broj Gostiju"},
+    {"id": "datum", "type": "date", "label": "Datum"},
+    {"id": "ime", "type": "text", "label": "Ime"},
+]
+SAMPLE_PERCENT = 20
+
+
+def _payload(index: int) -> dict:
+    data = {
+        "drzava": f"c{random.randrange(5)}",
+        "interesovanja": [f"i{i}" for i in random.sample(range(4), random.randrange(3))],
+        "datum": (date(2024, 1, 1) + timedelta(days=random.randrange(400))).isoformat(),
+        "ime": f"ime_{index}",
+    }
+    # Svaka deseta submisija nema broj, svaka sedma ga cuva kao string
+    if index % 10:
+        number = random.randrange(1000)
+        data["broj_gostiju"] = str(number) if index % 7 == 0 else number
+    return data
+
+
+def _percentile(values: list, fraction: float) -> float:
+    """ Python counterpart of percentile_cont (linear interpolation). """
+    position = fraction * (len(values) - 1)
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _check(payloads: list, total: int, aggregates: dict) -> list:
+    problems = []
+    if total != len(payloads):
+        problems.append(f"total {total} != {len(payloads)}")
+    numbers = sorted(float(data["broj_gostiju"]) for data in payloads if "broj_gostiju" in data)
+    number = aggregates["broj_gostiju"]
+    if number.value_count != len(numbers):
+        problems.append(f"value_count {number.value_count} != {len(numbers)}")
+    if float(number.minimum) != numbers[0] or float(number.maximum) != numbers[-1]:
+        problems.append(f"bounds [{number.minimum}, {number.maximum}] != [{numbers[0]}, {numbers[-1]}]")
+    if abs(float(number.average) - statistics.fmean(numbers)) > 1e-6:
+        problems.append(f"avg {number.average} != {statistics.fmean(numbers)}")
+    for fraction, value in zip(PERCENTILES, number.percentiles):
+        if not isinstance(value, float) or abs(value - _percentile(numbers, fraction)) > 1e-6:
+            problems.append(f"p{fraction} {value!r} != {_percentile(numbers, fraction)}")
+    if sum(count for _, count in number.histogram) != len(numbers):
+        problems.append(f"number histogram counts {sum(count for _, count in number.histogram)} values, not {len(numbers)}")
+    if sum(count for _, count in aggregates["datum"].histogram) != len(payloads):
+        problems.append("date histogram does not count every submission")
+    for position in range(5):
+        expected = sum(data["drzava"] == f"c{position}" for data in payloads)
+        if aggregates["drzava"].option_counts[position] != expected:
+            problems.append(f"option c{position} {aggregates['drzava'].option_counts[position]} != {expected}")
+    return problems
+
+
+def _check_sample(count: int, first: tuple, second: tuple) -> list:
+    """ The sample is repeatable and its size within five standard errors of count * f. """
+    problems = []
+    if first != second:
+        problems.append("two runs with the same seed returned different samples")
+    fraction = SAMPLE_PERCENT / 100
+    expected, error = count * fraction, math.sqrt(count * fraction * (1 - fraction))
+    if abs(first[0] - expected) > 5 * error:
+        problems.append(f"sampled rows {first[0]} too far from {expected:.0f}")
+    return problems
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    random.seed(42)
+    payloads = [_payload(i) for i in range(count)]
+
+    async with async_engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            form_id = await connection.scalar(insert(Form).values(name="analytics-smoke", fields=FIELDS, rules=[]).returning(Form.id))
+            await connection.execute(insert(Submission), [{"form_id": form_id, "data": data} for data in payloads])
+            other_id = await connection.scalar(insert(Form).values(name="analytics-smoke-other", fields=FIELDS, rules=[]).returning(Form.id))
+            await connection.execute(insert(Submission), [{"form_id": other_id, "data": _payload(i)} for i in range(count * 3)])
+            await connection.execute(text("ANALYZE submissions"))
+
+            repository = AsyncAnalyticsRepository(AsyncSession(bind=connection))
+            specs = plan_field_aggregates(FIELDS)
+            total, aggregates = await repository.aggregate_fields(form_id, specs)
+            problems = _check(payloads, total, aggregates)
+            print(f"{'OK  ' if not problems else 'FAIL'} aggregate_fields over {count} submissions")
+            for problem in problems:
+                print(f"     {problem}")
+
+            first = await repository.aggregate_fields(form_id, specs, sample_percent=SAMPLE_PERCENT)
+            second = await repository.aggregate_fields(form_id, specs, sample_percent=SAMPLE_PERCENT)
+            sample_problems = _check_sample(count, first, second)
+            print(f"{'OK  ' if not sample_problems else 'FAIL'} {SAMPLE_PERCENT}% sample: {first[0]} rows")
+            for problem in sample_problems:
+                print(f"     {problem}")
+            problems += sample_problems
+        finally:
+            await transaction.rollback()
+    await async_engine.dispose()
+
+    if problems:
+        sys.exit(f"{len(problems)} aggregate(s) differ from the recompute")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Query latency of the in-process similar-form index (used by the AI routes before a model call)
+over a synthetic corpus: build time, incremental updates, and lookups for prompts that describe an
+existing form, prompts built only from common field labels, and prompts that match nothing.
+
+Pokretanje:  python benchmarks/form_similarity.py [broj_formi] [broj_upita] [min_score]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.application.services.form_similarity import FormSimilarityIndex
+
+TOPICS = [
+    "Kontakt", "Registracija", "Prijava za posao", "Anketa o zadovoljstvu", "Rezervacija", "Narudzbina",
+    "Contact", "Registration", "Job application", "Customer survey", "Booking", "Order", "Feedback",
+    "Newsletter", "Event signup", "Support ticket", "Volunteer", "Membership", "Donation", "Appointment",
+]
+LABELS = [
+    "Ime", "Prezime", "Email", "Telefon", "Adresa", "Grad", "Drzava", "Datum", "Poruka", "Ocena",
+    "Full name", "Email address", "Phone number", "Company", "Message", "Date of birth", "Country",
+    "Rating", "Comments", "Number of guests", "Preferred time", "Website", "Job title", "Upload CV",
+    "Order quantity", "Product", "Size", "Color", "Payment method", "Terms and conditions",
+]
+UNRELATED = [
+    "Prijava kvara na brodskom motoru sa serijskim brojem",
+    "Quarterly telescope calibration checklist for observatories",
+    "Zahtev za izdavanje dozvole za pecanje na reci",
+]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("bcdfghklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+
+
+def _form(rng: random.Random, vocabulary):
+    # Naziv = tema + specificne reci (firma, proizvod), polja = uobicajene labele + poneka specificna
+    name = f"{rng.choice(TOPICS)} {' '.join(rng.sample(vocabulary, 2))}"
+    labels = rng.sample(LABELS, rng.randint(3, 8)) + [f"{rng.choice(vocabulary)} id"]
+    return name, f"Forma za {rng.choice(vocabulary)}", [{"id": f"f{index}", "label": label} for index, label in enumerate(labels)]
+
+
+def _percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def _measure(index: FormSimilarityIndex, prompts, min_score: float):
+    latencies, matched = [], 0
+    for prompt in prompts:
+        started = time.perf_counter()
+        matched += bool(index.search(prompt, min_score))
+        latencies.append(time.perf_counter() - started)
+    return latencies, matched
+
+
+def main():
+    forms = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    min_score = float(sys.argv[3]) if len(sys.argv) > 3 else 0.6
+
+    rng = random.Random(7)
+    vocabulary = list({_word(rng) for _ in range(20_000)})
+    corpus = [_form(rng, vocabulary) for _ in range(forms)]
+
+    index = FormSimilarityIndex()
+    started = time.perf_counter()
+    for form_id, (name, description, fields) in enumerate(corpus, start=1):
+        index.add(form_id, name, description, fields)
+    elapsed = time.perf_counter() - started
+    print(f"build: {forms} forms in {elapsed:.2f}s ({elapsed / forms * 1e6:.1f} us/form), {index.stats()['terms']} terms")
+
+    # Prompt opisuje postojecu formu (naziv i polja, drugim redosledom)
+    described = []
+    for form_id in rng.sample(range(1, forms + 1), queries):
+        name, _, fields = corpus[form_id - 1]
+        labels = [field["label"] for field in fields]
+        rng.shuffle(labels)
+        described.append(f"{name} form with {', '.join(labels)}")
+    generic = [f"{rng.choice(TOPICS)} with {', '.join(rng.sample(LABELS, 4))}" for _ in range(queries)]
+    unrelated = [rng.choice(UNRELATED) for _ in range(queries)]
+
+    index.search("warm up", min_score)
+    for label, prompts in (("described", described), ("generic", generic), ("unrelated", unrelated)):
+        latencies, matched = _measure(index, prompts, min_score)
+        print(
+            f"{label}: {queries} queries, p50 {_percentile(latencies, 0.5):.2f} ms, "
+            f"p99 {_percentile(latencies, 0.99):.2f} ms, matched {matched}"
+        )
+
+    started = time.perf_counter()
+    for form_id in rng.sample(range(1, forms + 1), queries):
+        name, description, fields = _form(rng, vocabulary)
+        index.add(form_id, name, description, fields)
+    elapsed = time.perf_counter() - started
+    print(f"update: {queries} forms re-indexed, {elapsed / queries * 1e6:.1f} us/form")
+
+
+if __name__ == "__main__":
+    main()
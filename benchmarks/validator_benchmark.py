@@ -0,0 +1,123 @@
+"""
+Micro-benchmark: compiled submission validator vs. interpreting the form schema on every request.
+
+Pokretanje:  python benchmarks/validator_benchmark.py [broj_iteracija]
+"""
+import math
+import os
+import re
+import sys
+import timeit
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.application.services.submission_validator import compile_form_validator
+
+# Polja "Registraciona Forma" iz app/database/seed.py, plus validacije u 'validations' formatu
+FIELDS = [
+    {"id": "korisnicko_ime", "type": "text", "label": "Korisničko Ime", "required": True, "minLength": 3, "maxLength": 20},
+    {"id": "email", "type": "email", "label": "Email", "required": True},
+    {"id": "lozinka", "type": "password", "label": "Lozinka", "required": True, "minLength": 8},
+    {"id": "datum_rodjenja", "type": "date", "label": "Datum Rođenja", "required": False},
+    {"id": "drzava", "type": "select", "label": "Država", "required": True,
+     "options": [{"value": "rs", "label": "Srbija"}, {"value": "hr", "label": "Hrvatska"},
+                 {"value": "ba", "label": "Bosna i Hercegovina"}, {"value": "me", "label": "Crna Gora"}]},
+    {"id": "broj_gostiju", "type": "number", "label": "Broj Gostiju", "validations": [{"type": "min", "value": 1}, {"type": "max", "value": 5}]},
+    {"id": "telefon", "type": "tel", "label": "Telefon", "validations": [{"type": "pattern", "value": r"\+?[0-9 ]{6,15}"}]},
+    {"id": "saglasnost", "type": "checkbox", "label": "Slažem se sa uslovima korišćenja", "required": True},
+]
+
+PAYLOADS = [
+    {"korisnicko_ime": "marko123", "email": "marko123@example.com", "lozinka": "********",
+     "datum_rodjenja": "1995-03-15", "drzava": "rs", "broj_gostiju": 2, "telefon": "+381 64 123456", "saglasnost": True},
+    {"korisnicko_ime": "jo", "email": "not-an-email", "lozinka": "short",
+     "datum_rodjenja": "15.03.1995", "drzava": "de", "broj_gostiju": 9, "telefon": "abc", "saglasnost": False},
+    {"korisnicko_ime": "marko123", "email": "marko123@example.com", "lozinka": "********",
+     "datum_rodjenja": "1995-03-15garbage", "drzava": "rs", "broj_gostiju": "nan", "saglasnost": True},
+]
+
+
+def interpret(fields, data):
+    """ Reference path: reads the raw schema (and compiles regexes) on every call. """
+    errors = {}
+    known = set()
+    for field in fields:
+        field_id = field["id"]
+        known.add(field_id)
+        constraints = {k: field[k] for k in ("required", "minLength", "maxLength", "min", "max", "pattern") if field.get(k) is not None}
+        for validation in field.get("validations") or []:
+            if isinstance(validation, str):
+                constraints[validation] = True
+            elif isinstance(validation, dict) and (validation.get("type") or validation.get("name")):
+                constraints[validation.get("type") or validation.get("name")] = validation.get("value", True)
+
+        field_type = field.get("type")
+        options = field.get("options") or []
+        value = data.get(field_id)
+        empty = value is None or value == "" or value == [] or (field_type == "checkbox" and not options and value is False)
+        if empty:
+            if constraints.get("required"):
+                errors[field_id] = "This field is required."
+            continue
+
+        if field_type == "number":
+            try:
+                number = float(value) if not isinstance(value, bool) else None
+            except (TypeError, ValueError):
+                number = None
+            if number is None or not math.isfinite(number):
+                errors[field_id] = "Must be a number."
+            elif constraints.get("min") is not None and number < float(constraints["min"]):
+                errors[field_id] = f"Must be at least {constraints['min']}."
+            elif constraints.get("max") is not None and number > float(constraints["max"]):
+                errors[field_id] = f"Must be at most {constraints['max']}."
+        elif field_type in ("text", "textarea", "email", "tel", "password"):
+            if not isinstance(value, str):
+                errors[field_id] = "Must be a string."
+            elif constraints.get("minLength") is not None and len(value) < constraints["minLength"]:
+                errors[field_id] = f"Must be at least {constraints['minLength']} characters long."
+            elif constraints.get("maxLength") is not None and len(value) > constraints["maxLength"]:
+                errors[field_id] = f"Must be at most {constraints['maxLength']} characters long."
+            elif constraints.get("pattern") and re.fullmatch(constraints["pattern"], value) is None:
+                errors[field_id] = "Has an invalid format."
+            elif field_type == "email" and re.fullmatch(r"[^@\s]+@[^@\s]+\.[^@\s]+", value) is None:
+                errors[field_id] = "Must be a valid email address."
+        elif field_type in ("select", "radio") and options:
+            if value not in [option.get("value") for option in options]:
+                errors[field_id] = f"Value {value!r} is not one of the allowed options."
+        elif field_type == "checkbox" and not options:
+            if not isinstance(value, bool):
+                errors[field_id] = "Must be true or false."
+        elif field_type == "date":
+            try:
+                date.fromisoformat(str(value))
+            except ValueError:
+                try:
+                    datetime.fromisoformat(str(value))
+                except ValueError:
+                    errors[field_id] = "Must be a date in YYYY-MM-DD format."
+    for key in data.keys() - known:
+        errors[key] = "Unknown field."
+    return errors
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    validate = compile_form_validator(FIELDS)
+
+    for payload in PAYLOADS:
+        assert validate(payload).keys() == interpret(FIELDS, payload).keys()
+
+    for label, payload in (("valid", PAYLOADS[0]), ("invalid", PAYLOADS[1])):
+        compiled = min(timeit.repeat(lambda: validate(payload), number=iterations, repeat=5))
+        interpreted = min(timeit.repeat(lambda: interpret(FIELDS, payload), number=iterations, repeat=5))
+        print(
+            f"{label:>8} payload: compiled {compiled / iterations * 1e6:7.2f} us/op | "
+            f"interpreted {interpreted / iterations * 1e6:7.2f} us/op | "
+            f"speedup x{interpreted / compiled:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
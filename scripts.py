@@ -32,4 +32,82 @@ def reset_db():
         return
     
     from app.database.seed import run_seed
-    run_seed(clear=True)   
\ No newline at end of file
+    run_seed(clear=True)   
+
+def index_field():
+    """Pravi (ili sa --drop brise) expression indeks za filtriranje po jednom polju forme"""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if len(args) != 3:
+        print("Upotreba: index-field <form_id> <field_id> <numeric|text|prefix|trigram> [--drop]")
+        return
+
+    from app.database.field_indexes import create_field_index, drop_field_index
+
+    form_id, field_id, kind = int(args[0]), args[1], args[2]
+    if "--drop" in sys.argv:
+        print(f"🗑️  Obrisan indeks {drop_field_index(form_id, field_id, kind)}")
+    else:
+        print(f"✅ Kreiran indeks {create_field_index(form_id, field_id, kind)}")
+
+
+def _form_id_args():
+    if "--all" in sys.argv:
+        return []
+    ids = [int(arg) for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not ids:
+        print("Navedite jedan ili vise form_id ili --all")
+        sys.exit(2)
+    return ids
+
+
+def rebuild_aggregates():
+    """Ponovo racuna agregate analitike iz submisija (backfill)"""
+    import asyncio
+    from app.database.analytics_aggregates import rebuild_aggregates as rebuild
+
+    for form_id, count in asyncio.run(rebuild(_form_id_args())).items():
+        if count is None:
+            print(f"❌ Forma {form_id} ne postoji")
+        else:
+            print(f"✅ Forma {form_id}: agregirano {count} submisija")
+
+
+def check_aggregates():
+    """Poredi agregate analitike sa punim preracunavanjem"""
+    import asyncio
+    from app.database.analytics_aggregates import check_aggregates as check
+
+    failed = 0
+    for form_id, problems in asyncio.run(check(_form_id_args())).items():
+        if problems:
+            failed += 1
+            print(f"❌ Forma {form_id}:")
+            for problem in problems:
+                print(f"   - {problem}")
+        else:
+            print(f"✅ Forma {form_id}: agregati su konzistentni")
+    if failed:
+        sys.exit(1)
+
+
+def compact_aggregates():
+    """Sabira delte agregata analitike koje jos nisu sabrane"""
+    import asyncio
+    from app.core.config import settings
+    from app.infrastructure.database.async_session import AsyncSessionLocal
+    from app.infrastructure.ingest.aggregate_compactor import compact_pending
+
+    folded = asyncio.run(compact_pending(AsyncSessionLocal, settings.ANALYTICS_AGGREGATE_COMPACTION_BATCH_SIZE))
+    for form_id, count in folded.items():
+        if count is None:
+            print(f"⏭️  Forma {form_id}: preskocena, sabira je drugi kompaktor")
+        else:
+            print(f"✅ Forma {form_id}: sabrano {count} delti")
+
+
+def prune_rollups():
+    """Brise minutne rollup-ove starije od ANALYTICS_MINUTE_ROLLUP_RETENTION_DAYS"""
+    import asyncio
+    from app.database.analytics_aggregates import prune_rollups as prune
+
+    print(f"🗑️  Obrisano {asyncio.run(prune())} minutnih rollup-ova")